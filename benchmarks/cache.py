@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+'''compares parsing matpower data files with loading their cache images,
+including memory mapped loading
+
+usage: python benchmarks/cache.py [matpower files]
+'''
+
+import glob
+import os
+import shutil
+import sys
+import tempfile
+import timeit
+import warnings
+
+import grg_mpdata
+
+
+def _time(function, repeat=5):
+    return min(timeit.repeat(function, number=1, repeat=repeat))
+
+
+def main(paths):
+    cache_dir = tempfile.mkdtemp()
+    try:
+        print('%-40s %10s %10s %10s %10s' % ('file', 'parse', 'cached', 'numpy',
+                                          'mapped'))
+        for path in paths:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                parse = _time(lambda: grg_mpdata.io.parse_mp_case_file(path))
+                grg_mpdata.io.parse_mp_case_file(path, cache_dir=cache_dir)
+                cached = _time(lambda: grg_mpdata.io.parse_mp_case_file(path,
+                    cache_dir=cache_dir))
+                columnar = _time(lambda: grg_mpdata.io.parse_mp_case_file(path,
+                    backend='numpy', cache_dir=cache_dir))
+                mapped = _time(lambda: grg_mpdata.cache.map_case(path,
+                    cache_dir=cache_dir))
+            print('%-40s %8.2fms %8.2fms %8.2fms %8.2fms' %
+                  (os.path.basename(path), 1e3*parse, 1e3*cached,
+                   1e3*columnar, 1e3*mapped))
+    finally:
+        shutil.rmtree(cache_dir)
+
+
+if __name__ == '__main__':
+    paths = sys.argv[1:]
+    if len(paths) == 0:
+        data_dir = os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                                '..', 'tests', 'data', 'correct', 'pglib-opf')
+        paths = sorted(glob.glob(os.path.join(data_dir, '*.m')))
+    main(paths)
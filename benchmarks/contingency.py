@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+'''compares the time and memory of holding all n-1 contingencies of a case,
+as overlays of the base case and as deep copies
+
+usage: python benchmarks/contingency.py [matpower file]
+'''
+
+import copy
+import os
+import sys
+import time
+import tracemalloc
+
+import grg_mpdata
+
+from grg_mpdata.contingency import n_minus_one
+
+
+def _deep_copies(case):
+    cases = []
+    for position in range(0, len(case.branch)):
+        outage = copy.deepcopy(case)
+        outage.branch[position].br_status = 0
+        cases.append(outage)
+    return cases
+
+
+def _overlays(case):
+    return list(n_minus_one(case, ('branch',)))
+
+
+def _measure(function, case):
+    start = time.perf_counter()
+    function(case)
+    seconds = time.perf_counter() - start
+
+    # tracing slows allocations down, so memory is measured in a second run
+    tracemalloc.start()
+    cases = function(case)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return len(cases), seconds, peak
+
+
+def main(path):
+    case = grg_mpdata.io.parse_mp_case_file(path)
+    tracemalloc.start()
+    copy.deepcopy(case)
+    base = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    print('%s, branches: %d, base case: %.1f MB' % (os.path.basename(path),
+        len(case.branch), base/1e6))
+    for name, function in [('overlays', _overlays),
+                           ('deep copies', _deep_copies)]:
+        count, seconds, peak = _measure(function, case)
+        print('%-12s %6d cases %10.2f s %10.1f MB' % (name, count, seconds,
+                                                     peak/1e6))
+
+
+if __name__ == '__main__':
+    path = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..',
+        'tests', 'data', 'correct', 'pglib-opf', 'pglib_opf_case300_ieee.m')
+    if len(sys.argv) > 1:
+        path = sys.argv[1]
+    main(path)
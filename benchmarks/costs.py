@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+'''compares evaluating the generation cost of dispatch points, and
+converting the cost models to piecewise linear models and back, with python
+loops over the cost models and with grg_mpdata.costs
+
+usage: python benchmarks/costs.py [matpower file] [dispatch point count]
+'''
+
+import os
+import sys
+import time
+
+import numpy
+
+import grg_mpdata
+
+from grg_mpdata.costs import CostModels
+from grg_mpdata.costs import to_polynomial
+from grg_mpdata.costs import to_pwl
+from grg_mpdata.struct import GeneratorCost
+
+
+def _loop(case, dispatch):
+    totals = []
+    for point in dispatch:
+        total = 0.0
+        for cost, pg in zip(case.gencost, point):
+            for i, c in enumerate(cost.cost):
+                total += c*pg**(cost.ncost-1-i)
+        totals.append(total)
+    return numpy.array(totals)
+
+
+def _vectorized(case, dispatch):
+    return CostModels(case.gencost).evaluate(dispatch).sum(axis=1)
+
+
+def _loop_to_pwl(case, segments):
+    costs = []
+    for cost, gen in zip(case.gencost, case.gen):
+        x = numpy.linspace(gen.pmin, max(gen.pmax, gen.pmin + 1.0),
+                           segments+1)
+        y = numpy.polyval(cost.cost, x)
+        values = numpy.empty(2*(segments+1))
+        values[0::2] = x
+        values[1::2] = y
+        costs.append(GeneratorCost(cost.index, 1, cost.startup,
+                                   cost.shutdown, segments+1, values))
+    return costs
+
+
+def _loop_to_polynomial(costs):
+    fitted = []
+    for cost in costs:
+        coefficients = numpy.polyfit(cost.cost[0::2], cost.cost[1::2], 2)
+        fitted.append(GeneratorCost(cost.index, 2, cost.startup,
+                                    cost.shutdown, 3, coefficients))
+    return fitted
+
+
+def _time(name, function, count, unit):
+    start = time.perf_counter()
+    result = function()
+    seconds = time.perf_counter() - start
+    print('%-28s %8.3f s %10.2f us per %s' % (name, seconds,
+        1e6*seconds/count, unit))
+    return result
+
+
+def main(path, point_count, segments=4):
+    case = grg_mpdata.io.parse_mp_case_file(path)
+    pmax = numpy.array([x.pmax for x in case.gen])
+    dispatch = pmax*numpy.random.RandomState(0).uniform(0.0, 1.0,
+        (point_count, len(case.gen)))
+
+    print('%s, generators: %d, dispatch points: %d' % (
+        os.path.basename(path), len(case.gen), point_count))
+    totals = [_time(name, lambda: function(case, dispatch), point_count,
+                    'point') for name, function in [
+        ('python loop', _loop), ('CostModels.evaluate', _vectorized)]]
+    assert(numpy.allclose(totals[0], totals[1]))
+
+    pmin, pmax = [numpy.array([getattr(x, y) for x in case.gen])
+                  for y in ('pmin', 'pmax')]
+    count = len(case.gencost)
+    pwl = _time('python loop to pwl', lambda: _loop_to_pwl(case, segments),
+                count, 'generator')
+    _time('to_pwl', lambda: to_pwl(case.gencost, pmin, pmax, segments),
+          count, 'generator')
+    _time('python loop to polynomial', lambda: _loop_to_polynomial(pwl),
+          count, 'generator')
+    _time('to_polynomial', lambda: to_polynomial(pwl), count, 'generator')
+
+
+if __name__ == '__main__':
+    path = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..',
+        'tests', 'data', 'correct', 'pglib-opf', 'pglib_opf_case1888_rte.m')
+    point_count = 1000
+    if len(sys.argv) > 1:
+        path = sys.argv[1]
+    if len(sys.argv) > 2:
+        point_count = int(sys.argv[2])
+    main(path, point_count)
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+'''compares solving many dc power flow scenarios one at a time, each with its
+own factorization, with a batched solve that shares one factorization
+
+usage: python benchmarks/dcflow.py [matpower file] [scenario count]
+'''
+
+import os
+import sys
+import timeit
+
+import numpy
+
+import grg_mpdata
+
+from grg_mpdata.dcflow import DCNetwork
+from grg_mpdata.dcflow import bus_injections
+
+
+def _time(function, repeat=3):
+    return min(timeit.repeat(function, number=1, repeat=repeat))
+
+
+def main(path, scenario_count):
+    case = grg_mpdata.io.parse_mp_case_file(path)
+    injections = bus_injections(case)
+    scale = numpy.random.RandomState(0).uniform(0.9, 1.1,
+        size=(len(injections), scenario_count))
+    scenarios = injections[:, numpy.newaxis]*scale
+
+    def separate():
+        for k in range(0, scenario_count):
+            DCNetwork(case).power_flow(scenarios[:, k])
+
+    def batched():
+        DCNetwork(case).power_flow(scenarios)
+
+    network = DCNetwork(case)
+    print('%s, buses: %d, branches: %d, scenarios: %d' % (
+        os.path.basename(path), len(case.bus), len(case.branch),
+        scenario_count))
+    print('%-24s %10.2f ms' % ('separate factorizations',
+                               1e3*_time(separate, repeat=1)))
+    print('%-24s %10.2f ms' % ('batched', 1e3*_time(batched)))
+    print('%-24s %10.2f ms' % ('ptdf', 1e3*_time(network.ptdf)))
+    print('%-24s %10.2f ms' % ('lodf', 1e3*_time(network.lodf)))
+
+
+if __name__ == '__main__':
+    path = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..',
+        'tests', 'data', 'correct', 'pglib-opf', 'pglib_opf_case1888_rte.m')
+    scenario_count = 1000
+    if len(sys.argv) > 1:
+        path = sys.argv[1]
+    if len(sys.argv) > 2:
+        scenario_count = int(sys.argv[2])
+    main(path, scenario_count)
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+'''times the keyed diff of two large snapshots of a case, that differ in a
+few branches
+
+usage: python benchmarks/diff.py [matpower file] [branch count]
+'''
+
+import copy
+import os
+import sys
+import timeit
+
+import grg_mpdata
+
+from grg_mpdata.diff import diff_cases
+
+
+def _snapshot(case, branch_count):
+    '''a case whose branch table repeats the branches of the given case'''
+    snapshot = copy.deepcopy(case)
+    branches = []
+    while len(branches) < branch_count:
+        branches.extend(copy.deepcopy(case.branch))
+    snapshot.branch = branches[:branch_count]
+    for index, branch in enumerate(snapshot.branch):
+        branch.index = index
+    return snapshot
+
+
+def main(path, branch_count):
+    case = grg_mpdata.io.parse_mp_case_file(path)
+    case_1 = _snapshot(case, branch_count)
+    case_2 = copy.deepcopy(case_1)
+    for branch in case_2.branch[::1000]:
+        branch.rate_a += 10.0
+    del case_2.branch[-5:]
+
+    print('%s, branches: %d' % (os.path.basename(path), len(case_1.branch)))
+    case_diff = diff_cases(case_1, case_2)
+    print('differences: %d' % case_diff.count)
+    seconds = min(timeit.repeat(lambda: diff_cases(case_1, case_2),
+                                number=1, repeat=3))
+    print('%-24s %8.2f ms' % ('diff_cases', 1e3*seconds))
+
+
+if __name__ == '__main__':
+    path = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..',
+        'tests', 'data', 'correct', 'pglib-opf', 'pglib_opf_case1888_rte.m')
+    branch_count = 70000
+    if len(sys.argv) > 1:
+        path = sys.argv[1]
+    if len(sys.argv) > 2:
+        branch_count = int(sys.argv[2])
+    main(path, branch_count)
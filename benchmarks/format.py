@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+'''compares the time to render a case as matpower text with each
+component's to_matpower, with the per-table row templates used by
+Case.to_matpower and with the column at a time formatting of
+ColumnarCase.to_matpower
+
+usage: python benchmarks/format.py [matpower file] [repetitions]
+'''
+
+import os
+import sys
+import time
+import warnings
+
+import grg_mpdata
+
+
+def _per_component(case):
+    lines = []
+    for table in [case.bus, case.gen, case.gencost, case.branch]:
+        for component in table:
+            lines.append('\t'+component.to_matpower()+';')
+    return lines
+
+
+def _row_templates(case):
+    lines = []
+    for table in [case.bus, case.gen, case.gencost, case.branch]:
+        lines.extend(grg_mpdata.struct._matpower_rows(table))
+    return lines
+
+
+def _columnar(case):
+    lines = []
+    for table in [case.bus, case.gen, case.gencost, case.branch]:
+        lines.extend(grg_mpdata.columnar._table_rows(table))
+    return lines
+
+
+def _time(render, case, repetitions):
+    start = time.perf_counter()
+    for i in range(repetitions):
+        lines = render(case)
+    return (time.perf_counter() - start)/repetitions, lines
+
+
+def main(path, repetitions):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        case = grg_mpdata.io.parse_mp_case_file(path)
+    columnar_case = case.as_arrays()
+
+    print('case: %s' % case.name)
+    _time(_per_component, case, 1)
+    baseline, expected = None, None
+    for name, render, data in [
+            ('per component', _per_component, case),
+            ('row templates', _row_templates, case),
+            ('columnar', _columnar, columnar_case)]:
+        elapsed, lines = _time(render, data, repetitions)
+        if baseline is None:
+            baseline, expected = elapsed, lines
+        assert lines == expected
+        print('%-15s %8.2f ms  %5.2fx' %
+              (name, 1000*elapsed, baseline/elapsed))
+
+
+if __name__ == '__main__':
+    path = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..',
+        'tests', 'data', 'correct', 'pglib-opf', 'pglib_opf_case1888_rte.m')
+    repetitions = 20
+    if len(sys.argv) > 1:
+        path = sys.argv[1]
+    if len(sys.argv) > 2:
+        repetitions = int(sys.argv[2])
+    main(path, repetitions)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+'''measures the memory needed to hold the pglib-opf test corpus in memory,
+comparing the slotted grg_mpdata.struct components with components that
+store their fields in a per-instance __dict__ (the previous layout) and
+with the columnar encoding
+
+usage: python benchmarks/memory.py [matpower files]
+'''
+
+import copy
+import glob
+import os
+import sys
+import tracemalloc
+import warnings
+
+import grg_mpdata
+
+
+class _DictComponent(object):
+    '''a stand in for components that keep their fields in a __dict__'''
+    pass
+
+
+def _as_dict_component(component):
+    dict_component = _DictComponent()
+    for name in component._fields:
+        setattr(dict_component, name, getattr(component, name))
+    if hasattr(component, 'extended'):
+        dict_component.extended = component.extended
+    if hasattr(component, 'duals'):
+        dict_component.duals = component.duals
+    return dict_component
+
+
+_table_names = ['bus', 'gen', 'branch', 'gencost', 'dcline', 'dclinecost',
+                'busname']
+
+
+def _copy_tables(case, copy_component):
+    tables = {}
+    for table_name in _table_names:
+        components = getattr(case, table_name)
+        if components is not None:
+            tables[table_name] = [copy_component(x) for x in components]
+    return tables
+
+
+def _measure(build):
+    tracemalloc.start()
+    data = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return data, size
+
+
+def main(paths):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        cases = [grg_mpdata.io.parse_mp_case_file(path) for path in paths]
+
+    component_count = sum([len(getattr(case, name) or [])
+                           for case in cases for name in _table_names])
+
+    # both object layouts share the field values of the parsed cases, so only
+    # the per-instance overhead is measured
+    _, slotted = _measure(lambda: [_copy_tables(case, copy.copy)
+                                   for case in cases])
+    _, dicts = _measure(lambda: [_copy_tables(case, _as_dict_component)
+                                 for case in cases])
+    _, columnar = _measure(lambda: [case.as_arrays() for case in cases])
+
+    print('cases: %d, components: %d' % (len(cases), component_count))
+    for name, size in [('__dict__ components', dicts),
+                       ('slotted components', slotted),
+                       ('columnar tables', columnar)]:
+        print('%-20s %10.2f MB %8.1f bytes/component' %
+              (name, size/2.0**20, float(size)/component_count))
+    print('slotted savings: %.1f%%' % (100.0*(1.0 - float(slotted)/dicts)))
+
+
+if __name__ == '__main__':
+    paths = sys.argv[1:]
+    if len(paths) == 0:
+        data_dir = os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                                '..', 'tests', 'data', 'correct', 'pglib-opf')
+        paths = sorted(glob.glob(os.path.join(data_dir, '*.m')))
+    main(paths)
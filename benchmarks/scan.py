@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+'''compares scanning matpower data files for their metadata and row counts
+with parsing them in full
+
+usage: python benchmarks/scan.py [matpower files]
+'''
+
+import glob
+import os
+import sys
+import timeit
+import warnings
+
+import grg_mpdata
+
+
+def _time(function, repeat=3):
+    return min(timeit.repeat(function, number=1, repeat=repeat))
+
+
+def main(paths):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        parse = _time(lambda: [grg_mpdata.io.parse_mp_case_file(path)
+                               for path in paths])
+        scan = _time(lambda: [grg_mpdata.io.scan_mp_case_file(path)
+                              for path in paths])
+        scan_bus = _time(lambda: [grg_mpdata.io.scan_mp_case_file(path,
+                                  ('bus',)) for path in paths])
+
+    print('files: %d' % len(paths))
+    for name, seconds in [('full parse', parse), ('scan', scan),
+                          ('scan bus table', scan_bus)]:
+        print('%-16s %10.1f ms %8.2fx' % (name, 1e3*seconds, parse/seconds))
+
+
+if __name__ == '__main__':
+    paths = sys.argv[1:]
+    if len(paths) == 0:
+        data_dir = os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                                '..', 'tests', 'data')
+        paths = sorted(glob.glob(os.path.join(data_dir, 'correct', '*.m')) +
+            glob.glob(os.path.join(data_dir, 'correct', '*', '*.m')))
+    main(paths)
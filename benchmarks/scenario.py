@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+'''compares writing load scenarios by scaling components in a python loop
+and writing each case, with grg_mpdata.scenario.ScenarioSet
+
+usage: python benchmarks/scenario.py [matpower file] [scenario count]
+'''
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy
+
+import grg_mpdata
+
+from grg_mpdata.scenario import ScenarioSet
+
+
+def _loop(case, profiles, directory):
+    pd = [x.pd for x in case.bus]
+    for index, profile in enumerate(profiles):
+        for bus, value, factor in zip(case.bus, pd, profile):
+            bus.pd = value*factor
+        grg_mpdata.io.write_mp_case_file(os.path.join(directory,
+            '%s_%d.m' % (case.name, index)), case)
+    for bus, value in zip(case.bus, pd):
+        bus.pd = value
+
+
+def _time(function):
+    directory = tempfile.mkdtemp()
+    try:
+        start = time.perf_counter()
+        function(directory)
+        return time.perf_counter() - start
+    finally:
+        shutil.rmtree(directory)
+
+
+def main(path, scenario_count):
+    case = grg_mpdata.io.parse_mp_case_file(path)
+    profiles = numpy.random.RandomState(0).uniform(0.8, 1.2,
+        (scenario_count, len(case.bus)))
+    scenarios = ScenarioSet(case, {('bus', 'pd'): profiles})
+
+    print('%s, buses: %d, scenarios: %d' % (os.path.basename(path),
+        len(case.bus), scenario_count))
+    for name, function in [
+            ('python loop', lambda x: _loop(case, profiles, x)),
+            ('ScenarioSet.write', lambda x: scenarios.write(x)),
+            ('ScenarioSet.stream(text=True)',
+                lambda x: scenarios.stream(lambda name, text: len(text),
+                                           text=True)),
+            ('ScenarioSet.write(workers=%d)' % (os.cpu_count() or 1),
+                lambda x: scenarios.write(x, workers=os.cpu_count()))]:
+        seconds = _time(function)
+        print('%-32s %8.2f s %8.2f ms per scenario' % (name, seconds,
+            1e3*seconds/scenario_count))
+
+
+if __name__ == '__main__':
+    path = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..',
+        'tests', 'data', 'correct', 'pglib-opf', 'pglib_opf_case1888_rte.m')
+    scenario_count = 200
+    if len(sys.argv) > 1:
+        path = sys.argv[1]
+    if len(sys.argv) > 2:
+        scenario_count = int(sys.argv[2])
+    main(path, scenario_count)
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+'''times the island detection of grg_mpdata.topology on a case and on a
+large synthetic network of disjoint rings
+
+usage: python benchmarks/topology.py [matpower file] [bus count]
+'''
+
+import os
+import sys
+import timeit
+
+import numpy
+
+import grg_mpdata
+
+from grg_mpdata.topology import _component_roots
+from grg_mpdata.topology import _union_find_roots
+from grg_mpdata.topology import find_islands
+
+
+def _time(function, repeat=3):
+    return min(timeit.repeat(function, number=1, repeat=repeat))
+
+
+def _python_roots(node_count, f, t):
+    '''a breadth first search over adjacency lists, for comparison'''
+    adjacent = [[] for i in range(0, node_count)]
+    for i, j in zip(f.tolist(), t.tolist()):
+        adjacent[i].append(j)
+        adjacent[j].append(i)
+    roots = [-1]*node_count
+    for start in range(0, node_count):
+        if roots[start] < 0:
+            roots[start] = start
+            queue = [start]
+            for node in queue:
+                for other in adjacent[node]:
+                    if roots[other] < 0:
+                        roots[other] = start
+                        queue.append(other)
+    return roots
+
+
+def main(path, bus_count):
+    case = grg_mpdata.io.parse_mp_case_file(path)
+    columnar = case.as_arrays()
+    print('%s, buses: %d' % (os.path.basename(path), len(case.bus)))
+    print('%-28s %8.2f ms' % ('find_islands(Case)',
+                              1e3*_time(lambda: find_islands(case))))
+    print('%-28s %8.2f ms' % ('find_islands(ColumnarCase)',
+                              1e3*_time(lambda: find_islands(columnar))))
+
+    # rings of 100 buses, with their buses shuffled
+    nodes = numpy.random.RandomState(0).permutation(bus_count)
+    rings = nodes.reshape(-1, 100)
+    f = rings.ravel()
+    t = numpy.roll(rings, 1, axis=1).ravel()
+    print('synthetic, buses: %d, branches: %d' % (bus_count, len(f)))
+    print('%-28s %8.2f ms' % ('_component_roots',
+        1e3*_time(lambda: _component_roots(bus_count, f, t))))
+    print('%-28s %8.2f ms' % ('_union_find_roots',
+        1e3*_time(lambda: _union_find_roots(bus_count, f, t))))
+    print('%-28s %8.2f ms' % ('python breadth first search',
+        1e3*_time(lambda: _python_roots(bus_count, f, t))))
+
+
+if __name__ == '__main__':
+    path = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..',
+        'tests', 'data', 'correct', 'pglib-opf', 'pglib_opf_case1888_rte.m')
+    bus_count = 100000
+    if len(sys.argv) > 1:
+        path = sys.argv[1]
+    if len(sys.argv) > 2:
+        bus_count = int(sys.argv[2])
+    main(path, bus_count)
@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+'''compares validating a dirty case one component at a time with the
+vectorized rule checks of grg_mpdata.validation
+
+usage: python benchmarks/validate.py [matpower file]
+'''
+
+import os
+import sys
+import timeit
+import warnings
+
+import grg_mpdata
+
+
+def _time(function, repeat=3):
+    # warnings are recorded, as a logging handler would receive them
+    with warnings.catch_warnings(record=True):
+        warnings.simplefilter('always')
+        return min(timeit.repeat(function, number=1, repeat=repeat))
+
+
+def main(path):
+    columnar = grg_mpdata.io.parse_mp_case_file(path, backend='numpy')
+    # every bus and branch breaks a rule
+    columnar.bus['zone'][:] = -1
+    columnar.branch['br_status'][:] = 2
+    case = columnar.to_case()
+
+    rows = len(case.bus) + len(case.branch)
+    print('%s, offending rows: %d' % (os.path.basename(path), rows))
+    for name, function in [
+            ('Case.validate()', case.validate),
+            ('Case.validate(summary=True)',
+                lambda: case.validate(summary=True)),
+            ('ColumnarCase.validate()', columnar.validate),
+            ('ColumnarCase.validate(summary=True)',
+                lambda: columnar.validate(summary=True))]:
+        print('%-36s %8.2f ms' % (name, 1e3*_time(function)))
+
+
+if __name__ == '__main__':
+    path = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..',
+        'tests', 'data', 'correct', 'pglib-opf', 'pglib_opf_case1888_rte.m')
+    if len(sys.argv) > 1:
+        path = sys.argv[1]
+    main(path)
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+'''compares the peak memory and time of writing a case by building its
+matpower string (Case.to_matpower) with the streaming writer
+(Case.write_matpower)
+
+usage: python benchmarks/write.py [matpower file]
+'''
+
+import os
+import sys
+import time
+import tracemalloc
+import warnings
+
+import grg_mpdata
+
+
+def _write_string(case, output_file):
+    output_file.write(case.to_matpower())
+
+
+def _write_stream(case, output_file):
+    case.write_matpower(output_file)
+
+
+def _measure(write, case):
+    with open(os.devnull, 'w') as output_file:
+        tracemalloc.start()
+        start = time.perf_counter()
+        write(case, output_file)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return elapsed, peak
+
+
+def main(path):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        case = grg_mpdata.io.parse_mp_case_file(path)
+
+    print('case: %s (%d characters)' % (case.name, len(case.to_matpower())))
+    for name, write in [('to_matpower', _write_string),
+                        ('write_matpower', _write_stream)]:
+        elapsed, peak = _measure(write, case)
+        print('%-15s %8.3f s  peak %8.2f MB' % (name, elapsed, peak/2.0**20))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        path = sys.argv[1]
+    else:
+        path = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..',
+            'tests', 'data', 'correct', 'pglib-opf',
+            'pglib_opf_case1888_rte.m')
+    main(path)
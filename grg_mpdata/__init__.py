@@ -6,3 +6,14 @@ __version__ = '0.1.1'
 from grg_mpdata import io
 from grg_mpdata import exception
 from grg_mpdata import cmd
+from grg_mpdata import columnar
+from grg_mpdata import cache
+from grg_mpdata import validation
+from grg_mpdata import diff
+from grg_mpdata import filters
+from grg_mpdata import topology
+from grg_mpdata import admittance
+from grg_mpdata import dcflow
+from grg_mpdata import contingency
+from grg_mpdata import scenario
+from grg_mpdata import costs
@@ -0,0 +1,113 @@
+'''sparse admittance matrices of matpower cases, following the conventions of
+matpower's makeYbus.  The rows and columns of the bus matrices are the
+positions of the buses in the bus table.  This module requires scipy, which
+is an optional dependency of grg_mpdata (pip install grg-mpdata[sparse]).'''
+
+from collections import namedtuple
+
+import numpy
+
+try:
+    import scipy.sparse
+except ImportError:
+    scipy = None
+
+from grg_mpdata.filters import _in_service
+from grg_mpdata.topology import _bus_positions
+from grg_mpdata.topology import _columns
+
+
+Admittance = namedtuple('Admittance', ['ybus', 'yf', 'yt', 'bus_ids'])
+Admittance.__doc__ = '''The admittance matrices of a case
+
+    ybus (scipy.sparse.csr_matrix): the bus admittance matrix (buses x buses)
+    yf (scipy.sparse.csr_matrix): the from end branch admittance matrix
+        (branches x buses), the from end currents are yf * V
+    yt (scipy.sparse.csr_matrix): the to end branch admittance matrix
+        (branches x buses)
+    bus_ids (numpy.ndarray): the bus id (bus_i) of each row and column
+'''
+
+
+def _require_scipy():
+    if scipy is None:
+        raise ImportError('sparse matrices of cases require scipy, install '
+                          'it with pip install grg-mpdata[sparse]')
+
+
+def branch_terminals(case, bus_ids=None):
+    '''Args:
+        case (Case or ColumnarCase): a case
+        bus_ids (numpy.ndarray, optional): the bus ids of the bus table
+    Returns:
+        tuple: the bus table positions of the from and to buses of each
+        branch
+    '''
+    if bus_ids is None:
+        bus_ids = _columns(case.bus, ['bus_i'])[0].astype(numpy.int64)
+    f_bus, t_bus = _columns(case.branch, ['f_bus', 't_bus'])
+    return (_bus_positions(bus_ids, f_bus.astype(numpy.int64), 'branch'),
+            _bus_positions(bus_ids, t_bus.astype(numpy.int64), 'branch'))
+
+
+def branch_taps(tap, shift):
+    '''the complex turn ratios of branches, a tap of zero is a ratio of one
+
+    Args:
+        tap (numpy.ndarray): the off nominal turn ratios
+        shift (numpy.ndarray): the phase shifts (degrees)
+    Returns:
+        numpy.ndarray: the complex turn ratios
+    '''
+    ratio = numpy.where(tap == 0.0, 1.0, tap)
+    return ratio*numpy.exp(1j*numpy.pi/180.0*shift)
+
+
+def make_ybus(case):
+    '''builds the admittance matrices of a case, as matpower's makeYbus does.
+    Out of service branches (status not greater than zero) contribute no
+    admittance.
+
+    Args:
+        case (Case or ColumnarCase): the case
+    Returns:
+        Admittance: the ybus, yf and yt matrices and the bus ids
+    '''
+
+    _require_scipy()
+
+    bus_ids, gs, bs = _columns(case.bus, ['bus_i', 'gs', 'bs'])
+    bus_ids = bus_ids.astype(numpy.int64)
+    r, x, b, tap, shift, status = _columns(case.branch, ['br_r', 'br_x',
+        'br_b', 'tap', 'shift', 'br_status'])
+    f, t = branch_terminals(case, bus_ids)
+
+    bus_count = len(bus_ids)
+    branch_count = len(f)
+    on = _in_service(status)
+
+    series = numpy.zeros(branch_count, dtype=complex)
+    series[on] = 1.0/(r[on] + 1j*x[on])
+    charging = numpy.where(on, b, 0.0)
+    ratio = branch_taps(tap, shift)
+
+    ytt = series + 1j*charging/2.0
+    yff = ytt/(ratio*numpy.conj(ratio))
+    yft = -series/numpy.conj(ratio)
+    ytf = -series/ratio
+    shunt = (gs + 1j*bs)/case.baseMVA
+
+    rows = numpy.arange(branch_count)
+    shape = (branch_count, bus_count)
+    yf = scipy.sparse.csr_matrix((numpy.concatenate([yff, yft]),
+        (numpy.concatenate([rows, rows]), numpy.concatenate([f, t]))), shape)
+    yt = scipy.sparse.csr_matrix((numpy.concatenate([ytf, ytt]),
+        (numpy.concatenate([rows, rows]), numpy.concatenate([f, t]))), shape)
+
+    ones = numpy.ones(branch_count)
+    cf = scipy.sparse.csr_matrix((ones, (rows, f)), shape)
+    ct = scipy.sparse.csr_matrix((ones, (rows, t)), shape)
+    ybus = cf.T @ yf + ct.T @ yt + \
+        scipy.sparse.diags(shunt, format='csr', shape=(bus_count, bus_count))
+
+    return Admittance(scipy.sparse.csr_matrix(ybus), yf, yt, bus_ids)
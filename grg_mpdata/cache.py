@@ -0,0 +1,283 @@
+'''a binary cache of parsed matpower data files.  A cache image starts with a
+small JSON header, that records the size, modification time and content
+hash of the source file, followed by the raw columnar tables of the parsed
+case.  Tables are aligned in the image, so they can be memory mapped and
+shared between processes through the page cache.  Images are stored next to
+the source file or in a cache directory.'''
+
+import builtins
+import hashlib
+import json
+import os
+import struct
+import tempfile
+import warnings
+
+import numpy
+
+from grg_mpdata import __version__
+from grg_mpdata import exception
+from grg_mpdata.columnar import ColumnarCase
+from grg_mpdata.columnar import ColumnTable
+from grg_mpdata.columnar import _table_specs
+
+
+# increment when the layout of cache images changes
+CACHE_FORMAT_VERSION = 3
+
+CACHE_EXTENSION = '.mpcache'
+
+# the alignment of tables in cache images (bytes)
+_ALIGNMENT = 64
+
+# cache images start with this marker and the byte length of the header
+_MAGIC = b'MPCACHE\x00'
+_HEADER_LENGTH = struct.Struct('<Q')
+
+
+def cache_path(mp_file_name, cache_dir=None):
+    '''the location of the cache image of a matpower data file
+
+    Args:
+        mp_file_name (str): path to a matpower data file
+        cache_dir (str, optional): a directory for cache images, by default
+            images are stored next to the source file
+    Returns:
+        str: the path of the cache image
+    '''
+
+    mp_file_name = os.fspath(mp_file_name)
+    if cache_dir is None:
+        return mp_file_name + CACHE_EXTENSION
+
+    source = os.path.abspath(mp_file_name)
+    key = hashlib.sha1(source.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(cache_dir, '%s_%s%s' % (os.path.basename(source), key,
+                                                CACHE_EXTENSION))
+
+
+def _source_header(stat, digest):
+    return {
+        'format': CACHE_FORMAT_VERSION,
+        'version': __version__,
+        'size': stat.st_size,
+        'mtime': stat.st_mtime_ns,
+        'sha256': digest,
+    }
+
+
+def _aligned(position):
+    return -(-position // _ALIGNMENT) * _ALIGNMENT
+
+
+def _read_header(image_file):
+    '''reads the JSON header of a cache image, the header is plain data,
+    so reading an image never runs code from it'''
+    try:
+        if image_file.read(len(_MAGIC)) != _MAGIC:
+            return None
+        length, = _HEADER_LENGTH.unpack(image_file.read(_HEADER_LENGTH.size))
+        header = json.loads(image_file.read(length).decode('utf-8'))
+    except Exception:
+        return None
+    if not isinstance(header, dict) or \
+            header.get('format') != CACHE_FORMAT_VERSION or \
+            header.get('version') != __version__:
+        return None
+    return header
+
+
+def _dtype(descr):
+    '''a numpy dtype from the JSON encoding of its descr'''
+    return numpy.dtype([tuple(x[:2]) + tuple(tuple(y) for y in x[2:])
+                        for x in descr])
+
+
+def _warning_category(name):
+    '''the warning class with the given name, from grg_mpdata.exception or
+    the builtins'''
+    category = getattr(exception, name, None) or getattr(builtins, name, None)
+    if isinstance(category, type) and issubclass(category, Warning):
+        return category
+    return UserWarning
+
+
+def _write_image(path, header, case, case_warnings):
+    '''writes a cache image atomically, failures only disable caching'''
+
+    tables = []
+    offset = 0
+    for table_name, spec in _table_specs:
+        table = getattr(case, table_name)
+        if table is not None:
+            data = numpy.ascontiguousarray(table.data)
+            tables.append((table_name, data.dtype.descr, len(data), offset))
+            offset = _aligned(offset + data.nbytes)
+
+    header = dict(header, tables=tables,
+                  warnings=[(message, category.__name__) for message, category
+                            in case_warnings],
+                  case=(case.name, case.version, case.baseMVA))
+    encoded = json.dumps(header).encode('utf-8')
+
+    directory = os.path.dirname(path) or '.'
+    try:
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        descriptor, tmp_path = tempfile.mkstemp(dir=directory,
+                                                suffix=CACHE_EXTENSION)
+        try:
+            with os.fdopen(descriptor, 'wb') as image_file:
+                image_file.write(_MAGIC)
+                image_file.write(_HEADER_LENGTH.pack(len(encoded)))
+                image_file.write(encoded)
+                start = _aligned(image_file.tell())
+                for table_name, dtype, length, offset in tables:
+                    image_file.seek(start + offset)
+                    image_file.write(numpy.ascontiguousarray(
+                        getattr(case, table_name).data).tobytes())
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+    except OSError:
+        pass
+
+
+def _read_tables(image_file, image_path, header, mmap):
+    '''reads the tables of a cache image following its header, memory
+    mapped tables are read-only views of the image'''
+
+    start = _aligned(image_file.tell())
+    image_size = os.fstat(image_file.fileno()).st_size
+
+    specs = dict(_table_specs)
+    tables = {}
+    for table_name, descr, length, offset in header['tables']:
+        dtype = _dtype(descr)
+        if start + offset + length*dtype.itemsize > image_size:
+            raise ValueError('truncated cache image')
+        if length == 0:
+            data = numpy.empty(0, dtype=dtype)
+        elif mmap:
+            data = numpy.memmap(image_path, dtype=dtype, mode='r',
+                                offset=start + offset, shape=(length,))
+        else:
+            image_file.seek(start + offset)
+            data = numpy.fromfile(image_file, dtype=dtype, count=length)
+        if mmap:
+            data.flags.writeable = False
+        tables[table_name] = ColumnTable(specs[table_name], data)
+
+    name, version, baseMVA = header['case']
+    return ColumnarCase(name, version, baseMVA, **tables)
+
+
+def _header_warnings(header):
+    return [(message, _warning_category(name)) for message, name in
+            header['warnings']]
+
+
+def _replay(case_warnings):
+    for message, category in case_warnings:
+        warnings.warn(message, category)
+
+
+def _parse(source_bytes):
+    '''parses matpower data, recording the warnings that are emitted'''
+
+    # the io module uses the cache, so it is imported late
+    from grg_mpdata.io import parse_mp_case_str
+
+    with warnings.catch_warnings(record=True) as recorded:
+        warnings.simplefilter('always')
+        case = parse_mp_case_str(source_bytes, backend='numpy')
+    case_warnings = [(str(x.message), x.category) for x in recorded]
+    return case, case_warnings
+
+
+def _load_image(image_path, stat, digest, mmap):
+    '''Returns: the header and case of a cache image, when the size and
+    content hash of its source are unchanged'''
+
+    try:
+        with open(image_path, 'rb') as image_file:
+            header = _read_header(image_file)
+            if header is None or header['size'] != stat.st_size or \
+                    header['sha256'] != digest:
+                return None, None
+            return header, _read_tables(image_file, image_path, header, mmap)
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return None, None
+
+
+def load_case(mp_file_name, cache_dir=None, backend='struct', mmap=False,
+              lazy=False):
+    '''parses a matpower data file, using its cache image when the source's
+    size and content hash still match.  Otherwise the file is parsed and its
+    cache image is refreshed, and the header of an image whose source only
+    has a new modification time is updated.  The warnings of the original
+    parse are recorded in the image and emitted on every load.
+
+    Args:
+        mp_file_name (str): path to a matpower data file
+        cache_dir (str, optional): a directory for cache images, by default
+            images are stored next to the source file
+        backend (str): 'struct' returns a Case, 'numpy' a ColumnarCase
+        mmap (bool): when True, the tables of a ColumnarCase are read-only
+            memory mapped views of the cache image, that are shared by all
+            processes loading the same image.  Components are only built
+            when the tables are indexed or iterated.
+        lazy (bool): when True, the tables of a Case are LazyComponentLists,
+            that build components when they are accessed
+    Returns:
+        Case: a grg_mpdata case (a ColumnarCase with the numpy backend)
+    '''
+
+    if backend not in ['struct', 'numpy']:
+        raise ValueError('unknown parsing backend \'%s\'' % backend)
+
+    image_path = cache_path(mp_file_name, cache_dir)
+
+    mmap = mmap and backend == 'numpy'
+    # the source is hashed on every load, a matching size and modification
+    # time do not prove that the content is unchanged (e.g. touch -r)
+    with open(mp_file_name, 'rb') as source_file:
+        stat = os.fstat(source_file.fileno())
+        source_bytes = source_file.read()
+    digest = hashlib.sha256(source_bytes).hexdigest()
+    header = _source_header(stat, digest)
+
+    image_header, case = _load_image(image_path, stat, digest, mmap)
+    if case is None:
+        case, case_warnings = _parse(source_bytes)
+        _write_image(image_path, header, case, case_warnings)
+        if mmap:
+            mapped_header, mapped_case = _load_image(image_path, stat,
+                                                     digest, True)
+            if mapped_case is not None:
+                case = mapped_case
+    else:
+        case_warnings = _header_warnings(image_header)
+        if image_header['mtime'] != stat.st_mtime_ns:
+            # the content is unchanged, only the header is out of date
+            _write_image(image_path, header, case, case_warnings)
+    _replay(case_warnings)
+
+    if backend == 'struct':
+        return case.to_case(lazy)
+    return case
+
+
+def map_case(mp_file_name, cache_dir=None):
+    '''a read-only columnar view of a matpower data file, whose tables are
+    memory mapped from its cache image (see load_case)
+
+    Args:
+        mp_file_name (str): path to a matpower data file
+        cache_dir (str, optional): a directory for cache images
+    Returns:
+        ColumnarCase: a case with read-only memory mapped tables
+    '''
+    return load_case(mp_file_name, cache_dir, backend='numpy', mmap=True)
@@ -3,6 +3,8 @@
 import argparse
 
 from grg_mpdata.io import parse_mp_case_file
+from grg_mpdata.io import parse_many
+from grg_mpdata.diff import diff_cases
 
 def compare_component_lists(list_1, list_2, comp_name, index_name = 'index'):
     '''compares two lists and prints the differences to stdout.  Objects in the
@@ -38,7 +40,7 @@ def compare_component_lists(list_1, list_2, comp_name, index_name = 'index'):
             comp_2 = list_2[index]
             if not comp_1 == comp_2:
                 print('different %s (%d): %d %d' % (comp_name, index, 
-                    getattr(comp_1, index_name), getattr(comp_1, index_name)))
+                    getattr(comp_1, index_name), getattr(comp_2, index_name)))
                 print('case 1: %s' % str(comp_1))
                 print('case 2: %s' % str(comp_2))
                 print('')
@@ -46,17 +48,26 @@ def compare_component_lists(list_1, list_2, comp_name, index_name = 'index'):
         return diff_count
 
 
-def diff(case_1, case_2):
+def diff(case_1, case_2, keyed=False, rtol=0.0, atol=0.0):
     '''Compares two :class:`grg_mpdata.struct.Case` objects and prints the 
     differences to stdout.
 
     Args:
         case_1: the first Matpower case
         case_2: the second Matpower case
+        keyed (bool): when True, components are matched by key rather than
+            by position (see :func:`grg_mpdata.diff.diff_cases`)
+        rtol (float): relative tolerance of keyed numeric comparisons
+        atol (float): absolute tolerance of keyed numeric comparisons
     Returns (int):
         returns the number of items that differed in the two cases
     '''
 
+    if keyed:
+        case_diff = diff_cases(case_1, case_2, rtol, atol)
+        print(str(case_diff))
+        return case_diff.count
+
     diff_count = 0
     if not case_1 == case_2:
         if not case_1.name == case_2.name:
@@ -94,9 +105,26 @@ def diff(case_1, case_2):
 
     return diff_count
 
-def eq(case_1, case_2):
-    if case_1 == case_2:
+def eq(case_1, case_2, render=True):
+    '''Tests if two :class:`grg_mpdata.struct.Case` objects are equal by
+    comparing their content fingerprints, and prints the result to stdout.
+    The fingerprints are computed from the current data of the cases, not
+    taken from their caches, so changes that were not tracked are seen.
+
+    Args:
+        case_1: the first Matpower case
+        case_2: the second Matpower case
+        render (bool): when True, the Matpower encodings of equal cases are
+            also compared, as a check of the implementation, set it to False
+            to only compare the fingerprints
+    Returns (bool):
+        True when the cases are equal
+    '''
+
+    if case_1.fingerprint(cached=False) == case_2.fingerprint(cached=False):
         print('the case file data structures are identical')
+        if not render:
+            return True
         case_1_str = case_1.to_matpower()
         case_2_str = case_2.to_matpower()
         if case_1_str == case_2_str:
@@ -110,6 +138,33 @@ def eq(case_1, case_2):
     return False
 
 
+def duplicates(paths, workers=None):
+    '''Finds the matpower data files with identical content, and prints
+    each group of duplicates to stdout.  Files are compared by their content
+    fingerprints, so files that only differ in formatting are duplicates.
+
+    Args:
+        paths(str or iterable): a directory, a glob pattern or an iterable
+            of paths (see :func:`grg_mpdata.io.parse_many`)
+        workers(int): the number of worker processes
+    Returns (list):
+        lists of the paths of duplicate files, each of two or more paths
+    '''
+
+    groups = {}
+    for result in parse_many(paths, workers=workers):
+        if result.ok:
+            groups.setdefault(result.case.fingerprint(), []) \
+                .append(result.path)
+        else:
+            print('%s: %s' % (result.path, result.error))
+
+    duplicate_groups = [x for x in groups.values() if len(x) > 1]
+    for group in duplicate_groups:
+        print(' '.join(group))
+    return duplicate_groups
+
+
 def build_cmd_parser():
     parser = argparse.ArgumentParser(
         description='''grg_mpdata.cmd provides tools for analyzing and
@@ -129,6 +184,19 @@ def build_cmd_parser():
         'differences between two case files')
     parser_diff.add_argument('file_1', help='a matpower data file (.m)')
     parser_diff.add_argument('file_2', help='a matpower data file (.m)')
+    parser_diff.add_argument('--keyed', action='store_true', help='match '
+        'components by key (e.g. bus_i) instead of by position')
+    parser_diff.add_argument('--rtol', type=float, default=0.0,
+        help='relative tolerance of numeric values (with --keyed)')
+    parser_diff.add_argument('--atol', type=float, default=0.0,
+        help='absolute tolerance of numeric values (with --keyed)')
+
+    parser_dups = subparsers.add_parser('dups', help = 'lists the case '
+        'files with identical content')
+    parser_dups.add_argument('paths', nargs='+', help='matpower data files '
+        '(.m), or one directory or glob pattern')
+    parser_dups.add_argument('--workers', type=int, default=None,
+        help='the number of worker processes')
 
     #parser.add_argument('--foo', help='foo help')
     version = __import__('grg_mpdata').__version__
@@ -150,13 +218,19 @@ def main(args):
         case_1 = parse_mp_case_file(args.file_1)
         case_2 = parse_mp_case_file(args.file_2)
 
-        return eq(case_1, case_2)
+        # freshly parsed cases have no untracked changes, so their
+        # fingerprints decide equality without rendering them
+        return eq(case_1, case_2, render=False)
 
     if args.cmd == 'diff':
          case_1 = parse_mp_case_file(args.file_1)
          case_2 = parse_mp_case_file(args.file_2)
 
-         return diff(case_1, case_2)
+         return diff(case_1, case_2, args.keyed, args.rtol, args.atol)
+
+    if args.cmd == 'dups':
+        paths = args.paths[0] if len(args.paths) == 1 else args.paths
+        return duplicates(paths, args.workers)
 
 
 if __name__ == '__main__':
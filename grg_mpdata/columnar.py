@@ -0,0 +1,568 @@
+'''a columnar (struct of arrays) encoding of matpower data, where each data
+table is stored as typed numpy columns named like the attributes of the
+corresponding grg_mpdata.struct components'''
+
+import inspect
+import warnings
+
+from collections import namedtuple
+
+import numpy
+
+from grg_mpdata.struct import Bus
+from grg_mpdata.struct import BusName
+from grg_mpdata.struct import Generator
+from grg_mpdata.struct import GeneratorCost
+from grg_mpdata.struct import Branch
+from grg_mpdata.struct import DCLine
+from grg_mpdata.struct import DCLineCost
+from grg_mpdata.struct import Case
+from grg_mpdata.struct import LazyComponentList
+from grg_mpdata.struct import _matpower_lines
+from grg_mpdata.struct import _write_lines
+
+from grg_mpdata.validation import any_rule
+from grg_mpdata.validation import bus_rules
+from grg_mpdata.validation import check_cost_pairs
+from grg_mpdata.validation import cost_rules
+from grg_mpdata.validation import status_rules
+from grg_mpdata.validation import validate_case
+from grg_mpdata.validation import _warn_rows as _warn_components
+
+from grg_mpdata.exception import MPDataParsingError
+from grg_mpdata.exception import MPDataValidationError
+from grg_mpdata.exception import MPDataWarning
+
+
+_TableSpec = namedtuple('_TableSpec',
+    ['component_class', 'fields', 'optional', 'vector'])
+
+_int = numpy.int64
+_float = numpy.float64
+
+
+def _spec(component_class, fields, optional=(), vector=None):
+    optional = tuple(optional)
+    fields = tuple(fields) + tuple((name, _float) for name in optional)
+    return _TableSpec(component_class, fields, optional, vector)
+
+
+_bus_spec = _spec(Bus,
+    [('bus_i', _int), ('bus_type', _int), ('pd', _float), ('qd', _float),
+     ('gs', _float), ('bs', _float), ('area', _int), ('vm', _float),
+     ('va', _float), ('base_kv', _float), ('zone', _int), ('vmax', _float),
+     ('vmin', _float)],
+    ['lam_p', 'lam_q', 'mu_vmax', 'mu_vmin'])
+
+_gen_spec = _spec(Generator,
+    [('index', _int), ('gen_bus', _int), ('pg', _float), ('qg', _float),
+     ('qmax', _float), ('qmin', _float), ('vg', _float), ('mbase', _float),
+     ('gen_status', _int), ('pmax', _float), ('pmin', _float),
+     ('pc1', _float), ('pc2', _float), ('qc1min', _float),
+     ('qc1max', _float), ('qc2min', _float), ('qc2max', _float),
+     ('ramp_agc', _float), ('ramp_10', _float), ('ramp_30', _float),
+     ('ramp_q', _float), ('apf', _float)],
+    ['mu_pmax', 'mu_pmin', 'mu_qmax', 'mu_qmin'])
+
+_branch_spec = _spec(Branch,
+    [('index', _int), ('f_bus', _int), ('t_bus', _int), ('br_r', _float),
+     ('br_x', _float), ('br_b', _float), ('rate_a', _float),
+     ('rate_b', _float), ('rate_c', _float), ('tap', _float),
+     ('shift', _float), ('br_status', _int), ('angmin', _float),
+     ('angmax', _float)],
+    ['pf', 'qf', 'pt', 'qt', 'mu_sf', 'mu_st', 'mu_angmin', 'mu_angmax'])
+
+_dcline_spec = _spec(DCLine,
+    [('index', _int), ('f_bus', _int), ('t_bus', _int), ('br_status', _int),
+     ('pf', _float), ('pt', _float), ('qf', _float), ('qt', _float),
+     ('vf', _float), ('vt', _float), ('pmin', _float), ('pmax', _float),
+     ('qminf', _float), ('qmaxf', _float), ('qmint', _float),
+     ('qmaxt', _float), ('loss0', _float), ('loss1', _float)],
+    ['mu_pmin', 'mu_pmax', 'mu_qminf', 'mu_qmaxf', 'mu_qmint', 'mu_qmaxt'])
+
+_cost_fields = [('index', _int), ('model', _int), ('startup', _float),
+                ('shutdown', _float), ('ncost', _int), ('cost_len', _int)]
+
+_gencost_spec = _spec(GeneratorCost, _cost_fields, vector='cost')
+
+_dclinecost_spec = _spec(DCLineCost, _cost_fields, vector='cost')
+
+_busname_spec = _spec(BusName, [('index', _int), ('name', str)])
+
+_table_specs = [
+    ('bus', _bus_spec),
+    ('gen', _gen_spec),
+    ('branch', _branch_spec),
+    ('gencost', _gencost_spec),
+    ('dcline', _dcline_spec),
+    ('dclinecost', _dclinecost_spec),
+    ('busname', _busname_spec),
+]
+
+
+class ColumnTable(object):
+    def __init__(self, spec, data):
+        '''A table of components stored as a numpy structured array, with one
+        typed column per component attribute.  Optional attributes with a
+        value of None are stored as NaN.  The coefficients of cost models
+        are stored as a padded 2D column named cost, where cost_len gives
+        the number of values used in each row.
+
+        Columns are accessed by name, e.g. table['pd'] or table.pd, while
+        integer indexing and iteration build component objects.
+
+        Args:
+            spec (_TableSpec): the encoding of the table's component type
+            data (numpy.ndarray): a one dimensional structured array
+        '''
+
+        self.spec = spec
+        self.data = data
+
+    @classmethod
+    def from_components(cls, spec, components):
+        '''builds a table from a list of grg_mpdata.struct components'''
+
+        columns = {}
+        for name, dtype in spec.fields:
+            if spec.vector is not None and name == spec.vector+'_len':
+                values = [len(getattr(x, spec.vector)) for x in components]
+            elif name in spec.optional:
+                values = [numpy.nan if v is None else v for v in
+                          [getattr(x, name) for x in components]]
+            else:
+                values = [getattr(x, name) for x in components]
+            columns[name] = numpy.array(values, dtype=dtype)
+
+        dtype = [(name, columns[name].dtype) for name, _ in spec.fields]
+
+        if spec.vector is not None:
+            vectors = [getattr(x, spec.vector) for x in components]
+            width = max([len(v) for v in vectors] + [0])
+            padded = numpy.zeros((len(components), width), dtype=_float)
+            for i, v in enumerate(vectors):
+                padded[i, :len(v)] = v
+            columns[spec.vector] = padded
+            dtype.append((spec.vector, _float, (width,)))
+
+        data = numpy.empty(len(components), dtype=dtype)
+        for name in columns:
+            data[name] = columns[name]
+
+        return cls(spec, data)
+
+    @classmethod
+    def from_matrix(cls, spec, matrix):
+        '''builds a table from a 2D numeric matrix, whose columns follow the
+        order of the matpower data specification.  Missing trailing columns
+        take the default values of the component constructor and row
+        positions are used as component indexes.
+
+        Args:
+            spec (_TableSpec): the encoding of the table's component type
+            matrix (numpy.ndarray): a 2D array with one row per component
+        Returns:
+            ColumnTable: the table encoded by the matrix
+        '''
+
+        rows, width = matrix.shape
+        names = [name for name, dtype in spec.fields]
+        dtype = [(name, dtype) for name, dtype in spec.fields]
+
+        if names[0] == 'index':
+            names = names[1:]
+        if spec.vector is not None:
+            names = names[:-1]
+            vector_width = max(width - len(names), 0)
+            dtype.append((spec.vector, _float, (vector_width,)))
+
+        parameters = inspect.signature(spec.component_class).parameters
+        required = [name for name in names
+                    if parameters[name].default is inspect.Parameter.empty]
+        if rows > 0 and (width < len(required) or
+                         (spec.vector is None and width > len(names))):
+            raise MPDataParsingError('matlab matrix parsing error, %s data '
+                'requires between %d and %d columns, given %d.' %
+                (spec.component_class.__name__, len(required), len(names),
+                 width))
+
+        data = numpy.empty(rows, dtype=dtype)
+        if 'index' in data.dtype.names:
+            data['index'] = numpy.arange(rows)
+        for i, name in enumerate(names):
+            if i < width:
+                column = matrix[:, i]
+                if data.dtype[name].kind == 'i':
+                    integral = column == numpy.round(column)
+                    if not numpy.all(integral):
+                        raise MPDataParsingError('matlab matrix parsing '
+                            'error, %s %s must be an integer, given %s.' %
+                            (spec.component_class.__name__, name,
+                             column[~integral][0]))
+                data[name] = column
+            else:
+                default = parameters[name].default
+                data[name] = numpy.nan if default is None else default
+        if spec.vector is not None:
+            data[spec.vector] = matrix[:, len(names):]
+            data[spec.vector+'_len'] = vector_width
+
+        return cls(spec, data)
+
+    @property
+    def columns(self):
+        '''the column names of this table'''
+        return self.data.dtype.names
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getattr__(self, name):
+        data = self.__dict__.get('data')
+        if data is not None and name in data.dtype.names:
+            return data[name]
+        raise AttributeError('%s has no column or attribute %s' %
+                             (self.__class__.__name__, name))
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self.data[key]
+        if isinstance(key, slice):
+            return self.__class__(self.spec, self.data[key])
+        if key < 0:
+            key += len(self.data)
+        if not 0 <= key < len(self.data):
+            raise IndexError('table index out of range')
+        return self._components(self.data[key:key+1])[0]
+
+    def __iter__(self):
+        return iter(self.to_components())
+
+    def __eq__(self, other):
+        if isinstance(other, self.__class__):
+            if self.columns != other.columns or len(self) != len(other):
+                return False
+            for name in self.columns:
+                column = self.data[name]
+                other_column = other.data[name]
+                if column.shape != other_column.shape:
+                    return False
+                equal_nan = column.dtype.kind == 'f'
+                if not numpy.array_equal(column, other_column,
+                                         equal_nan=equal_nan):
+                    return False
+            return True
+        return NotImplemented
+
+    def __ne__(self, other):
+        if isinstance(other, self.__class__):
+            return not self.__eq__(other)
+        return NotImplemented
+
+    def to_components(self):
+        '''Returns: a list of grg_mpdata.struct components'''
+        return self._components(self.data)
+
+    def _components(self, data):
+        spec = self.spec
+        names = [name for name, dtype in spec.fields]
+        columns = [data[name].tolist() for name in names]
+
+        optional = [i for i, name in enumerate(names) if name in spec.optional]
+        if len(optional) > 0:
+            for i in optional:
+                columns[i] = [None if v != v else v for v in columns[i]]
+
+        component_class = spec.component_class
+        if spec.vector is not None:
+            vector_len = columns.pop()
+            vectors = data[spec.vector].tolist()
+            return [component_class(*row, **{spec.vector: v[:l]})
+                    for row, v, l in zip(zip(*columns), vectors, vector_len)]
+
+        return [component_class(*row) for row in zip(*columns)]
+
+
+class ColumnarCase(object):
+    def __init__(self, name=None, version=None, baseMVA=None, bus=None,
+                 gen=None, branch=None, gencost=None, dcline=None,
+                 dclinecost=None, busname=None):
+        '''A columnar counterpart of grg_mpdata.struct.Case, where each data
+        table is a ColumnTable instead of a list of component objects.
+
+        Args:
+            name (str): textual name of the test case
+            version (str): indicates the version of the test case
+            baseMVA (float): the network MVA base value (MVA)
+            bus (ColumnTable): network buses
+            gen (ColumnTable): network generators
+            branch (ColumnTable): network branches
+            gencost (ColumnTable, optional): generator cost models
+            dcline (ColumnTable, optional): network DC lines
+            dclinecost (ColumnTable, optional): DC line cost models
+            busname (ColumnTable, optional): string names of items in bus list
+        '''
+
+        self.name = name
+        self.version = version
+        self.baseMVA = baseMVA
+        self.bus = bus
+        self.gen = gen
+        self.branch = branch
+        self.gencost = gencost
+        self.dcline = dcline
+        self.dclinecost = dclinecost
+        self.busname = busname
+
+    @classmethod
+    def from_case(cls, case):
+        '''builds a columnar case from a grg_mpdata.struct.Case
+
+        Args:
+            case (Case): the case to encode
+        Returns:
+            ColumnarCase: the columnar encoding of the case
+        '''
+
+        tables = {}
+        for table_name, spec in _table_specs:
+            components = getattr(case, table_name)
+            if components is not None:
+                tables[table_name] = ColumnTable.from_components(spec,
+                                                                 components)
+        return cls(case.name, case.version, case.baseMVA, **tables)
+
+    @classmethod
+    def from_matrices(cls, name, version, baseMVA, matrices, busname=None):
+        '''builds a columnar case from 2D numeric matrices
+
+        Args:
+            name (str): textual name of the test case
+            version (str): indicates the version of the test case
+            baseMVA (float): the network MVA base value (MVA)
+            matrices (dict): maps table names (e.g. 'bus', 'gencost') to 2D
+                numeric arrays following the matpower data specification
+            busname (list of BusName, optional): string names of items in
+                bus list
+        Returns:
+            ColumnarCase: the columnar case
+        '''
+
+        tables = {}
+        for table_name, spec in _table_specs:
+            if table_name in matrices:
+                tables[table_name] = ColumnTable.from_matrix(spec,
+                    matrices[table_name])
+        if busname is not None:
+            tables['busname'] = ColumnTable.from_components(_busname_spec,
+                                                            busname)
+        return cls(name, version, baseMVA, **tables)
+
+    def validate(self, summary=False):
+        '''Checks that this data structure conforms to the Matpower data
+        specification.  The checks and warnings are the same as those of
+        grg_mpdata.struct.Case.validate, but rows are tested a column at a
+        time.
+
+        Args:
+            summary (bool): when True, one warning is emitted for each
+                broken rule instead of one for each offending row
+        Returns:
+            ValidationReport: the rule violations, when summary is True
+        '''
+
+        if summary:
+            report = validate_case(self)
+            report.warn(summary=True)
+            return report
+
+        if self.version is None:
+            raise MPDataValidationError('case has no version')
+        if self.name is None:
+            raise MPDataValidationError('case has no name')
+        if self.baseMVA is None:
+            raise MPDataValidationError('case has no baseMVA value')
+        if self.bus is None:
+            raise MPDataValidationError('case has no buses')
+        if self.gen is None:
+            raise MPDataValidationError('case has no generators')
+        if self.branch is None:
+            raise MPDataValidationError('case has no branches')
+
+        if self.version != '\'2\'':
+            warnings.warn('this data structure was designed for only version '
+                '\'2\'. Given %s' % self.version, MPDataWarning)
+
+        _warn_rows(self.bus, bus_rules(self.bus))
+
+        if self.busname is not None:
+            if len(self.bus) != len(self.busname):
+                raise MPDataValidationError('number of given bus names does '
+                    'not match the number of buses')
+
+        if self.gencost is not None:
+            if not (len(self.gencost) == len(self.gen) or
+                    len(self.gencost) == 2*len(self.gen)):
+                raise MPDataValidationError('number of gencost items does not '
+                    'match the number of generators')
+            _warn_rows(self.gencost, cost_rules(self.gencost))
+            check_cost_pairs(self.gen, self.gencost)
+
+        if self.dclinecost is not None:
+            _warn_rows(self.dclinecost, cost_rules(self.dclinecost))
+
+        _warn_rows(self.branch, status_rules(self.branch))
+
+        if self.dcline is not None:
+            _warn_rows(self.dcline, status_rules(self.dcline))
+
+    def to_matpower(self):
+        '''Returns: a Matpower encoding of this data structure as a string,
+        identical to that of the equivalent grg_mpdata.struct.Case
+        '''
+        return '\n'.join(self._matpower_lines())
+
+    def write_matpower(self, output_file, chunk_size=65536):
+        '''Writes the Matpower encoding of this data structure to a file
+        object.  The output is identical to that of to_matpower.
+
+        Args:
+            output_file: a writable text file object
+            chunk_size (int): the approximate number of characters sent to
+                the file in each write
+        '''
+        _write_lines(self._matpower_lines(), output_file, chunk_size)
+
+    def _matpower_lines(self):
+        return _matpower_lines(self, _table_rows, _table_extended)
+
+    def to_case(self, lazy=False):
+        '''Args:
+            lazy (bool): when True, the tables of the case are
+                LazyComponentLists, that build components when they are
+                accessed
+        Returns:
+            Case: the grg_mpdata.struct.Case encoded by this data structure
+        '''
+
+        tables = {}
+        for table_name, spec in _table_specs:
+            table = getattr(self, table_name)
+            if table is not None:
+                if lazy:
+                    tables[table_name] = LazyComponentList(
+                        range(0, len(table)), _table_builder(table))
+                else:
+                    tables[table_name] = table.to_components()
+        return Case(self.name, self.version, self.baseMVA, **tables)
+
+    def __eq__(self, other):
+        if isinstance(other, self.__class__):
+            return self.__dict__ == other.__dict__
+        return NotImplemented
+
+    def __ne__(self, other):
+        if isinstance(other, self.__class__):
+            return not self.__eq__(other)
+        return NotImplemented
+
+
+def _table_builder(table):
+    '''a component builder for a LazyComponentList of table rows'''
+    def build(index, row):
+        return table[row]
+    return build
+
+
+def _warn_rows(table, rules):
+    '''emits the warnings of the rows that break any of the given rules'''
+    _warn_components(table, numpy.flatnonzero(any_rule(rules)))
+
+
+def _format_column(column, optional=False):
+    '''formats a numeric column as the str() encoding of its values.  Each
+    distinct value (by bit pattern, so -0.0 and 0.0 stay apart) is
+    formatted only once.
+
+    Args:
+        column (numpy.ndarray): a one dimensional numeric array
+        optional (bool): if NaN values encode None
+    Returns:
+        list of str: the encoding of each value in the column
+    '''
+
+    if column.dtype.kind == 'f':
+        bits, inverse = numpy.unique(column.view(numpy.int64),
+                                     return_inverse=True)
+        values = bits.view(numpy.float64).tolist()
+        if optional:
+            strings = ['None' if v != v else repr(v) for v in values]
+        else:
+            strings = [repr(v) for v in values]
+    else:
+        values, inverse = numpy.unique(column, return_inverse=True)
+        strings = [repr(v) for v in values.tolist()]
+
+    return numpy.array(strings, dtype=object)[inverse].tolist()
+
+
+def _table_rows(table, formatted=None):
+    '''renders a ColumnTable as matpower table rows, formatting a column at
+    a time
+
+    Args:
+        table (ColumnTable): the table to render
+        formatted (dict, optional): maps field names to the already
+            formatted values of their columns
+    Returns:
+        list of str: one table row for each table item
+    '''
+
+    component_class = table.spec.component_class
+    if len(table) == 0:
+        return []
+
+    if not hasattr(component_class, '_matpower_fields'):
+        return ['\t'+x.to_matpower()+';' for x in table]
+
+    fields = component_class._matpower_fields
+    if formatted is None:
+        formatted = {}
+    columns = [formatted[name] if name in formatted else
+               _format_column(table[name]) for name in fields]
+    rows = ['\t' + '\t '.join(row) for row in zip(*columns)]
+
+    for group in component_class._matpower_extensions:
+        present = numpy.zeros(len(table), dtype=bool)
+        for name in group:
+            present |= ~numpy.isnan(table[name])
+        if numpy.any(present):
+            group_columns = [_format_column(table[name], True)
+                             for name in group]
+            rows = [row + ''.join(['\t ' + x for x in values])
+                    if is_present else row for row, values, is_present in
+                    zip(rows, zip(*group_columns), present.tolist())]
+
+    vector = component_class._matpower_vector
+    if vector is not None:
+        vector_columns = [_format_column(column) for column in
+                          table[vector].T]
+        vector_rows = zip(*vector_columns) if len(vector_columns) > 0 \
+            else [()] * len(table)
+        vector_len = table[vector+'_len'].tolist()
+        rows = [row + ''.join(['\t ' + x for x in values[:length]])
+                for row, values, length in
+                zip(rows, vector_rows, vector_len)]
+
+    return [row + ';' for row in rows]
+
+
+def _table_extended(table):
+    '''Returns: True if any item of the table is extended, i.e. has any of
+    the first group of optional fields
+    '''
+    extensions = table.spec.component_class._matpower_extensions
+    if len(extensions) == 0:
+        return False
+    return any([numpy.any(~numpy.isnan(table[name]))
+                for name in extensions[0]])
@@ -0,0 +1,81 @@
+'''n-1 contingency cases.  A contingency case is an overlay of a base case,
+that shares all of the base case's components except for a copy of the
+outaged component, whose status is set to zero.  Contingency cases
+are generated one at a time, so enumerating thousands of contingencies
+takes about as much memory as the base case.'''
+
+import copy
+
+from grg_mpdata.struct import Case
+from grg_mpdata.struct import OverlayComponentList
+from grg_mpdata.struct import _case_tables
+
+
+# the status field of the components that can be outaged
+_status_fields = {
+    'branch': 'br_status',
+    'gen': 'gen_status',
+    'dcline': 'br_status',
+}
+
+
+def outage_case(case, table_name, position, name=None):
+    '''an overlay of a case with one component out of service.  Each table
+    of the overlay is an OverlayComponentList over the table of the given
+    case.  update_component copies a shared component before changing it,
+    so it leaves the given case unchanged, but fields of shared components
+    assigned directly are changed in both cases.
+
+    Args:
+        case (Case): the base case
+        table_name (str): 'branch', 'gen' or 'dcline'
+        position (int): the position of the outaged component in its table
+        name (str, optional): the name of the overlay, by default
+            <name>_<table>_<position>
+    Returns:
+        Case: the contingency case
+    '''
+
+    if not table_name in _status_fields:
+        raise ValueError('unknown outage table \'%s\'' % table_name)
+
+    table = getattr(case, table_name)
+    outaged = copy.copy(table[position])
+    setattr(outaged, _status_fields[table_name], 0)
+
+    tables = dict([(x, getattr(case, x)) for x in _case_tables])
+    for x, base in tables.items():
+        if base is not None:
+            tables[x] = OverlayComponentList(base, {})
+    tables[table_name] = OverlayComponentList(table, {position: outaged})
+    if name is None:
+        name = '%s_%s_%d' % (case.name, table_name, position % len(table))
+
+    return Case(name=name, version=case.version, baseMVA=case.baseMVA,
+                **tables)
+
+
+def n_minus_one(case, tables=('branch', 'gen')):
+    '''generates the n-1 contingencies of a case, one for each component of
+    the given tables that is in service (status greater than zero)
+
+    Args:
+        case (Case): the base case
+        tables (tuple): the tables whose components are outaged, from
+            'branch', 'gen' and 'dcline'
+    Yields:
+        tuple: the table name, the position of the outaged component and
+        its contingency case (see outage_case)
+    '''
+
+    for table_name in tables:
+        if not table_name in _status_fields:
+            raise ValueError('unknown outage table \'%s\'' % table_name)
+        table = getattr(case, table_name)
+        if table is None:
+            continue
+        status_field = _status_fields[table_name]
+        for position, component in enumerate(table):
+            if getattr(component, status_field) > 0:
+                yield table_name, position, outage_case(case, table_name,
+                                                        position)
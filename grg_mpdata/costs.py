@@ -0,0 +1,485 @@
+'''vectorized evaluation and conversion of matpower cost models.  The cost
+models of a table (e.g. gencost) are packed into padded arrays, the
+breakpoints of piecewise linear models (model 1) and the coefficients of
+polynomial models (model 2), so that the costs of a batch of dispatch points
+are evaluated for all models at once, and all models of a table are
+converted from one model to the other at once.'''
+
+import numpy
+
+from grg_mpdata.columnar import ColumnarCase
+from grg_mpdata.columnar import ColumnTable
+from grg_mpdata.columnar import _gencost_spec
+from grg_mpdata.exception import MPDataValidationError
+from grg_mpdata.struct import Case
+from grg_mpdata.struct import _case_tables
+from grg_mpdata.topology import _columns
+
+
+class CostModels(object):
+    def __init__(self, costs):
+        '''The cost models of a cost table, packed into padded arrays.  Rows
+        with an undefined model evaluate to nan.
+
+        Args:
+            costs (list of MatpowerCost or ColumnTable): the cost models,
+                e.g. case.gencost
+        '''
+
+        if not isinstance(costs, ColumnTable):
+            costs = ColumnTable.from_components(_gencost_spec, costs)
+
+        self.index = numpy.array(costs['index'])
+        self.model = numpy.array(costs['model'])
+        self.startup = numpy.array(costs['startup'])
+        self.shutdown = numpy.array(costs['shutdown'])
+        self.ncost = numpy.array(costs['ncost'])
+        self.pwl = self.model == 1
+        self.polynomial = self.model == 2
+
+        values = costs['cost']
+        length = numpy.asarray(costs['cost_len'])
+        rows = numpy.arange(len(costs))[:, numpy.newaxis]
+
+        # polynomial coefficients, in increasing order of the powers of x
+        terms = numpy.where(self.polynomial, numpy.minimum(self.ncost, length),
+                            0)
+        powers = numpy.arange(max(terms.max(initial=0), 1))
+        source = terms[:, numpy.newaxis] - 1 - powers[numpy.newaxis, :]
+        self.coefficients = numpy.where(source >= 0,
+            values[rows, numpy.maximum(source, 0)] if values.size else 0.0,
+            0.0)
+        self.degree = numpy.maximum(terms - 1, 0)
+
+        # breakpoints of the piecewise linear models, padded with nan
+        self.points = numpy.where(self.pwl,
+                                  numpy.minimum(self.ncost, length // 2), 0)
+        width = max(self.points.max(initial=0), 1)
+        padding = numpy.arange(width)[numpy.newaxis, :] >= \
+            self.points[:, numpy.newaxis]
+        self.x = numpy.where(padding, numpy.nan, values[:, 0:2*width:2]
+                             if values.size else numpy.nan)
+        self.y = numpy.where(padding, numpy.nan, values[:, 1:2*width:2]
+                             if values.size else numpy.nan)
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            self.slopes = numpy.diff(self.y, axis=1) / \
+                numpy.diff(self.x, axis=1)
+
+    def __len__(self):
+        return len(self.model)
+
+    def _dispatch(self, dispatch):
+        dispatch = numpy.asarray(dispatch, dtype=float)
+        if dispatch.ndim == 0 or dispatch.shape[-1] != len(self):
+            raise ValueError('dispatch points must have one value per cost '
+                             'model (%d)' % len(self))
+        return dispatch
+
+    def _segments(self, dispatch):
+        '''the index of the segment of each piecewise linear model that
+        evaluates a dispatch point, the first and last segments are extended
+        beyond the breakpoints'''
+        segment = numpy.zeros(dispatch.shape, dtype=numpy.int64)
+        for k in range(1, self.x.shape[1] - 1):
+            inner = k < self.points - 1
+            segment += (dispatch > self.x[:, k]) & inner
+        return segment
+
+    def evaluate(self, dispatch):
+        '''Args:
+            dispatch (array): dispatch points, with one value per cost model
+                along the last axis, e.g. a matrix with one row per point
+        Returns:
+            array: the cost of each model at each dispatch point, with the
+            shape of dispatch
+        '''
+
+        dispatch = self._dispatch(dispatch)
+
+        polynomial = numpy.zeros(dispatch.shape)
+        for power in range(self.coefficients.shape[1]-1, -1, -1):
+            polynomial = polynomial*dispatch + self.coefficients[:, power]
+
+        rows = numpy.arange(len(self))
+        segment = self._segments(dispatch)
+        slope = numpy.nan_to_num(self.slopes[rows, segment]) if \
+            self.slopes.shape[1] else 0.0
+        pwl = self.y[rows, segment] + \
+            slope*(dispatch - self.x[rows, segment])
+
+        return numpy.where(self.pwl, pwl,
+                           numpy.where(self.polynomial, polynomial, numpy.nan))
+
+    def marginal(self, dispatch):
+        '''Args:
+            dispatch (array): dispatch points, as in evaluate
+        Returns:
+            array: the marginal cost of each model at each dispatch point.
+            At a breakpoint of a piecewise linear model, it is the slope of
+            the segment below the breakpoint.
+        '''
+
+        dispatch = self._dispatch(dispatch)
+
+        polynomial = numpy.zeros(dispatch.shape)
+        for power in range(self.coefficients.shape[1]-1, 0, -1):
+            polynomial = polynomial*dispatch + \
+                power*self.coefficients[:, power]
+
+        pwl = 0.0
+        if self.slopes.shape[1]:
+            segment = self._segments(dispatch)
+            pwl = numpy.nan_to_num(self.slopes[numpy.arange(len(self)),
+                                               segment])
+
+        return numpy.where(self.pwl, pwl,
+                           numpy.where(self.polynomial, polynomial, numpy.nan))
+
+    def _segment_mask(self):
+        return numpy.arange(self.slopes.shape[1])[numpy.newaxis, :] < \
+            (self.points - 1)[:, numpy.newaxis]
+
+    def increasing_breakpoints(self):
+        '''Returns:
+            array of bool: True for the piecewise linear models whose
+            breakpoints are strictly increasing in x, False for the other
+            models
+        '''
+        with numpy.errstate(invalid='ignore'):
+            steps = numpy.diff(self.x, axis=1) > 0
+        return self.pwl & numpy.all(steps | ~self._segment_mask(), axis=1)
+
+    def convex(self):
+        '''Returns:
+            array of bool: True for the models that are convex, i.e. the
+            piecewise linear models whose slopes are non-decreasing and the
+            polynomial models of degree two or less whose quadratic
+            coefficient is non-negative.  Polynomial models of a higher
+            degree are only reported convex when their coefficients above
+            the quadratic one are zero.
+        '''
+
+        mask = self._segment_mask()
+        inner = mask[:, 1:]
+        with numpy.errstate(invalid='ignore'):
+            steps = numpy.diff(self.slopes, axis=1)
+            scale = numpy.abs(self.slopes[:, 1:]) + \
+                numpy.abs(self.slopes[:, :-1])
+            pwl = numpy.all((steps >= -1e-12*scale) | ~inner, axis=1)
+        pwl &= self.increasing_breakpoints() | (self.points < 2)
+
+        quadratic = self.coefficients[:, 2] if \
+            self.coefficients.shape[1] > 2 else numpy.zeros(len(self))
+        polynomial = (quadratic >= 0) & \
+            numpy.all(self.coefficients[:, 3:] == 0, axis=1)
+
+        return numpy.where(self.pwl, pwl, self.polynomial & polynomial)
+
+    def monotone(self, lower=None, upper=None, samples=8):
+        '''Args:
+            lower (float or array, optional): the lower bound of the dispatch
+                range of the polynomial models, e.g. the pmin of the
+                generators, required when there are polynomial models
+            upper (float or array, optional): the upper bound of the dispatch
+                range of the polynomial models, e.g. the pmax of the
+                generators, required when there are polynomial models
+            samples (int): the number of points of the dispatch range where
+                the marginal costs of polynomial models are checked, which is
+                exact for polynomials of degree two or less
+        Returns:
+            array of bool: True for the models whose cost does not decrease,
+            i.e. the piecewise linear models with strictly increasing
+            breakpoints and non-negative slopes and the polynomial models
+            with non-negative marginal costs over the dispatch range
+        '''
+
+        with numpy.errstate(invalid='ignore'):
+            pwl = numpy.all((self.slopes >= 0) | ~self._segment_mask(),
+                            axis=1)
+        pwl &= self.increasing_breakpoints() | (self.points < 2)
+
+        if not numpy.any(self.polynomial):
+            return self.pwl & pwl
+        if lower is None or upper is None:
+            raise ValueError('the dispatch range (lower and upper) is '
+                             'required to check polynomial models')
+
+        lower = numpy.broadcast_to(numpy.asarray(lower, dtype=float),
+                                   (len(self),))
+        upper = numpy.broadcast_to(numpy.asarray(upper, dtype=float),
+                                   (len(self),))
+        fractions = numpy.linspace(0.0, 1.0, max(samples, 2))
+        points = lower + fractions[:, numpy.newaxis]*(upper - lower)
+        marginal = self.marginal(points)
+        polynomial = numpy.all(numpy.nan_to_num(marginal, nan=-1.0) >= 0,
+                               axis=0)
+
+        return numpy.where(self.pwl, pwl, self.polynomial & polynomial)
+
+
+def generator_costs(case):
+    '''the cost models of the generators of a case.  In the 2x layout, the
+    second half of gencost are the reactive power cost models.
+
+    Args:
+        case (Case or ColumnarCase): a case with generator costs
+    Returns:
+        tuple: the CostModels of the active power and of the reactive power,
+        which is None when the case has no reactive power costs
+    '''
+
+    gencost = case.gencost
+    if gencost is None:
+        raise MPDataValidationError('case has no gencost table')
+    if not isinstance(gencost, ColumnTable):
+        gencost = ColumnTable.from_components(_gencost_spec, gencost)
+
+    count = len(case.gen)
+    if len(gencost) == count:
+        return CostModels(gencost), None
+    if len(gencost) == 2*count:
+        return CostModels(gencost[:count]), CostModels(gencost[count:])
+    raise MPDataValidationError('number of gencost items does not match the '
+                                'number of gens')
+
+
+def total_cost(case, pg, qg=None):
+    '''the total generation cost of a case at dispatch points
+
+    Args:
+        case (Case or ColumnarCase): a case with generator costs
+        pg (array): the active power of each generator (MW), along the last
+            axis, e.g. a matrix with one row per dispatch point
+        qg (array, optional): the reactive power of each generator (MVAr),
+            its cost is added when the case has reactive power costs
+    Returns:
+        array: the total cost at each dispatch point
+    '''
+
+    active, reactive = generator_costs(case)
+    total = active.evaluate(pg).sum(axis=-1)
+    if qg is not None and reactive is not None:
+        total = total + reactive.evaluate(qg).sum(axis=-1)
+    return total
+
+
+def _components(costs):
+    if isinstance(costs, ColumnTable):
+        return costs.to_components()
+    return list(costs)
+
+
+def _cost_table(components, convert, model, values):
+    '''new cost components, with the given model and cost values for the
+    converted rows and copies of the other rows'''
+    table = []
+    for component, converted, row in zip(components, convert, values):
+        if converted:
+            cost = row.tolist()
+            ncost = len(cost) // 2 if model == 1 else len(cost)
+            table.append(component.__class__(component.index, model,
+                component.startup, component.shutdown, ncost, cost))
+        else:
+            table.append(component.__class__(component.index,
+                component.model, component.startup, component.shutdown,
+                component.ncost, component.cost))
+    return table
+
+
+def _least_squares(x, y, fitted, degree):
+    '''least squares fits of polynomials to rows of points, on x scaled to
+    [-1, 1], where the points of a row are padded with nan and the
+    polynomial of a row has a degree of at most fitted
+
+    Returns:
+        array: the coefficients of each fit, in increasing order of the
+        powers of x
+    '''
+    powers = numpy.arange(degree+1)
+    valid = ~numpy.isnan(x) & ~numpy.isnan(y)
+    scale = numpy.max(numpy.where(valid, numpy.abs(x), 0.0), axis=1,
+                      initial=0.0)
+    scale[scale == 0] = 1.0
+    scaled = numpy.where(valid, x, 0.0) / scale[:, numpy.newaxis]
+    vandermonde = scaled[:, :, numpy.newaxis] ** powers * \
+        valid[:, :, numpy.newaxis] * \
+        (powers <= fitted[:, numpy.newaxis])[:, numpy.newaxis, :]
+    fit = numpy.matmul(numpy.linalg.pinv(vandermonde),
+                       numpy.where(valid, y, 0.0)[:, :, numpy.newaxis])
+    return fit[:, :, 0] / scale[:, numpy.newaxis] ** powers
+
+
+def to_polynomial(costs, degree=2, lower=None, upper=None):
+    '''converts cost models to polynomials of a given degree.  The
+    polynomials of piecewise linear models are least squares fits of their
+    breakpoints, which interpolate the breakpoints of models with degree+1
+    breakpoints or less.  Polynomial models of a lower degree are padded
+    with zero coefficients, and polynomial models of a higher degree are
+    refitted by least squares to equally spaced samples of the polynomial
+    over its dispatch range.  Models with an undefined model value are
+    copied.
+
+    Args:
+        costs (list of MatpowerCost or ColumnTable): the cost models, e.g.
+            case.gencost or case.dclinecost
+        degree (int): the degree of the polynomials, e.g. 2 for quadratic
+            cost models
+        lower (float or array, optional): the lower bound of the dispatch
+            range of each model, e.g. the pmin of the generators, required
+            when there are polynomial models of a higher degree
+        upper (float or array, optional): the upper bound of the dispatch
+            range of each model, required when there are polynomial models
+            of a higher degree, a range that is empty is extended to
+            lower + 1
+    Returns:
+        list of MatpowerCost: the new cost models, of the class of the given
+        ones
+    '''
+
+    if degree < 0:
+        raise ValueError('the polynomial degree must be non-negative')
+
+    models = CostModels(costs)
+    count = len(models)
+    x = models.x
+    y = models.y
+    points = models.points
+
+    # equally spaced samples of the polynomials of a higher degree, twice as
+    # many as the coefficients of the highest degree
+    refit = models.polynomial & (models.degree > degree)
+    if numpy.any(refit):
+        if lower is None or upper is None:
+            raise ValueError('the dispatch range (lower and upper) is '
+                             'required to refit polynomials of a degree '
+                             'higher than %d' % degree)
+        lower = numpy.broadcast_to(numpy.asarray(lower, dtype=float),
+                                   (count,))
+        upper = numpy.broadcast_to(numpy.asarray(upper, dtype=float),
+                                   (count,))
+        upper = numpy.where(upper > lower, upper, lower + 1.0)
+        samples = 2*models.coefficients.shape[1]
+        fractions = numpy.linspace(0.0, 1.0, samples)
+        sampled = lower + fractions[:, numpy.newaxis]*(upper - lower)
+        values = models.evaluate(sampled)
+
+        width = max(x.shape[1], samples)
+        x = numpy.pad(x, ((0, 0), (0, width - x.shape[1])),
+                      constant_values=numpy.nan)
+        y = numpy.pad(y, ((0, 0), (0, width - y.shape[1])),
+                      constant_values=numpy.nan)
+        x[refit, :samples] = sampled.T[refit]
+        y[refit, :samples] = values.T[refit]
+        points = numpy.where(refit, samples, points)
+
+    fit = _least_squares(x, y, numpy.minimum(degree, points - 1), degree)
+
+    padded = numpy.zeros((count, degree+1))
+    width = min(models.coefficients.shape[1], degree+1)
+    padded[:, :width] = models.coefficients[:, :width]
+
+    coefficients = numpy.where((models.pwl | refit)[:, numpy.newaxis], fit,
+                               padded)
+    return _cost_table(_components(costs), models.pwl | models.polynomial, 2,
+                       coefficients[:, ::-1])
+
+
+def to_pwl(costs, lower, upper, segments=4):
+    '''converts cost models to piecewise linear models.  The breakpoints of
+    a polynomial model are equally spaced samples of the polynomial over its
+    dispatch range.  Piecewise linear models and models with an undefined
+    model value are copied.
+
+    Args:
+        costs (list of MatpowerCost or ColumnTable): the cost models, e.g.
+            case.gencost or case.dclinecost
+        lower (float or array): the lower bound of the dispatch range of
+            each model, e.g. the pmin of the generators
+        upper (float or array): the upper bound of the dispatch range of
+            each model, a range that is empty is extended to lower + 1, so
+            that the breakpoints are strictly increasing
+        segments (int): the number of segments of the piecewise linear
+            models
+    Returns:
+        list of MatpowerCost: the new cost models, of the class of the given
+        ones
+    '''
+
+    if segments < 1:
+        raise ValueError('piecewise linear models need at least one segment')
+
+    models = CostModels(costs)
+    count = len(models)
+    lower = numpy.broadcast_to(numpy.asarray(lower, dtype=float), (count,))
+    upper = numpy.broadcast_to(numpy.asarray(upper, dtype=float), (count,))
+    upper = numpy.where(upper > lower, upper, lower + 1.0)
+
+    fractions = numpy.linspace(0.0, 1.0, segments+1)
+    x = lower + fractions[:, numpy.newaxis]*(upper - lower)
+    x[-1] = upper
+
+    values = numpy.empty((count, 2*(segments+1)))
+    values[:, 0::2] = x.T
+    values[:, 1::2] = models.evaluate(x).T
+    return _cost_table(_components(costs), models.polynomial, 1, values)
+
+
+def _cost_bounds(costs, owners, owner_name, fields, reactive_fields=None):
+    '''the dispatch range of each cost model of a table, including the
+    reactive power models of a 2x layout'''
+    lower, upper = _columns(owners, fields)
+    if len(costs) == len(owners):
+        return lower, upper
+    if reactive_fields is not None and len(costs) == 2*len(owners):
+        reactive_lower, reactive_upper = _columns(owners, reactive_fields)
+        return numpy.concatenate((lower, reactive_lower)), \
+            numpy.concatenate((upper, reactive_upper))
+    raise MPDataValidationError('number of %scost items does not match the '
+                                'number of %ss' % (owner_name, owner_name))
+
+
+def convert_costs(case, model, degree=2, segments=4, name=None):
+    '''a case whose generator and DC line cost models are all converted to
+    one model (see to_polynomial and to_pwl).  The dispatch range of the
+    cost models of generators, which the piecewise linear models span and
+    where polynomials of a higher degree are refitted, is [pmin, pmax], or
+    [qmin, qmax] for the reactive power models of a 2x layout, and that of
+    DC lines is [pmin, pmax].  The other tables are shared with the given
+    case.
+
+    Args:
+        case (Case or ColumnarCase): the case to convert
+        model (int): the model of the converted costs, piecewise linear = 1,
+            polynomial = 2
+        degree (int): the degree of the polynomial models
+        segments (int): the number of segments of the piecewise linear
+            models
+        name (str, optional): the name of the new case, by default the name
+            of the given case
+    Returns:
+        Case: the case with the converted cost models
+    '''
+
+    if not model in (1, 2):
+        raise ValueError('unknown cost model %s, only the models 1 and 2 are '
+                         'defined' % model)
+    if isinstance(case, ColumnarCase):
+        case = case.to_case()
+
+    tables = dict([(x, getattr(case, x)) for x in _case_tables])
+    for table_name, owner_name, fields, reactive_fields in [
+            ('gencost', 'gen', ['pmin', 'pmax'], ['qmin', 'qmax']),
+            ('dclinecost', 'dcline', ['pmin', 'pmax'], None)]:
+        costs = tables[table_name]
+        if costs is None:
+            continue
+        owners = tables[owner_name]
+        lower, upper = _cost_bounds(costs, [] if owners is None else owners,
+                                    owner_name, fields, reactive_fields)
+        if model == 2:
+            tables[table_name] = to_polynomial(costs, degree, lower, upper)
+        else:
+            tables[table_name] = to_pwl(costs, lower, upper, segments)
+
+    return Case(name=case.name if name is None else name,
+                version=case.version, baseMVA=case.baseMVA, **tables)
@@ -0,0 +1,197 @@
+'''dc power flow and the sensitivity matrices of matpower cases.  The B
+matrices follow the conventions of matpower's makeBdc, and the power flow
+those of its rundcpf.  The reduced B matrix is factorized once per network
+and the factorization is reused by every solve, so many injection scenarios
+are solved as the columns of one matrix.  This module requires scipy (pip
+install grg-mpdata[sparse]).'''
+
+import numpy
+
+try:
+    import scipy.sparse
+    import scipy.sparse.linalg
+except ImportError:
+    scipy = None
+
+from grg_mpdata.admittance import _require_scipy
+from grg_mpdata.admittance import branch_terminals
+from grg_mpdata.exception import MPDataValidationError
+from grg_mpdata.filters import _in_service
+from grg_mpdata.topology import _bus_positions
+from grg_mpdata.topology import _columns
+
+
+class DCNetwork(object):
+    def __init__(self, case):
+        '''The dc model of a case's network.  Buses are numbered by their
+        position in the bus table and injections and flows are in per unit.
+
+        Args:
+            case (Case or ColumnarCase): the case, whose first reference bus
+                (bus_type 3) is the slack bus
+        '''
+
+        _require_scipy()
+
+        bus_ids, bus_type, va, gs = _columns(case.bus, ['bus_i', 'bus_type',
+                                                        'va', 'gs'])
+        x, tap, shift, status = _columns(case.branch, ['br_x', 'tap',
+                                                       'shift', 'br_status'])
+        f, t = branch_terminals(case, bus_ids.astype(numpy.int64))
+
+        reference = numpy.flatnonzero(bus_type == 3)
+        if len(reference) == 0:
+            raise MPDataValidationError('case has no reference bus')
+
+        bus_count = len(bus_ids)
+        branch_count = len(f)
+        rows = numpy.arange(branch_count)
+
+        on = _in_service(status)
+        susceptance = numpy.zeros(branch_count)
+        susceptance[on] = 1.0/x[on]
+        susceptance /= numpy.where(tap == 0.0, 1.0, tap)
+
+        #: the bus ids (bus_i) of the buses
+        self.bus_ids = bus_ids.astype(numpy.int64)
+        #: the case's base MVA
+        self.baseMVA = case.baseMVA
+        #: the position of the slack bus
+        self.reference = int(reference[0])
+        #: the voltage angle of the slack bus (radians)
+        self.reference_angle = numpy.radians(va[self.reference])
+        #: the branch incidence matrix (branches x buses), +1 at the from
+        #: bus and -1 at the to bus
+        self.incidence = scipy.sparse.csr_matrix((numpy.concatenate(
+            [numpy.ones(branch_count), -numpy.ones(branch_count)]),
+            (numpy.concatenate([rows, rows]), numpy.concatenate([f, t]))),
+            (branch_count, bus_count))
+        #: the branch flows of the bus voltage angles (branches x buses)
+        self.bf = scipy.sparse.diags(susceptance, format='csr') @ \
+            self.incidence
+        #: the bus injections of the bus voltage angles (buses x buses)
+        self.bbus = scipy.sparse.csc_matrix(self.incidence.T @ self.bf)
+        #: the branch flows of the phase shifters
+        self.pfinj = susceptance*-numpy.radians(shift)
+        #: the bus injections of the phase shifters
+        self.pbusinj = self.incidence.T @ self.pfinj
+        #: the bus injections of the shunt conductances
+        self.gsinj = gs/self.baseMVA
+
+        self._others = numpy.delete(numpy.arange(bus_count), self.reference)
+        self._factor = None
+
+    @property
+    def factor(self):
+        '''the sparse LU factorization of the B matrix without the slack
+        bus, computed on first use'''
+        if self._factor is None:
+            reduced = self.bbus[self._others, :][:, self._others]
+            try:
+                self._factor = scipy.sparse.linalg.splu(
+                    scipy.sparse.csc_matrix(reduced))
+            except RuntimeError:
+                raise MPDataValidationError('the dc B matrix is singular, '
+                    'the network has islands without a reference bus (see '
+                    'grg_mpdata.topology.reduce_to_referenced)')
+        return self._factor
+
+    def _solve(self, right_hand_side):
+        return self.factor.solve(numpy.asarray(right_hand_side, dtype=float))
+
+    def angles(self, injections):
+        '''solves the dc power flow equations for the bus voltage angles
+
+        Args:
+            injections (numpy.ndarray): the net active power injection of
+                each bus (p.u.), or a matrix with one column per scenario
+        Returns:
+            numpy.ndarray: the bus voltage angles (radians), with the shape
+            of injections
+        '''
+        injections = numpy.asarray(injections, dtype=float)
+        columns = injections.reshape(len(self.bus_ids), -1)
+        net = columns - (self.pbusinj + self.gsinj)[:, numpy.newaxis]
+
+        reference_column = self.bbus[self._others, self.reference].toarray()
+        angles = numpy.empty(columns.shape)
+        angles[self.reference, :] = self.reference_angle
+        angles[self._others, :] = self._solve(net[self._others, :] -
+            reference_column*self.reference_angle)
+        return angles.reshape(injections.shape)
+
+    def flows(self, angles):
+        '''Args:
+            angles (numpy.ndarray): bus voltage angles (radians), or a
+                matrix with one column per scenario
+        Returns:
+            numpy.ndarray: the active power flow of each branch (p.u.),
+            with one column per scenario
+        '''
+        angles = numpy.asarray(angles, dtype=float)
+        if angles.ndim == 1:
+            return self.bf @ angles + self.pfinj
+        return self.bf @ angles + self.pfinj[:, numpy.newaxis]
+
+    def power_flow(self, injections):
+        '''Args:
+            injections (numpy.ndarray): the net active power injection of
+                each bus (p.u.), or a matrix with one column per scenario
+        Returns:
+            tuple: the bus voltage angles (radians) and branch flows (p.u.)
+        '''
+        angles = self.angles(injections)
+        return angles, self.flows(angles)
+
+    def ptdf(self):
+        '''the power transfer distribution factors, the change of each
+        branch flow for an injection at each bus that is withdrawn at the
+        slack bus
+
+        Returns:
+            numpy.ndarray: a dense matrix (branches x buses)
+        '''
+        ptdf = numpy.zeros(self.bf.shape)
+        if len(self._others) > 0:
+            # the reduced B matrix is symmetric
+            ptdf[:, self._others] = self._solve(
+                self.bf[:, self._others].T.toarray()).T
+        return ptdf
+
+    def lodf(self, ptdf=None):
+        '''the line outage distribution factors, column k is the change of
+        each branch flow per unit of pre-outage flow on branch k, when
+        branch k is taken out of service.  As in matpower's makeLODF, the
+        columns of branches whose outage splits the network are not finite.
+
+        Args:
+            ptdf (numpy.ndarray, optional): the PTDF matrix of the network
+        Returns:
+            numpy.ndarray: a dense matrix (branches x branches)
+        '''
+        if ptdf is None:
+            ptdf = self.ptdf()
+        transfer = (self.incidence @ ptdf.T).T
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            lodf = transfer/(1.0 - numpy.diag(transfer))[numpy.newaxis, :]
+        numpy.fill_diagonal(lodf, -1.0)
+        return lodf
+
+
+def bus_injections(case):
+    '''the net active power injections of the buses of a case, the output of
+    in service generators less the bus demand
+
+    Args:
+        case (Case or ColumnarCase): the case
+    Returns:
+        numpy.ndarray: the injection of each bus (p.u.)
+    '''
+    bus_ids, pd = _columns(case.bus, ['bus_i', 'pd'])
+    gen_bus, pg, status = _columns(case.gen, ['gen_bus', 'pg', 'gen_status'])
+    positions = _bus_positions(bus_ids.astype(numpy.int64),
+                               gen_bus.astype(numpy.int64), 'generator')
+    generation = numpy.bincount(positions,
+                                numpy.where(_in_service(status), pg, 0.0),
+                                minlength=len(bus_ids))
+    return (generation - pd)/case.baseMVA
@@ -0,0 +1,296 @@
+'''a diff engine for matpower cases, that matches components by key instead
+of by position and reports the added, removed and modified components of
+each table'''
+
+from grg_mpdata.struct import _field_values
+
+
+class FieldChange(object):
+    def __init__(self, field, value_1, value_2):
+        '''A field whose value differs between two components
+
+        Args:
+            field (str): the name of the field
+            value_1: the value in the first case
+            value_2: the value in the second case
+        '''
+
+        self.field = field
+        self.value_1 = value_1
+        self.value_2 = value_2
+
+    @property
+    def delta(self):
+        '''value_2 - value_1 for numeric values, otherwise None'''
+        if isinstance(self.value_1, (int, float)) and \
+                isinstance(self.value_2, (int, float)):
+            return self.value_2 - self.value_1
+        return None
+
+    def __str__(self):
+        return '%s: %s -> %s' % (self.field, self.value_1, self.value_2)
+
+
+class ComponentChange(object):
+    def __init__(self, key, position_1, position_2, fields):
+        '''A component that is in both cases with different field values
+
+        Args:
+            key (tuple): the key matching the two components
+            position_1 (int): the position of the component in the first case
+            position_2 (int): the position of the component in the second
+                case
+            fields (list of FieldChange): the differing fields
+        '''
+
+        self.key = key
+        self.position_1 = position_1
+        self.position_2 = position_2
+        self.fields = fields
+
+    def __str__(self):
+        return '%s: %s' % (_key_str(self.key),
+                           ', '.join([str(x) for x in self.fields]))
+
+
+class TableDiff(object):
+    def __init__(self, table, added, removed, modified):
+        '''The differences of one table between two cases
+
+        Args:
+            table (str): the name of the table, e.g. 'branch'
+            added (list): (key, position) pairs of the components only in
+                the second case
+            removed (list): (key, position) pairs of the components only
+                in the first case
+            modified (list of ComponentChange): the components whose fields
+                differ
+        '''
+
+        self.table = table
+        self.added = added
+        self.removed = removed
+        self.modified = modified
+
+    @property
+    def count(self):
+        '''the number of added, removed and modified components'''
+        return len(self.added) + len(self.removed) + len(self.modified)
+
+    def __str__(self):
+        lines = ['%s: %d added, %d removed, %d modified' % (self.table,
+            len(self.added), len(self.removed), len(self.modified))]
+        for key, position in self.added:
+            lines.append('  + %s' % _key_str(key))
+        for key, position in self.removed:
+            lines.append('  - %s' % _key_str(key))
+        for change in self.modified:
+            lines.append('  ~ %s' % str(change))
+        return '\n'.join(lines)
+
+
+class CaseDiff(object):
+    def __init__(self, header, tables):
+        '''The differences between two cases
+
+        Args:
+            header (list of FieldChange): differences of the case name,
+                version and baseMVA
+            tables (dict): maps table names to TableDiffs, tables that are
+                identical are omitted
+        '''
+
+        self.header = header
+        self.tables = tables
+
+    @property
+    def identical(self):
+        '''True when the cases have no differences'''
+        return self.count == 0
+
+    @property
+    def count(self):
+        '''the number of differing header fields and components'''
+        return len(self.header) + sum([x.count for x in self.tables.values()])
+
+    def __str__(self):
+        if self.identical:
+            return 'the cases are identical'
+        lines = [str(x) for x in self.header]
+        lines.extend([str(x) for x in self.tables.values()])
+        return '\n'.join(lines)
+
+
+# the tables of a case, in the order they are reported
+_TABLES = ['bus', 'gen', 'branch', 'gencost', 'dcline', 'dclinecost',
+           'busname']
+
+
+def _key_str(key):
+    return ' '.join([str(x) for x in key])
+
+
+def _ordinal_keys(base_keys):
+    '''extends keys with the number of previous occurrences of the same key,
+    so components with equal keys (e.g. parallel branches) are told apart'''
+    seen = {}
+    keys = []
+    for key in base_keys:
+        ordinal = seen.get(key, 0)
+        seen[key] = ordinal + 1
+        keys.append(key + (ordinal,))
+    return keys
+
+
+def _bus_keys(case):
+    return [(x.bus_i,) for x in case.bus]
+
+
+def _gen_keys(case):
+    return _ordinal_keys([(x.gen_bus,) for x in case.gen])
+
+
+def _branch_keys(case):
+    return _ordinal_keys([(x.f_bus, x.t_bus) for x in case.branch])
+
+
+def _dcline_keys(case):
+    return _ordinal_keys([(x.f_bus, x.t_bus) for x in case.dcline])
+
+
+def _cost_keys(owner_keys, costs):
+    '''cost models are keyed by the key of the component they belong to,
+    with the position of the model in a 2x (active and reactive) layout'''
+    if len(owner_keys) == 0:
+        return [('cost', i) for i in range(0, len(costs))]
+    keys = []
+    for i in range(0, len(costs)):
+        segment = 'pg' if i < len(owner_keys) else 'qg'
+        keys.append(owner_keys[i % len(owner_keys)] + (segment,))
+    return keys
+
+
+def _table_keys(case, table_name):
+    if table_name == 'bus':
+        return _bus_keys(case)
+    if table_name == 'gen':
+        return _gen_keys(case)
+    if table_name == 'branch':
+        return _branch_keys(case)
+    if table_name == 'dcline':
+        return _dcline_keys(case)
+    if table_name == 'gencost':
+        return _cost_keys(_gen_keys(case) if case.gen is not None else [],
+                          case.gencost)
+    if table_name == 'dclinecost':
+        return _cost_keys(_dcline_keys(case) if case.dcline is not None
+                          else [], case.dclinecost)
+    # busname
+    return _bus_keys(case)[:len(case.busname)]
+
+
+def _values_equal(value_1, value_2, rtol, atol):
+    if value_1 == value_2:
+        return True
+    if isinstance(value_1, list) and isinstance(value_2, list):
+        return len(value_1) == len(value_2) and \
+            all([_values_equal(x, y, rtol, atol)
+                 for x, y in zip(value_1, value_2)])
+    if isinstance(value_1, (int, float)) and isinstance(value_2, (int, float)):
+        return abs(value_1 - value_2) <= atol + rtol*abs(value_2)
+    return False
+
+
+def diff_tables(table_name, case_1, case_2, rtol=0.0, atol=0.0):
+    '''matches the components of a table in two cases by key and reports
+    their differences.  Components are keyed as follows, where ordinal
+    counts the previous components with the same key.
+
+    - bus, busname: bus_i
+    - gen: (gen_bus, ordinal)
+    - branch, dcline: (f_bus, t_bus, ordinal)
+    - gencost, dclinecost: the key of the generator or DC line, with 'pg' or
+      'qg' for the active or reactive power model
+
+    Args:
+        table_name (str): the name of the table, e.g. 'branch'
+        case_1 (Case): the first case
+        case_2 (Case): the second case
+        rtol (float): relative tolerance of numeric field comparisons
+        atol (float): absolute tolerance of numeric field comparisons
+    Returns:
+        TableDiff: the differences of the table
+    '''
+
+    if table_name not in _TABLES:
+        raise ValueError('unknown case table \'%s\'' % table_name)
+
+    table_1 = getattr(case_1, table_name) or []
+    table_2 = getattr(case_2, table_name) or []
+
+    keys_1 = _table_keys(case_1, table_name) if len(table_1) > 0 else []
+    keys_2 = _table_keys(case_2, table_name) if len(table_2) > 0 else []
+
+    if len(table_1) == 0 and len(table_2) == 0:
+        return TableDiff(table_name, [], [], [])
+
+    # the index field only records the position of a component
+    fields = (table_1 or table_2)[0]._fields
+    skip = 1 if fields[0] == 'index' else 0
+    fields = fields[skip:]
+
+    # the values of a row, as a tuple, stand in for a hash of the row, so
+    # unchanged rows are skipped with a single comparison
+    positions_1 = dict(zip(keys_1, range(0, len(keys_1))))
+    values_1 = [_field_values(x)[skip:] for x in table_1]
+
+    added = []
+    modified = []
+    matched = set()
+    for position_2, key in enumerate(keys_2):
+        position_1 = positions_1.get(key)
+        if position_1 is None:
+            added.append((key, position_2))
+            continue
+        matched.add(position_1)
+        row_1 = values_1[position_1]
+        row_2 = _field_values(table_2[position_2])[skip:]
+        if row_1 == row_2:
+            continue
+        changes = [FieldChange(name, x, y) for name, x, y in
+                   zip(fields, row_1, row_2)
+                   if not _values_equal(x, y, rtol, atol)]
+        if len(changes) > 0:
+            modified.append(ComponentChange(key, position_1, position_2,
+                                            changes))
+
+    removed = [(key, position) for position, key in enumerate(keys_1)
+               if position not in matched]
+
+    return TableDiff(table_name, added, removed, modified)
+
+
+def diff_cases(case_1, case_2, rtol=0.0, atol=0.0):
+    '''compares two cases, matching components by key (see diff_tables)
+
+    Args:
+        case_1 (Case): the first case
+        case_2 (Case): the second case
+        rtol (float): relative tolerance of numeric field comparisons
+        atol (float): absolute tolerance of numeric field comparisons
+    Returns:
+        CaseDiff: the differences of the cases
+    '''
+
+    header = [FieldChange(name, getattr(case_1, name), getattr(case_2, name))
+              for name in ['name', 'version', 'baseMVA']
+              if not _values_equal(getattr(case_1, name),
+                                   getattr(case_2, name), rtol, atol)]
+
+    tables = {}
+    for table_name in _TABLES:
+        table_diff = diff_tables(table_name, case_1, case_2, rtol, atol)
+        if table_diff.count > 0:
+            tables[table_name] = table_diff
+
+    return CaseDiff(header, tables)
@@ -0,0 +1,151 @@
+'''filtered copies of matpower cases.  A filtered case shares the
+components that it keeps with the original case, its tables are
+OverlayComponentLists, so update_component copies a component before
+changing it and leaves the original case unchanged.  Fields of shared
+components assigned directly are changed in both cases.  Components keep
+their index, which identifies them in the original case.'''
+
+import numpy
+
+from grg_mpdata.exception import MPDataValidationError
+from grg_mpdata.struct import Case
+from grg_mpdata.struct import OverlayComponentList
+
+
+def in_service(component):
+    '''a predicate that keeps generators, branches and DC lines that are in
+    service, i.e. whose status is positive'''
+    if hasattr(component, 'gen_status'):
+        return component.gen_status > 0
+    return component.br_status > 0
+
+
+def _in_service(status):
+    '''a mask of the entries of a status column that are in service, by the
+    rule of in_service'''
+    return numpy.asarray(status) > 0
+
+
+def area_in(*areas):
+    '''Returns: a bus predicate that keeps the buses in the given areas'''
+    areas = set(areas)
+    return lambda bus: bus.area in areas
+
+
+def zone_in(*zones):
+    '''Returns: a bus predicate that keeps the buses in the given zones'''
+    zones = set(zones)
+    return lambda bus: bus.zone in zones
+
+
+def kv_between(min_kv=None, max_kv=None):
+    '''Args:
+        min_kv (float, optional): the lowest base voltage kept (kV)
+        max_kv (float, optional): the highest base voltage kept (kV)
+    Returns:
+        a bus predicate that keeps the buses whose base_kv is in the range
+    '''
+    def predicate(bus):
+        return (min_kv is None or bus.base_kv >= min_kv) and \
+            (max_kv is None or bus.base_kv <= max_kv)
+    return predicate
+
+
+def _positions(table, predicate):
+    if predicate is None:
+        return list(range(0, len(table)))
+    return [i for i, x in enumerate(table) if predicate(x)]
+
+
+def _shared(components):
+    '''a table of a filtered case, that shares the given components'''
+    if components is None:
+        return None
+    return OverlayComponentList(components, {})
+
+
+def _cost_positions(costs, owner_count, kept, owner_name):
+    '''the positions of the cost models of the kept components, including
+    the reactive power models of a 2x layout'''
+    if len(costs) == owner_count:
+        return kept
+    if len(costs) == 2*owner_count:
+        return kept + [owner_count + i for i in kept]
+    raise MPDataValidationError('number of %scost items does not match the '
+                                'number of %ss' % (owner_name, owner_name))
+
+
+def filter_case(case, bus=None, gen=None, branch=None, dcline=None,
+                name=None):
+    '''a copy of a case with the components that the given predicates keep.
+    Removing a bus also removes its generators, its bus name and the
+    branches and DC lines connected to it.  Cost models follow the
+    generators and DC lines they belong to.
+
+    Args:
+        case (Case): the case to filter
+        bus: a predicate on Bus components, e.g. area_in(1, 2), by default
+            all buses are kept
+        gen: a predicate on Generator components, e.g. in_service
+        branch: a predicate on Branch components
+        dcline: a predicate on DCLine components
+        name (str, optional): the name of the new case, by default the name
+            of the given case
+    Returns:
+        Case: a case sharing the kept components with the given case
+    '''
+
+    bus_kept = _positions(case.bus, bus)
+    buses = [case.bus[i] for i in bus_kept]
+    bus_ids = set([x.bus_i for x in buses])
+
+    def gen_predicate(x):
+        return x.gen_bus in bus_ids and (gen is None or gen(x))
+
+    def line_predicate(predicate):
+        return lambda x: x.f_bus in bus_ids and x.t_bus in bus_ids and \
+            (predicate is None or predicate(x))
+
+    gen_kept = _positions(case.gen, gen_predicate)
+    branch_kept = _positions(case.branch, line_predicate(branch))
+
+    gencost = None
+    if case.gencost is not None:
+        gencost = [case.gencost[i] for i in _cost_positions(case.gencost,
+                   len(case.gen), gen_kept, 'gen')]
+
+    dclines = None
+    dclinecost = None
+    if case.dcline is not None:
+        dcline_kept = _positions(case.dcline, line_predicate(dcline))
+        dclines = [case.dcline[i] for i in dcline_kept]
+        if case.dclinecost is not None:
+            dclinecost = [case.dclinecost[i] for i in _cost_positions(
+                case.dclinecost, len(case.dcline), dcline_kept, 'dcline')]
+    elif case.dclinecost is not None:
+        dclinecost = list(case.dclinecost)
+
+    busname = None
+    if case.busname is not None:
+        busname = [case.busname[i] for i in bus_kept]
+
+    return Case(name=case.name if name is None else name,
+                version=case.version, baseMVA=case.baseMVA,
+                bus=_shared(buses),
+                gen=_shared([case.gen[i] for i in gen_kept]),
+                branch=_shared([case.branch[i] for i in branch_kept]),
+                gencost=_shared(gencost), dcline=_shared(dclines),
+                dclinecost=_shared(dclinecost), busname=_shared(busname))
+
+
+def remove_status_zero(case):
+    '''a copy of a case without the generators, branches and DC lines that
+    are out of service (see filter_case)
+
+    Args:
+        case (Case): the case to filter
+    Returns:
+        Case: a case named <name>_status-1
+    '''
+    return filter_case(case, gen=in_service, branch=in_service,
+                       dcline=in_service, name=case.name+'_status-1')
@@ -1,9 +1,14 @@
 '''functions for reading and writing matpower data files'''
 
 import argparse
+import glob
+import gzip
+import os
 import warnings
 import re
 
+import numpy
+
 from grg_mpdata.struct import Bus
 from grg_mpdata.struct import BusName
 from grg_mpdata.struct import Generator
@@ -12,30 +17,135 @@ from grg_mpdata.struct import Branch
 from grg_mpdata.struct import DCLine
 from grg_mpdata.struct import DCLineCost
 from grg_mpdata.struct import Case
+from grg_mpdata.struct import LazyComponentList
+
+from grg_mpdata.columnar import ColumnarCase
 
 from grg_mpdata.exception import MPDataParsingError
 from grg_mpdata.exception import MPDataValidationError
 from grg_mpdata.exception import MPDataWarning
 
 from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import as_completed
+from io import BufferedIOBase
+from io import BytesIO
+from io import RawIOBase
+from io import StringIO
+from io import TextIOWrapper
 _Assignment = namedtuple('_Assignment', ['var', 'val'])
 
+_ASSIGNMENT = 'assignment'
+_MATRIX = 'matrix'
+_ROW = 'row'
+_ROW_COUNT = 'row_count'
 
-def _parse_cell(lines, index):
-    return _parse_matlab_data(lines, index, '{', '}')
 
-def _parse_matrix(lines, index):
-    return _parse_matlab_data(lines, index, '[', ']')
+def _matlab_rows(rhs, lines, start_char, end_char):
+    '''splits a matlab matrix body into row strings.  Lines are consumed
+    only up to the one containing the closing bracket and only the current
+    partial row is carried from one line to the next.
+    '''
+    close = end_char + ';'
+    pending = ''
+
+    segment = rhs
+    started = len(segment) > 0
+    if started:
+        segment = segment.lstrip(start_char)
+    found_close_bracket = end_char in rhs
+
+    while True:
+        if close in segment:
+            segment = segment.replace(close, '')
+        parts = segment.split(';')
+        if len(parts) > 1:
+            if pending:
+                yield pending + ' ' + parts[0]
+            else:
+                yield parts[0]
+            for row in parts[1:-1]:
+                yield row
+            pending = parts[-1]
+        else:
+            pending = pending + ' ' + parts[0]
 
-def _parse_matlab_data(lines, index, start_char, end_char):
-    last_index = len(lines)
-    line_count = 0
-    maxtrix = []
-    columns = None
+        if found_close_bracket:
+            break
+
+        for line in lines:
+            line = line.strip()
+            if len(line) > 0 and not line.startswith('%'):
+                break
+        else:
+            break
+
+        if '%' in line:
+            line = line.split('%')[0]
+        if end_char in line:
+            found_close_bracket = True
+        if not ';' in line:
+            line = line + ';'
+        if not started:
+            line = line.lstrip(start_char)
+            started = True
+        segment = line
+
+    yield pending
 
+
+def _count_matlab_rows(rhs, lines, start_char, end_char):
+    '''counts the rows of a matlab matrix body, consuming the same lines as
+    _matlab_rows without building the row strings
+    '''
+    started = len(rhs) > 0
+    counter = _RowCounter(end_char)
+    counter.add(rhs.lstrip(start_char))
+
+    if not end_char in rhs:
+        for line in lines:
+            line = line.strip()
+            if len(line) == 0 or line.startswith('%'):
+                continue
+            if '%' in line:
+                line = line.split('%')[0]
+            if not ';' in line:
+                line = line + ';'
+            if not started:
+                line = line.lstrip(start_char)
+                started = True
+            counter.add(line)
+            if end_char in line:
+                break
+
+    return counter.count()
+
+
+class _RowCounter(object):
+    def __init__(self, end_char):
+        '''counts the non-blank rows of a matrix body, which is given one
+        line at a time, rows are separated by ';' and may span lines'''
+        self.end = end_char + ';'
+        self.rows = 0
+        self.pending = False
+
+    def add(self, line):
+        parts = line.replace(self.end, '').split(';')
+        self.pending = self.pending or not (len(parts[0]) == 0 or
+                                            parts[0].isspace())
+        for part in parts[1:]:
+            self.rows += self.pending
+            self.pending = not (len(part) == 0 or part.isspace())
+
+    def count(self):
+        return self.rows + self.pending
+
+
+def _tokenize_matlab_data(first_line, lines, start_char, end_char,
+                          raw_matrices, counted_matrices=()):
     # the first line defines the name of the matrix
-    assert('=' in lines[index+line_count])
-    matrix_assignment = lines[index+line_count].split('%')[0]
+    assert('=' in first_line)
+    matrix_assignment = first_line.split('%')[0]
     matrix_assignment = matrix_assignment.strip()
     matrix_assignment_parts = matrix_assignment.split('=', 1)
 
@@ -44,49 +154,82 @@ def _parse_matlab_data(lines, index, start_char, end_char):
     if len(matrix_assignment_parts) > 1:
         matrix_assignment_rhs = matrix_assignment_parts[1].strip()
 
-    line_count += 1
-    matrix_body_lines = [matrix_assignment_rhs]
-    found_close_bracket = end_char in matrix_assignment_rhs
+    yield (_MATRIX, matrix_name, None)
 
-    while index + line_count < last_index and not found_close_bracket:
-        line = lines[index+line_count].strip()
+    if matrix_name in counted_matrices:
+        yield (_ROW_COUNT, matrix_name, _count_matlab_rows(
+            matrix_assignment_rhs, lines, start_char, end_char))
+        return
 
-        if len(line) == 0 or line.startswith('%'):
-            line_count += 1
+    rows = _matlab_rows(matrix_assignment_rhs, lines, start_char, end_char)
+
+    if matrix_name in raw_matrices:
+        for row in rows:
+            if len(row) > 0 and not row.isspace():
+                yield (_ROW, matrix_name, row)
+        return
+
+    columns = None
+    for row in rows:
+        row_tokens = _split_line(row)
+        if len(row_tokens) == 0:
             continue
+        if columns is not None:
+            if columns != len(row_tokens):
+                raise MPDataParsingError('matlab matrix parsing error, '
+                    'inconsistent number of items in each row.  Expected %d '
+                    'given %d.' % (columns, len(row_tokens)))
+        else:
+            columns = len(row_tokens)
+        yield (_ROW, matrix_name, row_tokens)
 
-        line = line.split('%')[0]
 
-        if end_char in line:
-            found_close_bracket = True
+def _tokenize_mp_case(mp_lines, raw_matrices=(), counted_matrices=()):
+    '''a single pass tokenizer for matpower data.  Lines are consumed as they
+    are needed, so an open file can be tokenized without reading it into
+    memory first.
 
-        if ';' in line:
-            matrix_body_lines.append(line)
-        else:
-            matrix_body_lines.append(line + (';'))
-        line_count += 1
-
-    matrix_body = ' '.join(matrix_body_lines)
-    matrix_body = matrix_body.strip().strip(start_char).replace(end_char+';', '').strip()
-    matrix_body_rows = matrix_body.split(';')
-
-    for row in matrix_body_rows:
-        if len(row.split()) > 0:
-            maxtrix.append(_split_line(row))
-            if columns is not None:
-                if columns != len(maxtrix[-1]):
-                    raise MPDataParsingError('matlab matrix parsing error, '
-                        'inconsistent number of items in each row.  Expected %d '
-                        'given %d.' % (columns, len(maxtrix[-1])))
-            else:
-                columns = len(maxtrix[-1])
+    Args:
+        mp_lines: an iterable of matpower data lines
+        raw_matrices: names of matrices (e.g. 'mpc.bus') whose rows are
+            given as unsplit strings, for readers that parse numbers in bulk
+        counted_matrices: names of matrices whose rows are only counted
+    Yields:
+        tuple: (kind, name, data) tokens.  An assignment token for each of
+        the case name, version and baseMVA, a matrix token at the start of
+        each matrix or cell array and a row token holding the items of each
+        row.  Counted matrices give a single row count token instead of row
+        tokens.
+    '''
+
+    lines = iter(mp_lines)
+    for line in lines:
+        line = line.strip()
+        if len(line) == 0 or line.startswith('%'):
+            continue
 
-    return {'name': matrix_name, 'data': maxtrix, 'line_count': line_count}
+        if 'function mpc' in line:
+            yield (_ASSIGNMENT, 'name', _extract_assignment_line(line).val)
+        elif 'mpc.version' in line:
+            yield (_ASSIGNMENT, 'version', _extract_assignment_line(line).val)
+        elif 'mpc.baseMVA' in line:
+            yield (_ASSIGNMENT, 'baseMVA', _extract_assignment_line(line).val)
+        elif '[' in line:
+            for token in _tokenize_matlab_data(line, lines, '[', ']',
+                                               raw_matrices, counted_matrices):
+                yield token
+        elif '{' in line:
+            for token in _tokenize_matlab_data(line, lines, '{', '}',
+                                               raw_matrices, counted_matrices):
+                yield token
 
 
 single_quote_expr = re.compile('\'((\\.|[^\'])*?)\'')
 
 def _split_line(mp_line):
+    if not '\'' in mp_line:
+        return mp_line.split()
+
     mp_line = mp_line.strip()
     #print(mp_line, single_quote_expr.match(mp_line))
     if single_quote_expr.match(mp_line):
@@ -136,112 +279,396 @@ def _extract_assignment_line(str):
     return _Assignment(*parts)
 
 
-def parse_mp_case_file(mpFileName):
+def _open_mp_file(path, mode, compress=None):
+    '''opens a matpower data file in text mode, files with a .gz extension
+    (or any file when compress is True) are gzip compressed
+    '''
+    if compress is None:
+        compress = os.fspath(path).endswith('.gz')
+    if compress:
+        return gzip.open(path, mode+'t', encoding='utf-8')
+    return open(path, mode)
+
+
+def _parse_binary_file(binary_file, parse, *args):
+    '''parses an open binary file as utf-8 text, the file is left open for
+    the caller
+    '''
+    text_file = TextIOWrapper(binary_file, encoding='utf-8')
+    try:
+        return parse(text_file, *args)
+    finally:
+        text_file.detach()
+
+
+def parse_mp_case_file(mpFileName, backend='struct', cache=False,
+                       cache_dir=None, lazy=False):
     '''opens the given path and parses it as matpower data
 
     Args:
-        mpFileName(str): path to the a matpower data file
+        mpFileName(str, path-like or file): path to the a matpower data file
+            or an open file object (text or binary mode), paths ending in .gz
+            are read as gzip compressed files
+        backend(str): 'struct' builds component objects, 'numpy' reads the
+            numeric tables in bulk into a columnar case
+        cache(bool): when True, a binary image of the parsed case is kept
+            (see grg_mpdata.cache) and reused while the file is unchanged
+        cache_dir(str): a directory for cache images, by default images are
+            stored next to the source file
+        lazy(bool): build components when they are accessed, see
+            parse_mp_case_lines
     Returns:
-        Case: a grg_mpdata case
+        Case: a grg_mpdata case (a ColumnarCase with the numpy backend)
     '''
-    with open(mpFileName, 'r') as mpFile:
-        lines = mpFile.readlines()
-    return parse_mp_case_lines(lines)
-
-
-def parse_mp_case_str(mpString):
+    if not hasattr(mpFileName, 'read'):
+        mpFileName = os.fspath(mpFileName)
+    if (cache or cache_dir is not None) and not hasattr(mpFileName, 'read') \
+            and not mpFileName.endswith('.gz'):
+        from grg_mpdata.cache import load_case
+        return load_case(mpFileName, cache_dir, backend, lazy=lazy)
+    if hasattr(mpFileName, 'read'):
+        if isinstance(mpFileName, (BufferedIOBase, RawIOBase)):
+            return _parse_binary_file(mpFileName, parse_mp_case_lines,
+                                      backend, lazy)
+        return parse_mp_case_lines(mpFileName, backend, lazy)
+    with _open_mp_file(mpFileName, 'r') as mpFile:
+        return parse_mp_case_lines(mpFile, backend, lazy)
+
+
+def parse_mp_case_str(mpString, backend='struct', lazy=False):
     '''parses a given string as matpower data
 
     Args:
-        mpString(str): a matpower data file as a string
+        mpString(str or bytes): a matpower data file as a string
+        backend(str): 'struct' builds component objects, 'numpy' reads the
+            numeric tables in bulk into a columnar case
+        lazy(bool): build components when they are accessed, see
+            parse_mp_case_lines
     Returns:
-        Case: a grg_mpdata case
+        Case: a grg_mpdata case (a ColumnarCase with the numpy backend)
     '''
-    return parse_mp_case_lines(mpString.split('\n'))
-
-
-def parse_mp_case_lines(mpLines):
+    if isinstance(mpString, (bytes, bytearray)):
+        return parse_mp_case_lines(
+            TextIOWrapper(BytesIO(mpString), encoding='utf-8'), backend, lazy)
+    return parse_mp_case_lines(StringIO(mpString), backend, lazy)
+
+
+_component_builders = {
+    'mpc.bus': lambda index, data: Bus(*data),
+    'mpc.gen': lambda index, data: Generator(index, *data),
+    'mpc.branch': lambda index, data: Branch(index, *data),
+    'mpc.dcline': lambda index, data: DCLine(index, *data),
+    'mpc.gencost': lambda index, data:
+        GeneratorCost(index, *data[:4], cost=data[4:]),
+    'mpc.dclinecost': lambda index, data:
+        DCLineCost(index, *data[:4], cost=data[4:]),
+    'mpc.bus_name': lambda index, data: BusName(index, *data),
+}
+
+
+def parse_mp_case_lines(mpLines, backend='struct', lazy=False):
     '''parses a list of strings as matpower data
 
     Args:
-        mpLines(list): the list of matpower data strings
+        mpLines(iterable): the matpower data strings, any iterable of lines
+            (e.g. a list or an open file) is accepted
+        backend(str): 'struct' builds component objects, 'numpy' reads the
+            numeric tables in bulk into a columnar case
+        lazy(bool): when True, the tables of the case are
+            LazyComponentLists, that keep the raw rows and build components
+            when they are accessed.  Errors in the rows of a table are only
+            reported when its components are built and the case is not
+            validated, call Case.validate() to check it.
     Returns:
-        Case: a grg_mpdata case
+        Case: a grg_mpdata case (a ColumnarCase with the numpy backend)
     '''
 
-    version = None
-    name = None
-    baseMVA = None
+    if backend == 'numpy':
+        return _parse_mp_case_arrays(mpLines)
+    if backend != 'struct':
+        raise ValueError('unknown parsing backend \'%s\'' % backend)
+
+    header = {'name': None, 'version': None, 'baseMVA': None}
+    components = {}
+
+    raw_matrices = ()
+    if lazy:
+        raw_matrices = _component_builders
+
+    builder = None
+    component_list = None
+    for kind, name, data in _tokenize_mp_case(mpLines, raw_matrices):
+        if kind == _ROW:
+            if builder is not None:
+                if lazy:
+                    component_list.append(data)
+                else:
+                    component_list.append(builder(len(component_list), data))
+
+        elif kind == _MATRIX:
+            builder = _component_builders.get(name)
+            if builder is not None:
+                component_list = []
+                components[name] = component_list
+            else:
+                warnings.warn('unrecognized data matrix named \'%s\': data '
+                    'was ignored' % name, MPDataWarning)
 
-    bus = None
-    gen = None
-    branch = None
-    gencost = None
-    dcline = None
-    dclinecost = None
-    bus_name = None
+        else:
+            header[name] = data
 
-    parsed_matrixes = []
+    if lazy:
+        for name, rows in components.items():
+            components[name] = LazyComponentList(rows,
+                _lazy_builder(_component_builders[name], rows))
 
-    last_index = len(mpLines)
-    index = 0
-    while index < last_index:
-        line = mpLines[index].strip()
-        if len(line) == 0 or line.startswith('%'):
-            index += 1
-            continue
+    baseMVA = header['baseMVA']
+    if baseMVA is not None:
+        baseMVA = float(baseMVA)
+
+    case = Case(header['name'], header['version'], baseMVA,
+        components.get('mpc.bus'), components.get('mpc.gen'),
+        components.get('mpc.branch'), components.get('mpc.gencost'),
+        components.get('mpc.dcline'), components.get('mpc.dclinecost'),
+        components.get('mpc.bus_name'))
+
+    if not lazy:
+        case.validate()
+
+    return case
 
-        if 'function mpc' in line:
-            name = _extract_assignment_line(line).val
-        elif 'mpc.version' in line:
-            version = _extract_assignment_line(line).val
-        elif 'mpc.baseMVA' in line:
-            baseMVA = float(_extract_assignment_line(line).val)
-        elif '[' in line:
-            matrix = _parse_matrix(mpLines, index)
-            parsed_matrixes.append(matrix)
-            index += matrix['line_count']-1
-        elif '{' in line:
-            matrix = _parse_cell(mpLines, index)
-            parsed_matrixes.append(matrix)
-            index += matrix['line_count']-1
-        index += 1
 
-    for parsed_matrix in parsed_matrixes:
-        if parsed_matrix['name'] == 'mpc.bus':
-            bus = [Bus(*data) for data in parsed_matrix['data']]
+def _lazy_builder(builder, rows):
+    '''a component builder for the raw rows of a LazyComponentList, which
+    checks that each row has as many items as the first one'''
+    columns = None
+    if len(rows) > 0:
+        columns = len(_split_line(rows[0]))
+
+    def build(index, row):
+        row_tokens = _split_line(row)
+        if columns != len(row_tokens):
+            raise MPDataParsingError('matlab matrix parsing error, '
+                'inconsistent number of items in each row.  Expected %d '
+                'given %d.' % (columns, len(row_tokens)))
+        return builder(index, row_tokens)
+    return build
+
+
+class CaseSummary(object):
+    def __init__(self, name, version, baseMVA, rows, tables):
+        '''The result of scanning a matpower data file, holding the case
+        metadata, the number of rows of every data table and the components
+        of the requested tables only.
+
+        Args:
+            name (str): textual name of the test case
+            version (str): indicates the version of the test case
+            baseMVA (float): the network MVA base value (MVA)
+            rows (dict): maps table names (e.g. 'bus', 'busname') to their
+                number of rows
+            tables (dict): maps the requested table names to lists of
+                components
+        '''
+
+        self.name = name
+        self.version = version
+        self.baseMVA = baseMVA
+        self.rows = rows
+        self.tables = tables
+
+    def __str__(self):
+        return 'name: %s, version: %s, baseMVA: %s, rows: %s' % \
+            (self.name, self.version, self.baseMVA, self.rows)
+
+
+_case_tables = {
+    'mpc.bus': 'bus',
+    'mpc.gen': 'gen',
+    'mpc.branch': 'branch',
+    'mpc.gencost': 'gencost',
+    'mpc.dcline': 'dcline',
+    'mpc.dclinecost': 'dclinecost',
+    'mpc.bus_name': 'busname',
+}
+
+
+def scan_mp_case_file(mpFileName, tables=()):
+    '''opens the given path and scans it as matpower data, see
+    scan_mp_case_lines
+
+    Args:
+        mpFileName(str or file): path to the a matpower data file or an open
+            file object (text or binary mode)
+        tables(iterable): names of the tables to parse (e.g. 'bus', 'gen',
+            'busname')
+    Returns:
+        CaseSummary: the case metadata, row counts and requested tables
+    '''
+    if hasattr(mpFileName, 'read'):
+        if isinstance(mpFileName, (BufferedIOBase, RawIOBase)):
+            return _parse_binary_file(mpFileName, scan_mp_case_lines, tables)
+        return scan_mp_case_lines(mpFileName, tables)
+    with _open_mp_file(mpFileName, 'r') as mpFile:
+        return scan_mp_case_lines(mpFile, tables)
+
 
-        elif parsed_matrix['name'] == 'mpc.gen':
-            gen = [Generator(index, *data)
-                   for index, data in enumerate(parsed_matrix['data'])]
+def scan_mp_case_str(mpString, tables=()):
+    '''scans a given string as matpower data, see scan_mp_case_lines
 
-        elif parsed_matrix['name'] == 'mpc.branch':
-            branch = [Branch(index, *data)
-                      for index, data in enumerate(parsed_matrix['data'])]
+    Args:
+        mpString(str or bytes): a matpower data file as a string
+        tables(iterable): names of the tables to parse (e.g. 'bus', 'gen',
+            'busname')
+    Returns:
+        CaseSummary: the case metadata, row counts and requested tables
+    '''
+    if isinstance(mpString, (bytes, bytearray)):
+        return scan_mp_case_lines(
+            TextIOWrapper(BytesIO(mpString), encoding='utf-8'), tables)
+    return scan_mp_case_lines(StringIO(mpString), tables)
 
-        elif parsed_matrix['name'] == 'mpc.dcline':
-            dcline = [DCLine(index, *data) 
-                for index, data in enumerate(parsed_matrix['data'])]
 
-        elif parsed_matrix['name'] == 'mpc.gencost':
-            gencost = []
-            for index, data in enumerate(parsed_matrix['data']):
-                gencost.append(GeneratorCost(index, *data[:4], cost=data[4:]))
+def scan_mp_case_lines(mpLines, tables=()):
+    '''scans matpower data for its name, version, baseMVA and the number
+    of rows in each table.  Only the requested tables are parsed into
+    components (which are validated individually), the rows of the other
+    tables are counted without being split into items.
 
-        elif parsed_matrix['name'] == 'mpc.dclinecost':
-            dclinecost = []
-            for index, data in enumerate(parsed_matrix['data']):
-                dclinecost.append(DCLineCost(index, *data[:4], cost=data[4:]))
+    Args:
+        mpLines(iterable): the matpower data strings, any iterable of lines
+            (e.g. a list or an open file) is accepted
+        tables(iterable): names of the tables to parse (e.g. 'bus', 'gen',
+            'busname')
+    Returns:
+        CaseSummary: the case metadata, row counts and requested tables
+    '''
 
-        elif parsed_matrix['name'] == 'mpc.bus_name':
-            bus_name = [BusName(index, *data) 
-                for index, data in enumerate(parsed_matrix['data'])]
+    if isinstance(tables, str):
+        tables = (tables,)
+    tables = set(tables)
+    for table_name in tables:
+        if table_name not in _case_tables.values():
+            raise ValueError('unknown matpower table \'%s\'' % table_name)
+
+    # the rows of unrequested and unrecognized matrices are only counted
+    counted_matrices = _Complement([name for name, table_name in
+                                    _case_tables.items() if table_name in tables])
+
+    header = {'name': None, 'version': None, 'baseMVA': None}
+    rows = {}
+    components = {}
+
+    builder = None
+    component_list = None
+    for kind, name, data in _tokenize_mp_case(mpLines, (), counted_matrices):
+        if kind == _ROW_COUNT:
+            if name in _case_tables:
+                rows[_case_tables[name]] = data
+
+        elif kind == _ROW:
+            component = builder(len(component_list), data)
+            component.validate()
+            component_list.append(component)
+
+        elif kind == _MATRIX:
+            if name in _case_tables and _case_tables[name] in tables:
+                builder = _component_builders[name]
+                component_list = []
+                components[_case_tables[name]] = component_list
 
         else:
-            warnings.warn('unrecognized data matrix named \'%s\': data was '
-                'ignored' % parsed_matrix['name'], MPDataWarning)
+            header[name] = data
+
+    baseMVA = header['baseMVA']
+    if baseMVA is not None:
+        baseMVA = float(baseMVA)
+
+    for table_name, component_list in components.items():
+        rows[table_name] = len(component_list)
+
+    return CaseSummary(header['name'], header['version'], baseMVA, rows,
+                       components)
+
+
+class _Complement(object):
+    '''a container holding every name except the given ones'''
+    def __init__(self, names):
+        self.names = set(names)
+
+    def __contains__(self, name):
+        return not name in self.names
+
+
+_array_tables = {
+    'mpc.bus': 'bus',
+    'mpc.gen': 'gen',
+    'mpc.branch': 'branch',
+    'mpc.dcline': 'dcline',
+    'mpc.gencost': 'gencost',
+    'mpc.dclinecost': 'dclinecost',
+}
+
+
+def _read_matrix(matrix_name, rows):
+    if len(rows) == 0:
+        return numpy.empty((0, 0))
+    try:
+        return numpy.loadtxt(rows, dtype=numpy.float64, comments=None,
+                             ndmin=2)
+    except ValueError:
+        columns = len(rows[0].split())
+        for row in rows:
+            if columns != len(row.split()):
+                raise MPDataParsingError('matlab matrix parsing error, '
+                    'inconsistent number of items in each row.  Expected %d '
+                    'given %d.' % (columns, len(row.split())))
+        raise MPDataParsingError('matlab matrix parsing error, %s contains '
+            'non-numeric data.' % matrix_name)
+
+
+def _parse_mp_case_arrays(mpLines):
+    '''parses matpower data into a ColumnarCase, where the rows of numeric
+    matrices are read in bulk instead of being split into items
+    '''
+
+    header = {'name': None, 'version': None, 'baseMVA': None}
+    matrix_rows = {}
+
+    rows = None
+    for kind, name, data in _tokenize_mp_case(mpLines, _array_tables):
+        if kind == _ROW:
+            if rows is not None:
+                rows.append(data)
+
+        elif kind == _MATRIX:
+            if name in _array_tables or name == 'mpc.bus_name':
+                rows = []
+                matrix_rows[name] = rows
+            else:
+                rows = None
+                warnings.warn('unrecognized data matrix named \'%s\': data '
+                    'was ignored' % name, MPDataWarning)
+
+        else:
+            header[name] = data
+
+    baseMVA = header['baseMVA']
+    if baseMVA is not None:
+        baseMVA = float(baseMVA)
+
+    matrices = {}
+    for name, table_name in _array_tables.items():
+        if name in matrix_rows:
+            matrices[table_name] = _read_matrix(name, matrix_rows.pop(name))
 
-    case = Case(name, version, baseMVA, bus, gen, branch, gencost, dcline, dclinecost, bus_name)
+    bus_name = None
+    if 'mpc.bus_name' in matrix_rows:
+        bus_name = [BusName(index, *data) for index, data in
+                    enumerate(matrix_rows['mpc.bus_name'])]
+
+    case = ColumnarCase.from_matrices(header['name'], header['version'],
+        baseMVA, matrices, bus_name)
 
     case.validate()
 
@@ -251,17 +678,128 @@ def parse_mp_case_lines(mpLines):
 # from datetime import date, datetime
 # date_tag = date.today().strftime('%d - %B - %Y')
 
-def write_mp_case_file(output_file_location, case):
-    '''writes a matpower case file
+class ParseResult(object):
+    def __init__(self, path, case=None, warnings=None, error=None):
+        '''The outcome of parsing one file in a batch
+
+        Args:
+            path (str): path to the matpower data file
+            case (Case): the parsed case, None if parsing failed
+            warnings (list): (message, category) pairs of the warnings
+                emitted while parsing the file
+            error (Exception): the error that stopped parsing, if any
+        '''
+
+        self.path = path
+        self.case = case
+        self.warnings = warnings if warnings is not None else []
+        self.error = error
+
+    @property
+    def ok(self):
+        '''True when the file was parsed without an error'''
+        return self.error is None
+
+    def __str__(self):
+        if self.error is not None:
+            return '%s: %s: %s' % (self.path, self.error.__class__.__name__,
+                                   self.error)
+        return '%s: %d warnings' % (self.path, len(self.warnings))
+
+
+def _expand_paths(paths):
+    '''a list of files from a directory (its .m files), a glob pattern or an
+    iterable of paths'''
+    if isinstance(paths, (str, os.PathLike)):
+        paths = os.fspath(paths)
+        if os.path.isdir(paths):
+            return sorted(glob.glob(os.path.join(paths, '*.m')))
+        return sorted(glob.glob(paths))
+    return [os.fspath(x) for x in paths]
+
+
+def _parse_batch_file(path, backend, cache, cache_dir):
+    '''parses one file of a batch, recording its warnings and errors'''
+    case = None
+    error = None
+    with warnings.catch_warnings(record=True) as recorded:
+        warnings.simplefilter('always')
+        try:
+            case = parse_mp_case_file(path, backend, cache, cache_dir)
+        except Exception as exception:
+            error = exception
+    case_warnings = [(str(x.message), x.category) for x in recorded]
+    return ParseResult(path, case, case_warnings, error)
+
+
+def parse_many(paths, workers=None, ordered=True, backend='struct',
+               cache=False, cache_dir=None, chunksize=4):
+    '''parses many matpower data files with a pool of worker processes.
+    The warnings and errors of each file are captured in its result, so one
+    bad file does not stop the batch.
+
+    Args:
+        paths(str, os.PathLike or iterable): a directory (whose .m files
+            are parsed), a glob pattern or an iterable of paths
+        workers(int): the number of worker processes, by default the
+            number of CPUs.  With 1 the files are parsed in this process
+        ordered(bool): when True a list of results in the order of the
+            paths is returned, otherwise an iterator yields results as the
+            files are completed
+        backend(str): see parse_mp_case_file, 'numpy' cases are the
+            cheapest to send back from the workers
+        cache(bool): see parse_mp_case_file
+        cache_dir(str): see parse_mp_case_file
+        chunksize(int): the number of files sent to a worker at a time
+    Returns:
+        list of ParseResult: one result per file (an iterator when ordered
+        is False)
+    '''
+
+    paths = _expand_paths(paths)
+    if backend not in ['struct', 'numpy']:
+        raise ValueError('unknown parsing backend \'%s\'' % backend)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(paths)))
+
+    if workers == 1:
+        results = (_parse_batch_file(path, backend, cache, cache_dir)
+                   for path in paths)
+        if ordered:
+            return list(results)
+        return results
+
+    if ordered:
+        with ProcessPoolExecutor(workers) as executor:
+            return list(executor.map(_parse_batch_file, paths,
+                [backend]*len(paths), [cache]*len(paths),
+                [cache_dir]*len(paths), chunksize=chunksize))
+    return _parse_completed(paths, workers, backend, cache, cache_dir)
+
+
+def _parse_completed(paths, workers, backend, cache, cache_dir):
+    with ProcessPoolExecutor(workers) as executor:
+        futures = [executor.submit(_parse_batch_file, path, backend, cache,
+                                   cache_dir) for path in paths]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def write_mp_case_file(output_file_location, case, compress=None):
+    '''writes a matpower case file.  The file is written a section at a
+    time, so the matpower encoding is never held in memory as a whole.
 
     Args:
         output_file_location (str): the path of the file to write
         case (Case): the data structure to write out
+        compress (bool, optional): gzip compresses the file, by default
+            paths ending in .gz are compressed
     '''
 
-    output_file = open(output_file_location, 'w')
-    output_file.write(case.to_matpower())
-    output_file.close()
+    with _open_mp_file(output_file_location, 'w', compress) as output_file:
+        case.write_matpower(output_file)
 
 
 def build_cli_parser():
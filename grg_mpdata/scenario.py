@@ -0,0 +1,282 @@
+'''scenarios of a matpower case, made by scaling columns of its tables (e.g.
+bus pd and qd, or generator pg and pmax) with profiles that give one
+multiplier per scenario and component.  The scaling of a block of scenarios
+is one vectorized operation, and each scenario shares all of its unscaled
+tables with the base case.  When scenarios are written, the rows of the
+unscaled tables are formatted once, and only the scaled columns are
+formatted for each scenario.  Scenarios are written to files or streamed to
+a callback.'''
+
+import os
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy
+
+from grg_mpdata.columnar import ColumnarCase
+from grg_mpdata.columnar import ColumnTable
+from grg_mpdata.columnar import _format_column
+from grg_mpdata.columnar import _table_extended
+from grg_mpdata.columnar import _table_rows
+from grg_mpdata.io import _open_mp_file
+from grg_mpdata.struct import _matpower_lines
+from grg_mpdata.struct import _write_lines
+
+
+# the number of scenarios that are scaled in one step
+_BLOCK_SCENARIOS = 256
+
+# marks the positions of the scaled values in the template rows
+_PLACEHOLDER = '\x00'
+
+
+class ScenarioSet(object):
+    def __init__(self, case, profiles, first=0):
+        '''A sequence of scenarios of a base case, built on demand.  Each
+        scenario is a ColumnarCase named <name>_<number>.
+
+        Args:
+            case (Case or ColumnarCase): the base case
+            profiles (dict): maps (table name, field name) pairs, e.g.
+                ('bus', 'pd'), to the multipliers of the field in each
+                scenario.  A profile is either a matrix with one row per
+                scenario and one column per table row, or a vector with one
+                multiplier per scenario that applies to every table row.
+                All profiles must have the same number of scenarios.
+            first (int): the number of the first scenario
+        '''
+
+        if not isinstance(case, ColumnarCase):
+            case = ColumnarCase.from_case(case)
+        self.case = case
+        self.first = first
+
+        self.profiles = {}
+        count = None
+        for (table_name, field), profile in profiles.items():
+            table = getattr(case, table_name, None)
+            if not isinstance(table, ColumnTable):
+                raise ValueError('case has no %s table' % table_name)
+            if not field in table.spec.component_class._matpower_fields or \
+                    table[field].dtype.kind != 'f':
+                raise ValueError('%s %s is not a scalable field' %
+                                 (table_name, field))
+
+            profile = numpy.asarray(profile, dtype=float)
+            if profile.ndim == 1:
+                profile = profile[:, numpy.newaxis]
+            if profile.ndim != 2 or profile.shape[1] not in (1, len(table)):
+                raise ValueError('the %s %s profile must have one column or '
+                    'one column per %s row' % (table_name, field, table_name))
+            if count is not None and profile.shape[0] != count:
+                raise ValueError('the profiles have different numbers of '
+                                 'scenarios')
+            count = profile.shape[0]
+            self.profiles[(table_name, field)] = profile
+        self._count = 0 if count is None else count
+        self._width = len(str(first + self._count - 1))
+
+        self._fields = {}
+        for table_name, field in self.profiles:
+            self._fields.setdefault(table_name, []).append(field)
+        self._formatter = None
+
+    def __len__(self):
+        return self._count
+
+    def name(self, index):
+        '''Returns: the name of the scenario at the given position'''
+        return '%s_%0*d' % (self.case.name, self._width, self.first + index)
+
+    def _scaled(self, start, stop):
+        '''scales the profiled columns of a block of scenarios
+
+        Returns:
+            dict: maps (table name, field name) pairs to matrices with one
+            row per scenario
+        '''
+        scaled = {}
+        for (table_name, field), profile in self.profiles.items():
+            column = getattr(self.case, table_name)[field]
+            scaled[(table_name, field)] = column[numpy.newaxis, :] * \
+                profile[start:stop]
+        return scaled
+
+    def _scenario(self, index, scaled, row):
+        tables = {}
+        for table_name, fields in self._fields.items():
+            base = getattr(self.case, table_name)
+            data = base.data.copy()
+            for field in fields:
+                data[field] = scaled[(table_name, field)][row]
+            tables[table_name] = ColumnTable(base.spec, data)
+        return _scenario_case(self.case, self.name(index), tables)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError('scenario index out of range')
+        return self._scenario(index, self._scaled(index, index+1), 0)
+
+    def __iter__(self):
+        for start in range(0, self._count, _BLOCK_SCENARIOS):
+            stop = min(start + _BLOCK_SCENARIOS, self._count)
+            scaled = self._scaled(start, stop)
+            for index in range(start, stop):
+                yield self._scenario(index, scaled, index - start)
+
+    def _lines(self, scenario):
+        if self._formatter is None:
+            self._formatter = _ScenarioFormatter(self.case, self._fields)
+        return self._formatter.lines(scenario)
+
+    def to_matpower(self, scenario):
+        '''Args:
+            scenario (ColumnarCase): a scenario of this set
+        Returns:
+            str: the Matpower encoding of the scenario, identical to that of
+            scenario.to_matpower()
+        '''
+        return '\n'.join(self._lines(scenario))
+
+    def write(self, directory, workers=None, compress=False):
+        '''writes every scenario to a matpower data file named after the
+        scenario, e.g. <directory>/case30_0042.m
+
+        Args:
+            directory (str): the output directory, created when missing
+            workers (int, optional): the number of worker processes, that
+                each write a contiguous range of the scenarios
+            compress (bool): gzip compresses the files (.m.gz)
+        Returns:
+            list of str: the paths of the written files
+        '''
+
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        if workers is None or workers <= 1 or self._count <= 1:
+            return _write_scenarios(self, directory, compress)
+
+        bounds = numpy.linspace(0, self._count, min(workers, self._count)+1)
+        bounds = bounds.astype(numpy.int64).tolist()
+        parts = [self._slice(start, stop) for start, stop in
+                 zip(bounds[:-1], bounds[1:])]
+        with ProcessPoolExecutor(len(parts)) as executor:
+            paths = list(executor.map(_write_scenarios, parts,
+                [directory]*len(parts), [compress]*len(parts)))
+        return [path for part in paths for path in part]
+
+    def stream(self, callback, text=False):
+        '''passes every scenario to a callback, in order, without writing
+        files
+
+        Args:
+            callback: a function that is called with each scenario (a
+                ColumnarCase), or with the name and the Matpower encoding
+                of each scenario when text is True
+            text (bool): pass the Matpower encodings of the scenarios,
+                formatted as in write, instead of the scenarios
+        Returns:
+            list: the result of the callback for each scenario
+        '''
+
+        results = []
+        for scenario in self:
+            if text:
+                results.append(callback(scenario.name,
+                                        self.to_matpower(scenario)))
+            else:
+                results.append(callback(scenario))
+        return results
+
+    def _slice(self, start, stop):
+        '''a set with the scenarios from start to stop, that keeps their
+        names'''
+        part = ScenarioSet(self.case, dict([(key, x[start:stop]) for key, x in
+                           self.profiles.items()]), self.first + start)
+        part._width = self._width
+        return part
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state['_formatter'] = None
+        return state
+
+
+def _scenario_case(base, name, tables):
+    '''a ColumnarCase that shares the tables of base that are not given'''
+    return ColumnarCase(
+        name=name,
+        version=base.version,
+        baseMVA=base.baseMVA,
+        bus=tables.get('bus', base.bus),
+        gen=tables.get('gen', base.gen),
+        branch=tables.get('branch', base.branch),
+        gencost=tables.get('gencost', base.gencost),
+        dcline=tables.get('dcline', base.dcline),
+        dclinecost=tables.get('dclinecost', base.dclinecost),
+        busname=tables.get('busname', base.busname)
+    )
+
+
+def _write_scenarios(scenarios, directory, compress):
+    extension = '.m.gz' if compress else '.m'
+    paths = []
+    for scenario in scenarios:
+        path = os.path.join(directory, scenario.name + extension)
+        with _open_mp_file(path, 'w', compress) as output_file:
+            _write_lines(scenarios._lines(scenario), output_file, 65536)
+        paths.append(path)
+    return paths
+
+
+class _ScenarioFormatter(object):
+    def __init__(self, base, fields):
+        '''formats the scenarios of a base case, reusing the rows of the
+        tables that are shared with the base case and the formatted values
+        of the unscaled columns of the other tables
+
+        Args:
+            base (ColumnarCase): the base case
+            fields (dict): maps table names to their scaled fields
+        '''
+
+        self._fields = {}
+        self._rows = {}
+        self._templates = {}
+        for table_name, table_fields in fields.items():
+            table = getattr(base, table_name)
+            order = table.spec.component_class._matpower_fields
+            table_fields = sorted(table_fields, key=order.index)
+            self._fields[table_name] = table_fields
+            placeholders = dict([(x, [_PLACEHOLDER]*len(table))
+                                 for x in table_fields])
+            rows = _table_rows(table, placeholders)
+            # the text before, between and after the scaled values
+            self._templates[table_name] = list(zip(*[x.split(_PLACEHOLDER)
+                                                     for x in rows]))
+
+    def _table_rows(self, table, table_name):
+        if table_name is None:
+            rows = self._rows.get(id(table))
+            if rows is None:
+                rows = _table_rows(table)
+                self._rows[id(table)] = rows
+            return rows
+
+        template = self._templates[table_name]
+        if len(table) == 0:
+            return []
+        parts = [template[0]]
+        for field, text in zip(self._fields[table_name], template[1:]):
+            parts.append(_format_column(table[field]))
+            parts.append(text)
+        return [''.join(x) for x in zip(*parts)]
+
+    def lines(self, scenario):
+        '''Yields: the lines of the Matpower encoding of a scenario'''
+        scaled = dict([(id(getattr(scenario, x)), x) for x in self._fields])
+        return _matpower_lines(scenario, lambda table: self._table_rows(
+            table, scaled.get(id(table))), _table_extended)
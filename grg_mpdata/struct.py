@@ -2,8 +2,16 @@
 
 # import bus, branch, area, generator
 import copy
+import hashlib
+import numbers
 import warnings
 
+from collections import namedtuple
+from collections.abc import MutableSequence
+from operator import attrgetter
+
+import numpy
+
 from grg_mpdata.exception import MPDataValidationError
 from grg_mpdata.exception import MPDataWarning
 
@@ -25,6 +33,489 @@ def _guard_none(fun, val):
         return fun(val)
 
 
+def _field_values(component):
+    '''Returns: the values of all data fields of a component, in order'''
+    return [getattr(component, name) for name in component._fields]
+
+
+_row_templates = {}
+
+def _row_template(count):
+    '''Returns: a format string for a matpower table row of count values,
+    formatted with str() like the to_matpower of components, so numpy
+    scalars are written as plain numbers
+    '''
+    template = _row_templates.get(count)
+    if template is None:
+        template = '\t' + '\t '.join(['%s'] * count) + ';'
+        _row_templates[count] = template
+    return template
+
+
+def _matpower_rows(components):
+    '''renders a list of components as matpower table rows, using the row
+    templates of the component fields rather than each component's
+    to_matpower
+
+    Yields:
+        str: one table row for each component
+    '''
+
+    if len(components) == 0:
+        return
+
+    component_class = components[0].__class__
+    if not hasattr(component_class, '_matpower_fields'):
+        for component in components:
+            yield '\t'+component.to_matpower()+';'
+        return
+
+    get_fields = attrgetter(*component_class._matpower_fields)
+    groups = [(attrgetter(*group), (None,)*len(group))
+              for group in component_class._matpower_extensions]
+    vector = component_class._matpower_vector
+
+    if vector is not None:
+        get_vector = attrgetter(vector)
+        for component in components:
+            values = get_fields(component) + tuple(get_vector(component))
+            yield _row_template(len(values)) % values
+    elif len(groups) == 0:
+        template = _row_template(len(component_class._matpower_fields))
+        for component in components:
+            yield template % get_fields(component)
+    else:
+        for component in components:
+            values = get_fields(component)
+            for get_group, no_group in groups:
+                group = get_group(component)
+                if group != no_group:
+                    values += group
+            yield _row_template(len(values)) % values
+
+
+def _any_extended(components):
+    return any([x.extended for x in components])
+
+
+def _write_lines(lines, output_file, chunk_size):
+    '''writes newline separated lines to a file object in chunks of
+    approximately chunk_size characters
+    '''
+
+    chunk = []
+    chunk_length = 0
+    separator = ''
+    for line in lines:
+        chunk.append(separator)
+        chunk.append(line)
+        separator = '\n'
+        chunk_length += len(line) + 1
+        if chunk_length >= chunk_size:
+            output_file.write(''.join(chunk))
+            chunk = []
+            chunk_length = 0
+    if len(chunk) > 0:
+        output_file.write(''.join(chunk))
+
+
+def _matpower_lines(case, table_rows, table_extended):
+    '''generates the lines of a Matpower encoding of a case
+
+    Args:
+        case: a Case or a case with the same attributes
+        table_rows: a function from a table of the case to its rows
+        table_extended: a function testing if any item of a table has the
+            optional extended fields
+    Yields:
+        str: the lines of the encoding
+    '''
+
+    yield 'function mpc = '+str(case.name)
+    yield 'mpc.version = '+str(case.version)+';'
+    yield 'mpc.baseMVA = '+str(case.baseMVA)+';'
+
+    yield ''
+    yield '%% bus data'
+    header_names = ['bus_i', 'bus_type', 'pd', 'qd', 'gs', 'bs',
+                    'bus_area', 'vm', 'va', 'base_kv', 'zone', 'vmax',
+                    'vmin']
+    if table_extended(case.bus):
+        header_names += ['lam_p', 'lam_q', 'mu_vmax', 'mu_vmin']
+    yield '%\t'+'\t'.join(header_names)
+    yield 'mpc.bus = ['
+    for row in table_rows(case.bus):
+        yield row
+    yield '];'
+
+    yield ''
+    yield '%% generator data'
+    header_names = ['gen_bus', 'pg', 'qg', 'qmax', 'qmin', 'vg', 'mbase',
+                    'gen_status', 'pmax', 'pmin', 'pc1', 'pc2', 'qc1min',
+                    'qc1max', 'qc2min', 'qc2max', 'ramp_agc', 'ramp_10',
+                    'ramp_30', 'ramp_q', 'apf']
+    if table_extended(case.gen):
+        header_names += ['mu_pmax', 'mu_pmin', 'mu_qmax', 'mu_qmin']
+    yield '%\t'+'\t'.join(header_names)
+    yield 'mpc.gen = ['
+    for row in table_rows(case.gen):
+        yield row
+    yield '];'
+
+    if case.gencost is not None:
+        yield ''
+        yield '%% generator cost data'
+        header_names = ['1', 'startup', 'shutdown', 'ncost', ' x_1',
+                        'y_1', '...', 'x_ncost', 'y_ncost']
+        yield '%\t'+'\t'.join(header_names)
+        header_names = ['2', 'startup', 'shutdown', 'ncost',
+                        ' c_(ncost-1)', '...', 'c_0']
+        yield '%\t'+'\t'.join(header_names)
+        yield 'mpc.gencost = ['
+        for row in table_rows(case.gencost):
+            yield row
+        yield '];'
+
+    yield ''
+    yield '%% branch data'
+    header_names = ['f_bus', 't_bus', 'br_r', 'br_x', 'br_b', 'rate_a',
+                    'rate_b', 'rate_c', 'tap', 'shift', 'br_status',
+                    'angmin', 'angmax']
+    if table_extended(case.gen):
+        header_names += ['pf', 'qf', 'pt', 'qt', 'mu_sf', 'mu_st',
+                         'mu_angmin', 'mu_angmax']
+    yield '%\t'+'\t'.join(header_names)
+    yield 'mpc.branch = ['
+    for row in table_rows(case.branch):
+        yield row
+    yield '];'
+
+    if case.dcline is not None:
+        yield ''
+        yield '%% dc line data'
+        header_names = ['f_bus', 't_bus', 'br_r', 'br_x', 'br_b', 'rate_a',
+                        'rate_b', 'rate_c', 'tap', 'shift', 'br_status',
+                        'angmin', 'angmax']
+        if table_extended(case.dcline):
+            header_names += ['pf', 'qf', 'pt', 'qt', 'mu_sf', 'mu_st',
+                             'mu_angmin', 'mu_angmax']
+        yield '%\t'+'\t'.join(header_names)
+        yield 'mpc.dcline = ['
+        for row in table_rows(case.dcline):
+            yield row
+        yield '];'
+
+    if case.dclinecost is not None:
+        yield ''
+        yield '%% dcline cost data'
+        header_names = ['1', 'startup', 'shutdown', 'ncost', ' x_1',
+                        'y_1', '...', 'x_ncost', 'y_ncost']
+        yield '%\t'+'\t'.join(header_names)
+        header_names = ['2', 'startup', 'shutdown', 'ncost',
+                        ' c_(ncost-1)', '...', 'c_0']
+        yield '%\t'+'\t'.join(header_names)
+        yield 'mpc.dclinecost = ['
+        for row in table_rows(case.dclinecost):
+            yield row
+        yield '];'
+
+    if case.busname is not None:
+        yield ''
+        yield '%% bus name data'
+        header_names = ['name']
+        yield '%\t'+'\t'.join(header_names)
+        yield 'mpc.bus_name = {'
+        for row in table_rows(case.busname):
+            yield row
+        yield '};'
+
+    yield ''
+
+
+class LazyComponentList(MutableSequence):
+    def __init__(self, rows, builder):
+        '''A list of components that keeps the raw rows of a data table and
+        builds each component the first time it is accessed.  Any
+        modification of the list builds all of the remaining components
+        first, after which it behaves like a plain list.
+
+        Args:
+            rows (list): the raw data of each component
+            builder: a function of a row position and its raw data, that
+                returns the corresponding component
+        '''
+
+        self._rows = rows
+        self._builder = builder
+        self._items = [None]*len(rows)
+
+    @property
+    def materialized(self):
+        '''True when every component of this list has been built'''
+        return self._rows is None
+
+    def materialize(self):
+        '''builds all components that have not been accessed yet
+
+        Returns:
+            list: the components of this list
+        '''
+
+        if self._rows is not None:
+            items = self._items
+            builder = self._builder
+            for i, row in enumerate(self._rows):
+                if items[i] is None:
+                    items[i] = builder(i, row)
+            self._rows = None
+            self._builder = None
+        return self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, key):
+        if self._rows is None:
+            return self._items[key]
+        if isinstance(key, slice):
+            return [self[i] for i in range(*key.indices(len(self._items)))]
+        component = self._items[key]
+        if component is None:
+            if key < 0:
+                key += len(self._items)
+            component = self._builder(key, self._rows[key])
+            self._items[key] = component
+        return component
+
+    def __iter__(self):
+        if self._rows is None:
+            return iter(self._items)
+        return (self[i] for i in range(0, len(self._items)))
+
+    def __setitem__(self, key, value):
+        self.materialize()[key] = value
+
+    def __delitem__(self, key):
+        del self.materialize()[key]
+
+    def insert(self, index, value):
+        self.materialize().insert(index, value)
+
+    def __eq__(self, other):
+        if isinstance(other, (list, LazyComponentList)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __ne__(self, other):
+        if isinstance(other, (list, LazyComponentList)):
+            return not self.__eq__(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def __deepcopy__(self, memo):
+        return [copy.deepcopy(x, memo) for x in self]
+
+    def __reduce__(self):
+        return (list, (list(self),))
+
+
+class OverlayComponentList(MutableSequence):
+    def __init__(self, base, replaced):
+        '''A list of components that reads through to a base list, except at
+        the positions of the replaced components.  Only the replacements are
+        stored, so an overlay costs almost no memory whatever the length of
+        the base list.  The components that are not replaced are shared with
+        the base list, use copy_on_write before changing one of them in
+        place.  Any modification of the overlay copies the base list and its
+        components first, after which it behaves like a plain list and no
+        longer follows the base list.
+
+        Args:
+            base (list): the components of the underlying list
+            replaced (dict): maps positions in the base list to the
+                components that replace them
+        '''
+
+        self._base = base
+        self._replaced = dict([(p % len(base), x) for p, x in
+                               replaced.items()])
+        self._items = None
+
+    @property
+    def materialized(self):
+        '''True when this list has been copied from its base list'''
+        return self._items is not None
+
+    def materialize(self):
+        '''copies the base list, with the replaced components
+
+        Returns:
+            list: the components of this list
+        '''
+
+        if self._items is None:
+            items = [x if i in self._replaced else copy.deepcopy(x)
+                     for i, x in enumerate(self._base)]
+            for position, component in self._replaced.items():
+                items[position] = component
+            self._items = items
+            self._base = None
+            self._replaced = None
+        return self._items
+
+    def copy_on_write(self, position):
+        '''replaces a component that is shared with the base list by a copy,
+        so it can be changed without changing the base list
+
+        Args:
+            position (int): the position of the component
+        Returns:
+            the component at the position, which is not in the base list
+        '''
+
+        if self._items is not None:
+            return self._items[position]
+        position = _table_position(self._base, position)
+        if not position in self._replaced:
+            self._replaced[position] = copy.deepcopy(self._base[position])
+        return self._replaced[position]
+
+    def __len__(self):
+        if self._items is not None:
+            return len(self._items)
+        return len(self._base)
+
+    def __getitem__(self, key):
+        if self._items is not None:
+            return self._items[key]
+        if isinstance(key, slice):
+            return [self[i] for i in range(*key.indices(len(self._base)))]
+        if key < 0:
+            key += len(self._base)
+        component = self._replaced.get(key)
+        if component is None:
+            return self._base[key]
+        return component
+
+    def __iter__(self):
+        if self._items is not None:
+            return iter(self._items)
+        return (self[i] for i in range(0, len(self._base)))
+
+    def __setitem__(self, key, value):
+        self.materialize()[key] = value
+
+    def __delitem__(self, key):
+        del self.materialize()[key]
+
+    def insert(self, index, value):
+        self.materialize().insert(index, value)
+
+    def __eq__(self, other):
+        if isinstance(other, (list, LazyComponentList, OverlayComponentList)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __ne__(self, other):
+        if isinstance(other, (list, LazyComponentList, OverlayComponentList)):
+            return not self.__eq__(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def __deepcopy__(self, memo):
+        return [copy.deepcopy(x, memo) for x in self]
+
+    def __reduce__(self):
+        return (list, (list(self),))
+
+
+BranchAdjacency = namedtuple('BranchAdjacency',
+                             ['indptr', 'branches', 'buses'])
+
+
+def _group_positions(*bus_columns):
+    '''maps bus ids to the positions of the rows that refer to them'''
+    groups = {}
+    for bus_column in bus_columns:
+        for i, bus_id in enumerate(bus_column):
+            groups.setdefault(bus_id, []).append(i)
+    if len(bus_columns) > 1:
+        for bus_id, positions in groups.items():
+            groups[bus_id] = sorted(set(positions))
+    return groups
+
+
+def _canonical(value):
+    '''a value whose repr is the same for all values that compare equal,
+    numbers (including numpy scalars) are floats and -0.0 is 0.0'''
+    if isinstance(value, numbers.Real):
+        return float(value) + 0.0
+    if isinstance(value, list):
+        return [_canonical(x) for x in value]
+    return value
+
+
+def _table_fingerprint(table):
+    '''a sha256 digest of the field values of all components of a table, that
+    is stable across processes and python sessions.  Components that compare
+    equal have the same digest.'''
+    digest = hashlib.sha256()
+    if table is None:
+        digest.update(b'None')
+    else:
+        digest.update(('%d\n' % len(table)).encode('utf-8'))
+        digest.update('\n'.join([repr(_canonical(_field_values(x)))
+                                  for x in table]).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _bus_position(bus_positions, bus_id, branch):
+    try:
+        return bus_positions[bus_id]
+    except KeyError:
+        raise MPDataValidationError('branch %d refers to bus %d, which is '
+            'not in the bus table' % (branch.index, bus_id))
+
+
+def _branch_adjacency(bus_positions, bus_count, branches):
+    '''builds the CSR adjacency of buses and their incident branches'''
+    f = numpy.array([_bus_position(bus_positions, x.f_bus, x)
+                     for x in branches], dtype=numpy.int64)
+    t = numpy.array([_bus_position(bus_positions, x.t_bus, x)
+                     for x in branches], dtype=numpy.int64)
+    branch = numpy.arange(len(branches), dtype=numpy.int64)
+
+    ends = numpy.concatenate([f, t])
+    order = numpy.argsort(ends, kind='stable')
+    indptr = numpy.zeros(bus_count+1, dtype=numpy.int64)
+    numpy.cumsum(numpy.bincount(ends, minlength=bus_count), out=indptr[1:])
+
+    return BranchAdjacency(indptr, numpy.concatenate([branch, branch])[order],
+                           numpy.concatenate([t, f])[order])
+
+
+def _table_position(table, position):
+    '''a position in a table, where negative positions count from the end,
+    like the positions of table[position]'''
+    if position < 0:
+        position += len(table)
+    if not 0 <= position < len(table):
+        raise IndexError('table index out of range')
+    return position
+
+
+# the attributes of Case that hold component lists
+_case_tables = ('bus', 'gen', 'branch', 'gencost', 'dcline', 'dclinecost',
+                'busname')
+
+# the attributes of Case that hold its metadata
+_case_header = ('name', 'version', 'baseMVA')
+
+
 class Case(object):
     def __init__(self, name=None, version=None, baseMVA=None, bus=None,
                  gen=None, branch=None, gencost=None, dcline=None, dclinecost=None, busname=None):
@@ -45,6 +536,17 @@ class Case(object):
             dcline (list of DCLine, optional): network DC lines
             dclinecost (list of DCLineCost, optional): DC line cost models
             busname (list of BusName, optional): string names of items in bus list
+
+        Changes made through the tracking methods (update_component,
+        add_component, remove_component, mark_modified) or by assigning
+        tables are recorded for incremental validation, and the cached
+        indexes (bus_lookup, branch_adjacency, ...) of changed tables are
+        rebuilt when they are next used.  Cached indexes are also rebuilt
+        when components are appended to or removed from a table list
+        directly, but fields of components changed in place must be
+        recorded with mark_modified.  Components of an
+        OverlayComponentList table are shared with its base list, so they
+        must be changed with update_component, which copies them first.
         '''
 
         self.name = name
@@ -58,6 +560,273 @@ class Case(object):
         self.dclinecost = dclinecost
         self.busname = busname
 
+        # cached indexes and the revision at which each table last changed
+        self._indexes = {}
+        self._changed = {}
+        self._revision = 0
+        # None until the case is validated, then maps the names of changed
+        # tables to the positions of their changed components (None when
+        # the whole table changed)
+        self._dirty = None
+        # the tables whose components were added or removed since the last
+        # validation, which shifts the pairing of 2x gencost tables
+        self._resized = set()
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if name in _case_tables or name in _case_header:
+            if '_revision' in self.__dict__:
+                self._mark(name if name in _case_tables else 'case', None)
+
+    @property
+    def revision(self):
+        '''a counter that is incremented by every tracked change'''
+        return self._revision
+
+    @property
+    def dirty(self):
+        '''the changes since the last validation, a dict mapping table names
+        (and 'case' for the metadata) to sets of component positions, or to
+        None when the whole table changed.  None when the case has not been
+        validated.
+        '''
+        return self._dirty
+
+    def _table(self, table_name):
+        if not table_name in _case_tables:
+            raise ValueError('unknown case table \'%s\'' % table_name)
+        table = getattr(self, table_name)
+        if table is None:
+            raise ValueError('case has no %s table' % table_name)
+        return table
+
+    def _mark(self, table_name, positions):
+        self._revision += 1
+        self._changed[table_name] = self._revision
+        if self._dirty is None:
+            return
+        if positions is None:
+            self._dirty[table_name] = None
+        elif table_name in self._dirty:
+            if self._dirty[table_name] is not None:
+                self._dirty[table_name].update(positions)
+        else:
+            self._dirty[table_name] = set(positions)
+
+    def mark_modified(self, table_name, *positions):
+        '''records that components were changed in place, so they are checked
+        by the next incremental validation
+
+        Args:
+            table_name (str): the name of the table, e.g. 'branch'
+            positions (int): positions of the changed components, when none
+                are given the whole table is marked
+        '''
+        table = self._table(table_name)
+        if len(positions) == 0:
+            self._mark(table_name, None)
+        else:
+            self._mark(table_name, [_table_position(table, p)
+                                    for p in positions])
+
+    def update_component(self, table_name, position, **fields):
+        '''sets fields of a component and records the change
+
+        Args:
+            table_name (str): the name of the table, e.g. 'branch'
+            position (int): the position of the component in the table
+            fields: new values of the component's fields, e.g. br_status=0
+        '''
+        table = self._table(table_name)
+        if isinstance(table, OverlayComponentList):
+            component = table.copy_on_write(position)
+        else:
+            component = table[position]
+        for name, value in fields.items():
+            setattr(component, name, value)
+        self.mark_modified(table_name, position)
+
+    def add_component(self, table_name, component):
+        '''appends a component to a table and records the change
+
+        Args:
+            table_name (str): the name of the table, e.g. 'gen'
+            component: the new component
+        Returns:
+            int: the position of the new component
+        '''
+        table = self._table(table_name)
+        table.append(component)
+        self._resized.add(table_name)
+        self._mark(table_name, [len(table)-1])
+        return len(table)-1
+
+    def remove_component(self, table_name, position):
+        '''removes a component from a table and records the change, the
+        positions of the following components shift down by one
+
+        Args:
+            table_name (str): the name of the table, e.g. 'branch'
+            position (int): the position of the component in the table
+        Returns:
+            the removed component
+        '''
+        table = self._table(table_name)
+        position = _table_position(table, position)
+        component = table[position]
+        del table[position]
+
+        if self._dirty is not None and \
+                self._dirty.get(table_name, ()) is not None:
+            self._dirty[table_name] = set([p if p < position else p-1
+                for p in self._dirty.get(table_name, ()) if p != position])
+        self._resized.add(table_name)
+        self._mark(table_name, [])
+        return component
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state['_indexes'] = {}
+        return state
+
+    def _index(self, name, tables, build):
+        '''a cached index, that is rebuilt when one of the tables it is built
+        from has changed since it was cached, through a tracked change or
+        because the table's list object or length differ'''
+        shapes = [(id(x), len(x)) if x is not None else None for x in
+                  [getattr(self, x) for x in tables if x in _case_tables]]
+        if name in self._indexes:
+            revision, cached_shapes, index = self._indexes[name]
+            if cached_shapes == shapes and \
+                    all([self._changed.get(x, 0) <= revision for x in tables]):
+                return index
+        index = build()
+        self._indexes[name] = (self._revision, shapes, index)
+        return index
+
+    def bus_lookup(self):
+        '''Returns: a dict mapping bus ids (bus_i) to Bus components'''
+        return self._index('bus_lookup', ['bus'],
+            lambda: dict([(x.bus_i, x) for x in self.bus]))
+
+    def bus_positions(self):
+        '''Returns: a dict mapping bus ids (bus_i) to positions in the bus
+        table'''
+        return self._index('bus_positions', ['bus'],
+            lambda: dict([(x.bus_i, i) for i, x in enumerate(self.bus)]))
+
+    def gens_by_bus(self):
+        '''Returns: a dict mapping bus ids to the positions of the
+        generators at that bus, buses without generators are omitted'''
+        return self._index('gens_by_bus', ['gen'],
+            lambda: _group_positions([x.gen_bus for x in self.gen]))
+
+    def dclines_by_bus(self):
+        '''Returns: a dict mapping bus ids to the positions of the DC lines
+        incident to that bus, buses without DC lines are omitted'''
+        def build():
+            if self.dcline is None:
+                return {}
+            return _group_positions([x.f_bus for x in self.dcline],
+                                    [x.t_bus for x in self.dcline])
+        return self._index('dclines_by_bus', ['dcline'], build)
+
+    def busname_by_bus(self):
+        '''Returns: a dict mapping bus ids to bus names, empty when the case
+        has no bus names'''
+        def build():
+            if self.busname is None:
+                return {}
+            return dict([(bus.bus_i, name.name) for bus, name in
+                         zip(self.bus, self.busname)])
+        return self._index('busname_by_bus', ['bus', 'busname'], build)
+
+    def branch_adjacency(self):
+        '''the branches incident to each bus in compressed sparse row (CSR)
+        form, over the positions of buses in the bus table.  The branches
+        incident to the bus at position i are branches[indptr[i]:indptr[i+1]]
+        and the buses at their other ends are buses[indptr[i]:indptr[i+1]].
+        Branches of any status are included.
+
+        Returns:
+            BranchAdjacency: the indptr, branches and buses numpy arrays
+        '''
+        return self._index('branch_adjacency', ['bus', 'branch'],
+            lambda: _branch_adjacency(self.bus_positions(), len(self.bus),
+                                      self.branch))
+
+    def table_fingerprint(self, table_name):
+        '''a content fingerprint of one table, cached until the table changes
+
+        Args:
+            table_name (str): the name of the table, e.g. 'branch'
+        Returns:
+            str: the hex sha256 digest of the table's field values
+        '''
+        if not table_name in _case_tables:
+            raise ValueError('unknown case table \'%s\'' % table_name)
+        return self._index('fingerprint_'+table_name, [table_name],
+            lambda: _table_fingerprint(getattr(self, table_name)))
+
+    def fingerprint(self, cached=True):
+        '''a content fingerprint of the case, combining its metadata and the
+        fingerprints of its tables.  Cases with equal data have equal
+        fingerprints, in any process, so fingerprints can be compared in
+        place of the cases or stored to find duplicate cases.  Like the
+        other cached indexes, a cached fingerprint is only refreshed by
+        tracked changes, fields of components assigned directly are only
+        seen after mark_modified or with cached=False.
+
+        Args:
+            cached (bool): when False, the fingerprint is computed from the
+                current data of every table, ignoring the cached digests
+        Returns:
+            str: the hex sha256 digest of the case
+        '''
+        def build():
+            digest = hashlib.sha256()
+            digest.update(repr(_canonical([getattr(self, x) for x in
+                                           _case_header])).encode('utf-8'))
+            for table_name in _case_tables:
+                if cached:
+                    table_digest = self.table_fingerprint(table_name)
+                else:
+                    table_digest = _table_fingerprint(getattr(self,
+                                                              table_name))
+                digest.update(table_digest.encode('utf-8'))
+            return digest.hexdigest()
+        if not cached:
+            return build()
+        return self._index('fingerprint', list(_case_tables) + ['case'],
+                           build)
+
+    def admittance(self):
+        '''the sparse admittance matrices of the case, as built by matpower's
+        makeYbus (see grg_mpdata.admittance.make_ybus, requires scipy).
+        Cached until the buses, branches or baseMVA change.
+
+        Returns:
+            Admittance: the ybus, yf and yt matrices and the bus ids
+        '''
+        # the admittance module depends on this one
+        from grg_mpdata.admittance import make_ybus
+        return self._index('admittance', ['bus', 'branch', 'case'],
+                           lambda: make_ybus(self))
+
+    def dc_network(self):
+        '''the dc model of the case's network, whose factorization is shared
+        by all of its power flow and sensitivity computations (see
+        grg_mpdata.dcflow.DCNetwork, requires scipy).  Cached until the
+        buses, branches or baseMVA change.
+
+        Returns:
+            DCNetwork: the dc network
+        '''
+        # the dcflow module depends on this one
+        from grg_mpdata.dcflow import DCNetwork
+        return self._index('dc_network', ['bus', 'branch', 'case'],
+                           lambda: DCNetwork(self))
+
     def __str__(self):
         tmp = []
         tmp += ['Base:\n']
@@ -114,7 +883,10 @@ class Case(object):
             #            print 'No key', k
             #        else:
             #            print k, self.__dict__[k] == other.__dict__[k]
-            return self.__dict__ == other.__dict__
+            for name in _case_header + _case_tables:
+                if getattr(self, name) != getattr(other, name):
+                    return False
+            return True
         return NotImplemented
 
     def __ne__(self, other):
@@ -122,14 +894,59 @@ class Case(object):
             return not self.__eq__(other)
         return NotImplemented
 
-    def validate(self):
+    def validate(self, summary=False, incremental=False):
         '''Checks that this data structure conforms to the Matpower data
         specification.
+
+        Args:
+            summary (bool): when True, the rules are checked over whole
+                columns (see grg_mpdata.validation) and one warning is
+                emitted for each broken rule instead of one for each
+                offending component
+            incremental (bool): when True, only the components changed
+                since the last validation (see dirty) and the cross-table
+                invariants they affect are checked.  A case that was never
+                validated is checked in full.
+        Returns:
+            ValidationReport: the rule violations, when summary is True
         '''
 
         # NOTE: this function only check conformance to the official data spec.
         # Other levels of correctness are out of scope.
 
+        if summary:
+            # the validation module depends on this one
+            from grg_mpdata.validation import validate_case
+            report = validate_case(self)
+            report.warn(summary=True)
+            self._validated()
+            return report
+
+        if incremental and self._dirty is not None:
+            self._validate_changes(self._dirty)
+        else:
+            self._validate_changes(None)
+        self._validated()
+
+    def _validated(self):
+        self._dirty = {}
+        self._resized = set()
+
+    def _validate_changes(self, dirty):
+        '''validates the changed components given by dirty (as in the dirty
+        property) or the whole case when dirty is None'''
+
+        def changed(table_name):
+            if dirty is None:
+                return getattr(self, table_name)
+            if not table_name in dirty:
+                return []
+            positions = dirty[table_name]
+            table = getattr(self, table_name)
+            if positions is None:
+                return table
+            return [table[p] for p in sorted(positions) if p < len(table)]
+
         if self.version is None:
             raise MPDataValidationError('case has no version')
         if self.name is None:
@@ -143,11 +960,11 @@ class Case(object):
         if self.branch is None:
             raise MPDataValidationError('case has no branches')
 
-        if self.version != '\'2\'':
+        if (dirty is None or 'case' in dirty) and self.version != '\'2\'':
             warnings.warn('this data structure was designed for only version '
                 '\'2\'. Given %s' % self.version, MPDataWarning)
 
-        for bus in self.bus:
+        for bus in changed('bus'):
             bus.validate()
 
         if self.busname is not None:
@@ -160,13 +977,20 @@ class Case(object):
                     len(self.gencost) == 2*len(self.gen)):
                 raise MPDataValidationError('number of gencost items does not '
                     'match the number of generators')
-            for gencost in self.gencost:
+            for gencost in changed('gencost'):
                 gencost.validate()
 
             if len(self.gencost) > len(self.gen):
                 # we can assume there are 2x gen costs
                 offset = len(self.gen)
-                for i in range(0, len(self.gen)):
+                if dirty is None or dirty.get('gencost', ()) is None or \
+                        'gen' in self._resized or 'gencost' in self._resized:
+                    pairs = range(0, offset)
+                else:
+                    # only the pairs of changed cost functions can differ
+                    pairs = sorted(set([p % offset for p in
+                                        dirty.get('gencost', ())]))
+                for i in pairs:
                     active_cost = self.gencost[i]
                     reactive_cost = self.gencost[i+offset]
                     if active_cost.startup != reactive_cost.startup:
@@ -184,150 +1008,68 @@ class Case(object):
             if not (len(self.dclinecost) == len(self.dclinecost)):
                 raise MPDataValidationError('number of dclinecost items does not '
                     'match the number of dclines')
-            for dclinecost in self.dclinecost:
+            for dclinecost in changed('dclinecost'):
                 dclinecost.validate()
 
-        for branch in self.branch:
+        for branch in changed('branch'):
             branch.validate()
 
         if self.dcline is not None:
-            for dcline in self.dcline:
+            for dcline in changed('dcline'):
                 dcline.validate()
 
+
     def to_matpower(self):
         '''Returns: a Matpower encoding of this data structure as a string'''
+        return '\n'.join(self._matpower_lines())
 
-        matpower_lines = []
-        matpower_lines.append('function mpc = '+str(self.name))
-        matpower_lines.append('mpc.version = '+str(self.version)+';')
-        matpower_lines.append('mpc.baseMVA = '+str(self.baseMVA)+';')
-
-        matpower_lines.append('')
-        matpower_lines.append('%% bus data')
-        header_names = ['bus_i', 'bus_type', 'pd', 'qd', 'gs', 'bs',
-                        'bus_area', 'vm', 'va', 'base_kv', 'zone', 'vmax',
-                        'vmin']
-        if any([bus.extended for bus in self.bus]):
-            header_names += ['lam_p', 'lam_q', 'mu_vmax', 'mu_vmin']
-        matpower_lines.append('%\t'+'\t'.join(header_names))
-        matpower_lines.append('mpc.bus = [')
-        for bus in self.bus:
-            matpower_lines.append('\t'+bus.to_matpower()+';')
-        matpower_lines.append('];')
-
-        matpower_lines.append('')
-        matpower_lines.append('%% generator data')
-        header_names = ['gen_bus', 'pg', 'qg', 'qmax', 'qmin', 'vg', 'mbase',
-                        'gen_status', 'pmax', 'pmin', 'pc1', 'pc2', 'qc1min',
-                        'qc1max', 'qc2min', 'qc2max', 'ramp_agc', 'ramp_10',
-                        'ramp_30', 'ramp_q', 'apf']
-        if any([gen.extended for gen in self.gen]):
-            header_names += ['mu_pmax', 'mu_pmin', 'mu_qmax', 'mu_qmin']
-        matpower_lines.append('%\t'+'\t'.join(header_names))
-        matpower_lines.append('mpc.gen = [')
-        for gen in self.gen:
-            matpower_lines.append('\t'+gen.to_matpower()+';')
-        matpower_lines.append('];')
-
-        if self.gencost is not None:
-            matpower_lines.append('')
-            matpower_lines.append('%% generator cost data')
-            header_names = ['1', 'startup', 'shutdown', 'ncost', ' x_1',
-                            'y_1', '...', 'x_ncost', 'y_ncost']
-            matpower_lines.append('%\t'+'\t'.join(header_names))
-            header_names = ['2', 'startup', 'shutdown', 'ncost',
-                            ' c_(ncost-1)', '...', 'c_0']
-            matpower_lines.append('%\t'+'\t'.join(header_names))
-            matpower_lines.append('mpc.gencost = [')
-            for gencost in self.gencost:
-                matpower_lines.append('\t'+gencost.to_matpower()+';')
-            matpower_lines.append('];')
-
-        matpower_lines.append('')
-        matpower_lines.append('%% branch data')
-        header_names = ['f_bus', 't_bus', 'br_r', 'br_x', 'br_b', 'rate_a',
-                        'rate_b', 'rate_c', 'tap', 'shift', 'br_status',
-                        'angmin', 'angmax']
-        if any([gen.extended for gen in self.gen]):
-            header_names += ['pf', 'qf', 'pt', 'qt', 'mu_sf', 'mu_st',
-                             'mu_angmin', 'mu_angmax']
-        matpower_lines.append('%\t'+'\t'.join(header_names))
-        matpower_lines.append('mpc.branch = [')
-        for branch in self.branch:
-            matpower_lines.append('\t'+branch.to_matpower()+';')
-        matpower_lines.append('];')
-
-        if self.dcline is not None:
-            matpower_lines.append('')
-            matpower_lines.append('%% dc line data')
-            header_names = ['f_bus', 't_bus', 'br_r', 'br_x', 'br_b', 'rate_a',
-                            'rate_b', 'rate_c', 'tap', 'shift', 'br_status',
-                            'angmin', 'angmax']
-            if any([gen.extended for gen in self.dcline]):
-                header_names += ['pf', 'qf', 'pt', 'qt', 'mu_sf', 'mu_st',
-                                 'mu_angmin', 'mu_angmax']
-            matpower_lines.append('%\t'+'\t'.join(header_names))
-            matpower_lines.append('mpc.dcline = [')
-            for dcline in self.dcline:
-                matpower_lines.append('\t'+dcline.to_matpower()+';')
-            matpower_lines.append('];')
-
-        if self.dclinecost is not None:
-            matpower_lines.append('')
-            matpower_lines.append('%% dcline cost data')
-            header_names = ['1', 'startup', 'shutdown', 'ncost', ' x_1',
-                            'y_1', '...', 'x_ncost', 'y_ncost']
-            matpower_lines.append('%\t'+'\t'.join(header_names))
-            header_names = ['2', 'startup', 'shutdown', 'ncost',
-                            ' c_(ncost-1)', '...', 'c_0']
-            matpower_lines.append('%\t'+'\t'.join(header_names))
-            matpower_lines.append('mpc.dclinecost = [')
-            for dclinecost in self.dclinecost:
-                matpower_lines.append('\t'+dclinecost.to_matpower()+';')
-            matpower_lines.append('];')
-
-        if self.busname is not None:
-            matpower_lines.append('')
-            matpower_lines.append('%% bus name data')
-            header_names = ['name']
-            matpower_lines.append('%\t'+'\t'.join(header_names))
-            matpower_lines.append('mpc.bus_name = {')
-            for busname in self.busname:
-                matpower_lines.append('\t'+busname.to_matpower()+';')
-            matpower_lines.append('};')
+    def write_matpower(self, output_file, chunk_size=65536):
+        '''Writes the Matpower encoding of this data structure to a file
+        object, without building the whole encoding as a string.  The
+        output is identical to that of to_matpower.
 
-        matpower_lines.append('')
+        Args:
+            output_file: a writable text file object
+            chunk_size (int): the approximate number of characters sent to
+                the file in each write
+        '''
+        _write_lines(self._matpower_lines(), output_file, chunk_size)
 
-        return '\n'.join(matpower_lines)
+    def _matpower_lines(self):
+        '''Yields: the lines of the Matpower encoding of this data structure'''
+        return _matpower_lines(self, _matpower_rows, _any_extended)
 
+    def as_arrays(self):
+        '''Returns: a grg_mpdata.columnar.ColumnarCase encoding of this data
+        structure, where each table is stored as typed numpy columns
+        '''
+        from grg_mpdata.columnar import ColumnarCase
+        return ColumnarCase.from_case(self)
 
     def remove_status_zero(self):
-        bus = [copy.deepcopy(x) for x in self.bus]
-        off_gen = [i for i, x in enumerate(self.gen) if x.status == 0]
-        on_gen = [i for i, x in enumerate(self.gen) if x.status == 1]
-
-        if len(off_gen) > 0:
-            print("INFO: removing turned off gens: %s" % str(off_gen))
-            gen = [copy.deepcopy(self.gen[i]) for i in on_gen]
-            gencost = [copy.deepcopy(self.gencost[i]) for i in on_gen]
-        else:
-            gen = [copy.deepcopy(x) for x in self.gen]
-            gencost = [copy.deepcopy(x) for x in self.gencost]
-
-        off_branch = [i for i, x in enumerate(self.branch) if x.status == 0]
-        on_branch = [i for i, x in enumerate(self.branch) if x.status == 1]
-
-        if len(off_branch) > 0:
-            print("INFO: removing turned off lines: %s" % str(off_branch))
-            branch = [copy.deepcopy(self.branch[i]) for i in on_branch]
-        else:
-            branch = [copy.deepcopy(x) for x in self.branch]
-
-        return Case(self.name+'_status-1', self.baseMVA, bus, gen, branch,
-            gencost)
+        '''Returns: a copy of this case without the generators, branches and
+        DC lines that are out of service, sharing its components with this
+        case (see grg_mpdata.filters.remove_status_zero)
+        '''
+        # the filters module depends on this one
+        from grg_mpdata.filters import remove_status_zero
+        return remove_status_zero(self)
 
 
 class Generator(object):
+    __slots__ = ('index', 'gen_bus', 'pg', 'qg', 'qmax', 'qmin', 'vg', 'mbase',
+                 'gen_status', 'pmax', 'pmin', 'pc1', 'pc2', 'qc1min',
+                 'qc1max', 'qc2min', 'qc2max', 'ramp_agc', 'ramp_10',
+                 'ramp_30', 'ramp_q', 'apf', 'mu_pmax', 'mu_pmin', 'mu_qmax',
+                 'mu_qmin')
+    _fields = __slots__
+    _matpower_fields = ('gen_bus', 'pg', 'qg', 'qmax', 'qmin', 'vg', 'mbase',
+                        'gen_status', 'pmax', 'pmin', 'pc1', 'pc2', 'qc1min',
+                        'qc1max', 'qc2min', 'qc2max', 'ramp_agc', 'ramp_10',
+                        'ramp_30', 'ramp_q', 'apf')
+    _matpower_extensions = (('mu_pmax', 'mu_pmin', 'mu_qmax', 'mu_qmin'),)
+    _matpower_vector = None
+
     def __init__(self, index, gen_bus, pg, qg, qmax, qmin, vg, mbase,
                  gen_status, pmax, pmin, pc1=0, pc2=0, qc1min=0, qc1max=0,
                  qc2min=0, qc2max=0, ramp_agc=0, ramp_10=0, ramp_30=0,
@@ -399,9 +1141,12 @@ class Generator(object):
         self.mu_qmax = _guard_none(float, mu_qmax)
         self.mu_qmin = _guard_none(float, mu_qmin)
 
-        self.extended = any([x is not None
-                             for x in [self.mu_pmax, self.mu_pmin,
-                                       self.mu_qmax, self.mu_qmin]])
+    @property
+    def extended(self):
+        '''True if any of the optional KKT multipliers are given'''
+        return any([x is not None
+                    for x in [self.mu_pmax, self.mu_pmin,
+                              self.mu_qmax, self.mu_qmin]])
 
     def __str__(self):
         data = [self.index, self.gen_bus, self.pg, self.qg, self.qmax,
@@ -417,7 +1162,7 @@ class Generator(object):
 
     def __eq__(self, other):
         if isinstance(other, self.__class__):
-            return self.__dict__ == other.__dict__
+            return _field_values(self) == _field_values(other)
         return NotImplemented
 
     def __ne__(self, other):
@@ -448,6 +1193,12 @@ class Generator(object):
 
 
 class MatpowerCost(object):
+    __slots__ = ('index', 'model', 'startup', 'shutdown', 'ncost', 'cost')
+    _fields = __slots__
+    _matpower_fields = ('model', 'startup', 'shutdown', 'ncost')
+    _matpower_extensions = ()
+    _matpower_vector = 'cost'
+
     def __init__(self, index, model, startup=0, shutdown=0, ncost=0, cost=[]):
         '''This data structure contains key power generator cost model
         parameters.  Note that the generator cost identifier (i.e. index) is
@@ -492,7 +1243,7 @@ class MatpowerCost(object):
 
     def __eq__(self, other):
         if isinstance(other, self.__class__):
-            return self.__dict__ == other.__dict__
+            return _field_values(self) == _field_values(other)
         return NotImplemented
 
     def __ne__(self, other):
@@ -542,13 +1293,22 @@ class MatpowerCost(object):
         return '\t '.join([str(x) for x in data])
 
 class GeneratorCost(MatpowerCost):
-    pass
+    __slots__ = ()
 
 class DCLineCost(MatpowerCost):
-    pass
+    __slots__ = ()
 
 
 class Bus(object):
+    __slots__ = ('bus_i', 'bus_type', 'pd', 'qd', 'gs', 'bs', 'area', 'vm',
+                 'va', 'base_kv', 'zone', 'vmax', 'vmin', 'lam_p', 'lam_q',
+                 'mu_vmax', 'mu_vmin')
+    _fields = __slots__
+    _matpower_fields = ('bus_i', 'bus_type', 'pd', 'qd', 'gs', 'bs', 'area',
+                        'vm', 'va', 'base_kv', 'zone', 'vmax', 'vmin')
+    _matpower_extensions = (('lam_p', 'lam_q', 'mu_vmax', 'mu_vmin'),)
+    _matpower_vector = None
+
     def __init__(self, bus_i, bus_type, pd, qd, gs, bs, area, vm, va, base_kv,
                  zone, vmax, vmin, lam_p=None, lam_q=None, mu_vmax=None,
                  mu_vmin=None):
@@ -597,8 +1357,11 @@ class Bus(object):
         self.mu_vmax = _guard_none(float, mu_vmax)
         self.mu_vmin = _guard_none(float, mu_vmin)
 
-        self.extended = any([x is not None for x in [self.lam_p, self.lam_q,
-                             self.mu_vmax, self.mu_vmin]])
+    @property
+    def extended(self):
+        '''True if any of the optional Lagrange or KKT multipliers are given'''
+        return any([x is not None for x in [self.lam_p, self.lam_q,
+                    self.mu_vmax, self.mu_vmin]])
 
     def __str__(self):
         data = [self.bus_i, self.bus_type, self.pd, self.qd, self.gs, self.bs,
@@ -609,7 +1372,7 @@ class Bus(object):
 
     def __eq__(self, other):
         if isinstance(other, self.__class__):
-            return self.__dict__ == other.__dict__
+            return _field_values(self) == _field_values(other)
         return NotImplemented
 
     def __ne__(self, other):
@@ -656,6 +1419,9 @@ class Bus(object):
 
 
 class BusName(object):
+    __slots__ = ('index', 'name')
+    _fields = __slots__
+
     def __init__(self, index, name):
         '''This data structure contains bus name parameters.
 
@@ -673,7 +1439,7 @@ class BusName(object):
 
     def __eq__(self, other):
         if isinstance(other, self.__class__):
-            return self.__dict__ == other.__dict__
+            return _field_values(self) == _field_values(other)
         return NotImplemented
 
     def __ne__(self, other):
@@ -694,6 +1460,18 @@ class BusName(object):
 
 
 class Branch(object):
+    __slots__ = ('index', 'f_bus', 't_bus', 'br_r', 'br_x', 'br_b', 'rate_a',
+                 'rate_b', 'rate_c', 'tap', 'shift', 'br_status', 'angmin',
+                 'angmax', 'pf', 'qf', 'pt', 'qt', 'mu_sf', 'mu_st',
+                 'mu_angmin', 'mu_angmax')
+    _fields = __slots__
+    _matpower_fields = ('f_bus', 't_bus', 'br_r', 'br_x', 'br_b', 'rate_a',
+                        'rate_b', 'rate_c', 'tap', 'shift', 'br_status',
+                        'angmin', 'angmax')
+    _matpower_extensions = (('pf', 'qf', 'pt', 'qt'),
+                            ('mu_sf', 'mu_st', 'mu_angmin', 'mu_angmax'))
+    _matpower_vector = None
+
     def __init__(self, index, f_bus, t_bus, br_r, br_x, br_b=0.0, rate_a=0.0, rate_b=0.0,
                  rate_c=0.0, tap=0.0, shift=0.0, br_status=1, angmin=-360.0, angmax=360.0,
                  pf=None, qf=None, pt=None, qt=None, mu_sf=None, mu_st=None,
@@ -756,10 +1534,16 @@ class Branch(object):
         self.mu_angmin = _guard_none(float, mu_angmin)
         self.mu_angmax = _guard_none(float, mu_angmax)
 
-        self.extended = any([x is not None for x in
+    @property
+    def extended(self):
+        '''True if any of the optional power flow values are given'''
+        return any([x is not None for x in
             [self.pf, self.qf, self.pt, self.qt]])
 
-        self.duals = any([x is not None for x in
+    @property
+    def duals(self):
+        '''True if any of the optional KKT multipliers are given'''
+        return any([x is not None for x in
             [self.mu_sf, self.mu_st, self.mu_angmin, self.mu_angmax]])
 
     def __str__(self):
@@ -772,7 +1556,7 @@ class Branch(object):
 
     def __eq__(self, other):
         if isinstance(other, self.__class__):
-            return self.__dict__ == other.__dict__
+            return _field_values(self) == _field_values(other)
         return NotImplemented
 
     def __ne__(self, other):
@@ -809,6 +1593,18 @@ class Branch(object):
 
 
 class DCLine(object):
+    __slots__ = ('index', 'f_bus', 't_bus', 'br_status', 'pf', 'pt', 'qf',
+                 'qt', 'vf', 'vt', 'pmin', 'pmax', 'qminf', 'qmaxf', 'qmint',
+                 'qmaxt', 'loss0', 'loss1', 'mu_pmin', 'mu_pmax', 'mu_qminf',
+                 'mu_qmaxf', 'mu_qmint', 'mu_qmaxt')
+    _fields = __slots__
+    _matpower_fields = ('f_bus', 't_bus', 'br_status', 'pf', 'pt', 'qf', 'qt',
+                        'vf', 'vt', 'pmin', 'pmax', 'qminf', 'qmaxf', 'qmint',
+                        'qmaxt', 'loss0', 'loss1')
+    _matpower_extensions = (('mu_pmin', 'mu_pmax', 'mu_qminf', 'mu_qmaxf',
+                             'mu_qmint', 'mu_qmaxt'),)
+    _matpower_vector = None
+
     def __init__(self, index, f_bus, t_bus, br_status, pf, pt, qf, qt, vf, vt,
                  pmin, pmax, qminf, qmaxf, qmint, qmaxt, loss0, loss1,
                  mu_pmin=None, mu_pmax=None, mu_qminf=None, mu_qmaxf=None,
@@ -879,7 +1675,10 @@ class DCLine(object):
         self.mu_qmint = _guard_none(float, mu_qmint)
         self.mu_qmaxt = _guard_none(float, mu_qmaxt)
 
-        self.extended = any([x is not None for x in [self.mu_pmin,
+    @property
+    def extended(self):
+        '''True if any of the optional KKT multipliers are given'''
+        return any([x is not None for x in [self.mu_pmin,
             self.mu_pmax, self.mu_qminf, self.mu_qmaxf, self.mu_qmint,
             self.mu_qmaxt]])
 
@@ -894,7 +1693,7 @@ class DCLine(object):
 
     def __eq__(self, other):
         if isinstance(other, self.__class__):
-            return self.__dict__ == other.__dict__
+            return _field_values(self) == _field_values(other)
         return NotImplemented
 
     def __ne__(self, other):
@@ -0,0 +1,221 @@
+'''topology processing of matpower cases.  Electrical islands are the
+connected components of the buses, joined by the branches and DC lines that
+are in service.  Buses of type 4 (disconnected) are not part of any island.'''
+
+import numpy
+
+try:
+    import scipy.sparse
+    import scipy.sparse.csgraph
+except ImportError:
+    scipy = None
+
+from grg_mpdata.exception import MPDataValidationError
+from grg_mpdata.filters import _in_service
+from grg_mpdata.filters import filter_case
+
+
+class Islands(object):
+    def __init__(self, bus_ids, labels, reference):
+        '''The electrical islands of a case
+
+        Args:
+            bus_ids (numpy.ndarray): the bus ids (bus_i) of the bus table
+            labels (numpy.ndarray): the island of each bus, in the order of
+                the bus table, -1 for disconnected buses.  Islands are
+                numbered in the order of their first bus.
+            reference (numpy.ndarray): a mask of the reference buses
+        '''
+
+        self.bus_ids = bus_ids
+        self.labels = labels
+        self.reference = reference
+
+    @property
+    def count(self):
+        '''the number of islands'''
+        return int(self.labels.max()) + 1 if len(self.labels) > 0 else 0
+
+    @property
+    def sizes(self):
+        '''the number of buses in each island'''
+        return numpy.bincount(self.labels[self.labels >= 0],
+                              minlength=self.count)
+
+    @property
+    def reference_counts(self):
+        '''the number of reference buses in each island'''
+        return numpy.bincount(self.labels[self.reference & (self.labels >= 0)],
+                              minlength=self.count)
+
+    @property
+    def referenced(self):
+        '''a mask of the islands that have at least one reference bus'''
+        return self.reference_counts > 0
+
+    def buses(self, island):
+        '''Returns: the bus ids of the buses in an island'''
+        return self.bus_ids[self.labels == island]
+
+    def referenced_buses(self):
+        '''Returns: the bus ids of the buses in islands with a reference
+        bus'''
+        connected = self.labels >= 0
+        keep = numpy.zeros(len(self.labels), dtype=bool)
+        keep[connected] = self.referenced[self.labels[connected]]
+        return self.bus_ids[keep]
+
+    def __str__(self):
+        lines = ['%d islands' % self.count]
+        for island, (size, references) in enumerate(zip(self.sizes,
+                self.reference_counts)):
+            lines.append('  %d: %d buses, %d reference buses' %
+                         (island, size, references))
+        return '\n'.join(lines)
+
+
+def _columns(table, names):
+    '''the given columns of a Case table or a ColumnTable, as numpy
+    arrays'''
+    if hasattr(table, 'data'):
+        return [numpy.asarray(table[x]) for x in names]
+    return [numpy.array([getattr(x, name) for x in table]) for name in names]
+
+
+def _bus_positions(bus_ids, ends, component_name):
+    '''maps bus ids to positions in the bus table'''
+    order = numpy.argsort(bus_ids, kind='stable')
+    sorted_ids = bus_ids[order]
+    found = numpy.searchsorted(sorted_ids, ends)
+    found[found == len(sorted_ids)] = 0
+    missing = sorted_ids[found] != ends if len(sorted_ids) > 0 else \
+        numpy.ones(len(ends), dtype=bool)
+    if numpy.any(missing):
+        raise MPDataValidationError('%s refers to bus %d, which is not in '
+            'the bus table' % (component_name, ends[missing][0]))
+    return order[found]
+
+
+def _in_service_edges(case, bus_ids, connected):
+    '''the bus table positions of the ends of the in-service branches and
+    DC lines between connected buses'''
+    tables = [('branch', case.branch)]
+    if case.dcline is not None:
+        tables.append(('dcline', case.dcline))
+
+    f_ends = []
+    t_ends = []
+    for table_name, table in tables:
+        if len(table) == 0:
+            continue
+        f_bus, t_bus, status = _columns(table, ['f_bus', 't_bus',
+                                                'br_status'])
+        f = _bus_positions(bus_ids, f_bus.astype(numpy.int64), table_name)
+        t = _bus_positions(bus_ids, t_bus.astype(numpy.int64), table_name)
+        active = _in_service(status) & connected[f] & connected[t]
+        f_ends.append(f[active])
+        t_ends.append(t[active])
+
+    if len(f_ends) == 0:
+        empty = numpy.empty(0, dtype=numpy.int64)
+        return empty, empty
+    return numpy.concatenate(f_ends), numpy.concatenate(t_ends)
+
+
+def _union_find_roots(node_count, f, t):
+    '''a union-find over whole arrays of edges.  Each round hooks the root
+    of the larger end of every edge to the root of the smaller end and then
+    compresses the paths to the roots.  A round at least halves the number of
+    components that still have edges between them, so there are O(log n)
+    rounds, each with O(log n) path compression steps of O(n + m) work, for
+    O((n + m) log^2 n) in the worst case.
+
+    Returns:
+        numpy.ndarray: the smallest node of the component of each node
+    '''
+    parent = numpy.arange(node_count, dtype=numpy.int64)
+    while len(f) > 0:
+        root_f = parent[f]
+        root_t = parent[t]
+        joining = root_f != root_t
+        if not numpy.any(joining):
+            break
+        f = f[joining]
+        t = t[joining]
+        low = numpy.minimum(root_f[joining], root_t[joining])
+        high = numpy.maximum(root_f[joining], root_t[joining])
+        numpy.minimum.at(parent, high, low)
+        while True:
+            grandparent = parent[parent]
+            if numpy.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+    return parent
+
+
+def _component_roots(node_count, f, t):
+    '''labels the connected components in O(n + m) time with scipy's
+    connected_components when scipy is available, and falls back to
+    _union_find_roots otherwise
+
+    Returns:
+        numpy.ndarray: the smallest node of the component of each node
+    '''
+    if scipy is None or node_count == 0:
+        return _union_find_roots(node_count, f, t)
+
+    graph = scipy.sparse.coo_matrix(
+        (numpy.ones(len(f), dtype=numpy.int8), (f, t)),
+        shape=(node_count, node_count)).tocsr()
+    count, labels = scipy.sparse.csgraph.connected_components(
+        graph, directed=False)
+    smallest = numpy.full(count, node_count, dtype=numpy.int64)
+    numpy.minimum.at(smallest, labels, numpy.arange(node_count))
+    return smallest[labels]
+
+
+def find_islands(case):
+    '''finds the electrical islands of a case, joining buses by the branches
+    and DC lines that are in service (status greater than zero)
+
+    Args:
+        case (Case or ColumnarCase): the case to analyze
+    Returns:
+        Islands: the island of each bus and the reference buses
+    '''
+
+    if case.bus is None:
+        raise MPDataValidationError('case has no buses')
+    if case.branch is None:
+        raise MPDataValidationError('case has no branches')
+
+    bus_ids, bus_type = _columns(case.bus, ['bus_i', 'bus_type'])
+    bus_ids = bus_ids.astype(numpy.int64)
+    connected = bus_type != 4
+
+    f, t = _in_service_edges(case, bus_ids, connected)
+    roots = _component_roots(len(bus_ids), f, t)
+
+    labels = numpy.full(len(bus_ids), -1, dtype=numpy.int64)
+    labels[connected] = numpy.unique(roots[connected], return_inverse=True)[1]
+
+    return Islands(bus_ids, labels, bus_type == 3)
+
+
+def reduce_to_referenced(case, islands=None):
+    '''a copy of a case with only the islands that have a reference bus,
+    sharing its components with the given case (see
+    grg_mpdata.filters.filter_case)
+
+    Args:
+        case (Case): the case to reduce
+        islands (Islands, optional): the islands of the case, by default
+            they are found with find_islands
+    Returns:
+        Case: the reduced case
+    '''
+
+    if islands is None:
+        islands = find_islands(case)
+    kept = set(islands.referenced_buses().tolist())
+    return filter_case(case, bus=lambda x: x.bus_i in kept)
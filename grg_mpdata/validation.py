@@ -0,0 +1,296 @@
+'''vectorized checks of matpower data, that test each rule of the data
+specification over whole columns and report the offending rows'''
+
+import warnings
+
+import numpy
+
+from grg_mpdata.exception import MPDataValidationError
+from grg_mpdata.exception import MPDataWarning
+
+
+# the number of offending rows listed in summary warnings
+_SUMMARY_ROWS = 10
+
+
+class RuleViolation(object):
+    def __init__(self, rule, table, indices, description):
+        '''The rows of a table that break one rule of the data specification
+
+        Args:
+            rule (str): the name of the rule, e.g. 'bus_negative_area'
+            table (str): the name of the table, e.g. 'bus', None for rules
+                on the case itself
+            indices (numpy.ndarray): positions of the offending rows
+            description (str): what is wrong with the offending rows
+        '''
+
+        self.rule = rule
+        self.table = table
+        self.indices = indices
+        self.description = description
+
+    @property
+    def count(self):
+        '''the number of offending rows'''
+        return len(self.indices)
+
+    def __str__(self):
+        if self.table is None:
+            return '%s: %s' % (self.rule, self.description)
+
+        rows = ', '.join([str(x) for x in self.indices[:_SUMMARY_ROWS]])
+        if self.count > _SUMMARY_ROWS:
+            rows += ', ...'
+        return '%s: %d %s rows %s (rows %s)' % (self.rule, self.count,
+            self.table, self.description, rows)
+
+
+class ValidationReport(object):
+    def __init__(self, violations, tables):
+        '''The result of validating a case, holding one RuleViolation for
+        each rule that is broken by at least one row
+
+        Args:
+            violations (list of RuleViolation): the broken rules
+            tables (dict): maps table names to the validated ColumnTables
+        '''
+
+        self.violations = violations
+        self.tables = tables
+
+    @property
+    def ok(self):
+        '''True when no rule is broken'''
+        return len(self.violations) == 0
+
+    @property
+    def counts(self):
+        '''a dict mapping rule names to their number of offending rows'''
+        return dict([(x.rule, x.count) for x in self.violations])
+
+    def indices(self, rule):
+        '''Returns: the positions of the rows that break the given rule'''
+        for violation in self.violations:
+            if violation.rule == rule:
+                return violation.indices
+        return numpy.empty(0, dtype=numpy.int64)
+
+    def warn(self, summary=True):
+        '''emits the warnings of the broken rules
+
+        Args:
+            summary (bool): when True, one warning is emitted per rule,
+                otherwise one warning is emitted per offending row, as
+                grg_mpdata.struct.Case.validate does
+        '''
+
+        if summary:
+            for violation in self.violations:
+                warnings.warn(str(violation), MPDataWarning)
+            return
+
+        for violation in self.violations:
+            if violation.table is None:
+                warnings.warn(violation.description, MPDataWarning)
+
+        for table_name in ['bus', 'gencost', 'dclinecost', 'branch',
+                           'dcline']:
+            masks = [x.indices for x in self.violations
+                     if x.table == table_name]
+            if len(masks) > 0:
+                _warn_rows(self.tables[table_name],
+                           numpy.unique(numpy.concatenate(masks)))
+
+    def __str__(self):
+        if self.ok:
+            return 'no rule violations'
+        return '\n'.join([str(x) for x in self.violations])
+
+
+def bus_rules(bus, table_name='bus'):
+    '''Args:
+        bus (ColumnTable): a bus table
+        table_name (str): the prefix of the rule names
+    Returns:
+        list: (rule, description, mask) triples of the bus rules
+    '''
+
+    return [
+        (table_name+'_negative_id', 'have a negative identification number',
+            bus['bus_i'] < 0),
+        (table_name+'_negative_area', 'have a negative area number',
+            bus['area'] < 0),
+        (table_name+'_negative_zone', 'have a negative zone number',
+            bus['zone'] < 0),
+        (table_name+'_undefined_type', 'have a bus_type other than 1, 2, 3 '
+            'or 4', ~numpy.isin(bus['bus_type'], [1, 2, 3, 4])),
+    ]
+
+
+def cost_rules(cost_table, table_name='gencost'):
+    '''Args:
+        cost_table (ColumnTable): a gencost or dclinecost table
+        table_name (str): the prefix of the rule names
+    Returns:
+        list: (rule, description, mask) triples of the cost model rules
+    '''
+
+    model = cost_table['model']
+    ncost = cost_table['ncost']
+    cost_len = cost_table['cost_len']
+    cost = cost_table['cost']
+
+    pwl = model == 1
+    pwl_points = pwl & (2*ncost == cost_len)
+
+    not_increasing = numpy.zeros(len(model), dtype=bool)
+    if cost.shape[1] > 2:
+        x = cost[:, 0::2]
+        steps = numpy.arange(x.shape[1]-1)
+        in_range = steps[numpy.newaxis, :] < (ncost[:, numpy.newaxis] - 1)
+        not_increasing = pwl_points & numpy.any(
+            ~(x[:, :-1] < x[:, 1:]) & in_range, axis=1)
+
+    return [
+        (table_name+'_undefined_model', 'have a model other than 1 or 2',
+            ~numpy.isin(model, [1, 2])),
+        (table_name+'_pwl_ncost', 'have a piecewise linear model whose '
+            'ncost does not match the number of coordinate pairs',
+            pwl & ~pwl_points),
+        (table_name+'_pwl_not_increasing', 'have piecewise linear x values '
+            'that are not strictly increasing', not_increasing),
+        (table_name+'_polynomial_ncost', 'have a polynomial model whose '
+            'ncost does not match the number of coefficients',
+            (model == 2) & (ncost != cost_len)),
+    ]
+
+
+def status_rules(table, table_name='branch'):
+    '''Args:
+        table (ColumnTable): a branch or dcline table
+        table_name (str): the prefix of the rule names
+    Returns:
+        list: (rule, description, mask) triples of the status rules
+    '''
+
+    return [
+        (table_name+'_undefined_status', 'have a br_status other than 0 or 1',
+            ~numpy.isin(table['br_status'], [0, 1])),
+    ]
+
+
+def any_rule(rules):
+    '''Returns: a mask of the rows that break any of the given rules'''
+    masks = [mask for rule, description, mask in rules]
+    return numpy.logical_or.reduce(masks)
+
+
+def _warn_rows(table, indices):
+    '''emits the warnings of the given rows, one component at a time'''
+    for component in table._components(table.data[indices]):
+        component.validate()
+
+
+def validate_case(case):
+    '''checks a case against the matpower data specification, raising
+    MPDataValidationError for the structural errors that Case.validate
+    raises and reporting all other rule violations without emitting any
+    warnings
+
+    Args:
+        case (Case or ColumnarCase): the case to check, a Case is converted
+            to its columnar encoding first
+    Returns:
+        ValidationReport: the rule violations of the case
+    '''
+
+    # the columnar module uses these rules, so it is imported late
+    from grg_mpdata.columnar import ColumnarCase
+
+    _check_structure(case)
+    if not isinstance(case, ColumnarCase):
+        case = ColumnarCase.from_case(case)
+    if case.gencost is not None:
+        check_cost_pairs(case.gen, case.gencost)
+
+    violations = []
+    if case.version != '\'2\'':
+        violations.append(RuleViolation('version', None,
+            numpy.empty(0, dtype=numpy.int64), 'this data structure was '
+            'designed for only version \'2\'. Given %s' % case.version))
+
+    tables = {}
+    checks = [
+        ('bus', bus_rules),
+        ('gencost', cost_rules),
+        ('dclinecost', cost_rules),
+        ('branch', status_rules),
+        ('dcline', status_rules),
+    ]
+    for table_name, table_rules in checks:
+        table = getattr(case, table_name)
+        if table is None:
+            continue
+        tables[table_name] = table
+        for rule, description, mask in table_rules(table, table_name):
+            indices = numpy.flatnonzero(mask)
+            if len(indices) > 0:
+                violations.append(RuleViolation(rule, table_name, indices,
+                                                description))
+
+    return ValidationReport(violations, tables)
+
+
+def check_cost_pairs(gen, gencost):
+    '''raises MPDataValidationError when a gencost table holds active and
+    reactive power cost models (twice as many rows as generators) whose
+    startup or shutdown values differ
+
+    Args:
+        gen (ColumnTable): a generator table
+        gencost (ColumnTable): a gencost table
+    '''
+
+    if len(gencost) > len(gen):
+        offset = len(gen)
+        startup = gencost['startup']
+        shutdown = gencost['shutdown']
+        bad_startup = startup[:offset] != startup[offset:]
+        bad_shutdown = shutdown[:offset] != shutdown[offset:]
+        bad = numpy.flatnonzero(bad_startup | bad_shutdown)
+        if len(bad) > 0:
+            i = bad[0]
+            field = 'startup' if bad_startup[i] else 'shutdown'
+            raise MPDataValidationError('%s values on active and reactive '
+                'power cost functions on generator %d are not consistent' %
+                (field, gen['index'][i]))
+
+
+def _check_structure(case):
+    '''raises MPDataValidationError when a case is missing required data or
+    its tables have inconsistent sizes'''
+
+    if case.version is None:
+        raise MPDataValidationError('case has no version')
+    if case.name is None:
+        raise MPDataValidationError('case has no name')
+    if case.baseMVA is None:
+        raise MPDataValidationError('case has no baseMVA value')
+    if case.bus is None:
+        raise MPDataValidationError('case has no buses')
+    if case.gen is None:
+        raise MPDataValidationError('case has no generators')
+    if case.branch is None:
+        raise MPDataValidationError('case has no branches')
+
+    if case.busname is not None:
+        if len(case.bus) != len(case.busname):
+            raise MPDataValidationError('number of given bus names does '
+                'not match the number of buses')
+
+    if case.gencost is not None:
+        if not (len(case.gencost) == len(case.gen) or
+                len(case.gencost) == 2*len(case.gen)):
+            raise MPDataValidationError('number of gencost items does not '
+                'match the number of generators')
@@ -38,6 +38,8 @@ setup(
     author='Carleton Coffrin',
     author_email='cjc@lanl.gov',
 
+    install_requires=['numpy'],
+    extras_require={'sparse': ['scipy']},
     setup_requires=['pytest-runner'],
     tests_require=['pytest-cov'],
     test_suite='tests',
@@ -0,0 +1,103 @@
+import cmath, math, pytest
+
+import numpy
+
+import grg_mpdata
+
+from test_common import correct_files
+from test_common import data_file
+
+scipy = pytest.importorskip('scipy')
+
+from grg_mpdata.admittance import make_ybus
+
+
+def _reference_ybus(case):
+    '''makeYbus, one branch at a time'''
+    positions = dict([(x.bus_i, i) for i, x in enumerate(case.bus)])
+    ybus = numpy.zeros((len(case.bus), len(case.bus)), dtype=complex)
+    for i, bus in enumerate(case.bus):
+        ybus[i, i] += (bus.gs + 1j*bus.bs)/case.baseMVA
+    for branch in case.branch:
+        if branch.br_status == 0:
+            continue
+        f = positions[branch.f_bus]
+        t = positions[branch.t_bus]
+        series = 1.0/complex(branch.br_r, branch.br_x)
+        ratio = (branch.tap if branch.tap != 0.0 else 1.0) * \
+            cmath.exp(1j*math.radians(branch.shift))
+        ytt = series + 1j*branch.br_b/2.0
+        ybus[f, f] += ytt/abs(ratio)**2
+        ybus[f, t] += -series/ratio.conjugate()
+        ybus[t, f] += -series/ratio
+        ybus[t, t] += ytt
+    return ybus
+
+
+@pytest.mark.parametrize('input_data', correct_files)
+def test_reference(input_data):
+    case = grg_mpdata.io.parse_mp_case_file(input_data)
+    admittance = make_ybus(case)
+    assert(numpy.allclose(admittance.ybus.toarray(), _reference_ybus(case)))
+    assert(admittance.bus_ids.tolist() == [x.bus_i for x in case.bus])
+
+    columnar = make_ybus(case.as_arrays())
+    assert(numpy.allclose(columnar.ybus.toarray(), admittance.ybus.toarray()))
+
+
+class TestAdmittance:
+    def setup_method(self, _):
+        self.case = grg_mpdata.io.parse_mp_case_file(
+            data_file('pglib-opf/pglib_opf_case200_pserc.m'))
+
+    def test_branch_currents(self):
+        admittance = make_ybus(self.case)
+        assert(scipy.sparse.isspmatrix_csr(admittance.ybus))
+        assert(admittance.yf.shape == (len(self.case.branch),
+                                       len(self.case.bus)))
+
+        # the bus currents are the sum of the branch and shunt currents
+        v = numpy.exp(1j*numpy.linspace(0.0, 0.5, len(self.case.bus)))
+        f = [self.case.bus_positions()[x.f_bus] for x in self.case.branch]
+        t = [self.case.bus_positions()[x.t_bus] for x in self.case.branch]
+        shunt = numpy.array([x.gs + 1j*x.bs for x in self.case.bus]) / \
+            self.case.baseMVA
+        current = numpy.zeros(len(v), dtype=complex)
+        numpy.add.at(current, f, admittance.yf @ v)
+        numpy.add.at(current, t, admittance.yt @ v)
+        assert(numpy.allclose(admittance.ybus @ v, current + shunt*v))
+
+    def test_out_of_service(self):
+        self.case.branch[0].br_r = 0.0
+        self.case.branch[0].br_x = 0.0
+        self.case.branch[0].br_status = 0
+        admittance = make_ybus(self.case)
+        assert(numpy.all(numpy.isfinite(admittance.ybus.data)))
+        assert(admittance.yf[0].nnz == 0 or
+               numpy.all(admittance.yf[0].data == 0))
+
+    def test_negative_status(self):
+        self.case.branch[0].br_status = 0
+        expected = make_ybus(self.case)
+        self.case.branch[0].br_status = -1
+        admittance = make_ybus(self.case)
+        assert((admittance.ybus != expected.ybus).nnz == 0)
+        assert((admittance.yf != expected.yf).nnz == 0)
+
+    def test_cached(self):
+        admittance = self.case.admittance()
+        assert(self.case.admittance() is admittance)
+
+        self.case.update_component('branch', 0, br_status=0)
+        updated = self.case.admittance()
+        assert(updated is not admittance)
+        assert(not numpy.allclose(updated.ybus.toarray(),
+                                  admittance.ybus.toarray()))
+
+        self.case.baseMVA = 2*self.case.baseMVA
+        assert(self.case.admittance() is not updated)
+
+    def test_missing_bus(self):
+        self.case.branch[0].f_bus = -1
+        with pytest.raises(grg_mpdata.exception.MPDataValidationError):
+            make_ybus(self.case)
@@ -0,0 +1,191 @@
+import os, pickle, shutil, pytest, warnings
+
+import numpy
+
+import grg_mpdata
+
+from test_common import correct_files
+from test_common import warning_files
+
+
+def _copy(input_data, tmp_path):
+    path = str(tmp_path / os.path.basename(input_data))
+    shutil.copyfile(input_data, path)
+    return path
+
+
+@pytest.mark.parametrize('input_data', correct_files)
+def test_001(input_data, tmp_path):
+    path = _copy(input_data, tmp_path)
+    case = grg_mpdata.io.parse_mp_case_file(path)
+    assert grg_mpdata.io.parse_mp_case_file(path, cache=True) == case
+    assert os.path.isfile(grg_mpdata.cache.cache_path(path))
+    assert grg_mpdata.io.parse_mp_case_file(path, cache=True) == case
+
+
+@pytest.mark.parametrize('input_data', warning_files)
+def test_002(input_data, tmp_path):
+    path = _copy(input_data, tmp_path)
+    with warnings.catch_warnings(record=True) as expected:
+        warnings.simplefilter('always')
+        grg_mpdata.io.parse_mp_case_file(path)
+    for i in range(0, 2):
+        with warnings.catch_warnings(record=True) as cached:
+            warnings.simplefilter('always')
+            grg_mpdata.io.parse_mp_case_file(path, cache=True)
+        assert [(str(x.message), x.category) for x in cached] == \
+            [(str(x.message), x.category) for x in expected]
+
+
+class TestInvalidation:
+    def setup_method(self, _):
+        self.source = os.path.dirname(os.path.realpath(__file__))+'/data/correct/case6_001.m'
+
+    def test_001(self, tmp_path):
+        path = _copy(self.source, tmp_path)
+        grg_mpdata.io.parse_mp_case_file(path, cache=True)
+        with open(path, 'r') as mp_file:
+            data = mp_file.read()
+        with open(path, 'w') as mp_file:
+            mp_file.write(data.replace('mpc.baseMVA = 100;', 'mpc.baseMVA = 50;'))
+        case = grg_mpdata.io.parse_mp_case_file(path, cache=True)
+        assert case.baseMVA == 50.0
+        assert grg_mpdata.io.parse_mp_case_file(path, cache=True) == case
+
+    def test_002(self, tmp_path):
+        path = _copy(self.source, tmp_path)
+        grg_mpdata.io.parse_mp_case_file(path, cache=True)
+        os.utime(path, (0, 0))
+        case = grg_mpdata.io.parse_mp_case_file(path, cache=True)
+        assert case == grg_mpdata.io.parse_mp_case_file(path)
+        with open(grg_mpdata.cache.cache_path(path), 'rb') as image_file:
+            assert grg_mpdata.cache._read_header(image_file)['mtime'] == 0
+
+    def test_003(self, tmp_path):
+        path = _copy(self.source, tmp_path)
+        with open(grg_mpdata.cache.cache_path(path), 'wb') as image_file:
+            image_file.write(b'not a cache image')
+        case = grg_mpdata.io.parse_mp_case_file(path, cache=True)
+        assert case == grg_mpdata.io.parse_mp_case_file(path)
+
+    def test_004(self, tmp_path):
+        path = _copy(self.source, tmp_path)
+        cache_dir = str(tmp_path / 'cache')
+        case = grg_mpdata.io.parse_mp_case_file(path, cache_dir=cache_dir)
+        assert not os.path.isfile(grg_mpdata.cache.cache_path(path))
+        assert os.path.isfile(grg_mpdata.cache.cache_path(path, cache_dir))
+        assert grg_mpdata.io.parse_mp_case_file(path, cache_dir=cache_dir) == case
+
+    def test_005(self, tmp_path):
+        path = _copy(self.source, tmp_path)
+        case = grg_mpdata.io.parse_mp_case_file(path, backend='numpy', cache=True)
+        assert isinstance(case, grg_mpdata.columnar.ColumnarCase)
+        assert case == grg_mpdata.io.parse_mp_case_file(path, backend='numpy', cache=True)
+        assert case.to_case() == grg_mpdata.io.parse_mp_case_file(path)
+
+    def test_006(self, tmp_path):
+        path = _copy(self.source, tmp_path)
+        with pytest.raises(ValueError):
+            grg_mpdata.io.parse_mp_case_file(path, backend='foo', cache=True)
+
+    def test_007(self, tmp_path):
+        path = _copy(self.source, tmp_path)
+        grg_mpdata.io.parse_mp_case_file(path, cache=True)
+        stat = os.stat(path)
+        with open(path, 'r') as mp_file:
+            data = mp_file.read()
+        # an edit that keeps the size, with the modification time restored
+        changed = data.replace('mpc.baseMVA = 100;', 'mpc.baseMVA = 200;')
+        assert len(changed) == len(data) and changed != data
+        with open(path, 'w') as mp_file:
+            mp_file.write(changed)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        assert os.stat(path).st_size == stat.st_size
+        case = grg_mpdata.io.parse_mp_case_file(path, cache=True)
+        assert case.baseMVA == 200.0
+        assert case == grg_mpdata.io.parse_mp_case_file(path)
+
+
+@pytest.mark.parametrize('input_data', correct_files)
+def test_003(input_data, tmp_path):
+    path = _copy(input_data, tmp_path)
+    case = grg_mpdata.io.parse_mp_case_file(path, backend='numpy')
+    for i in range(0, 2):
+        mapped = grg_mpdata.cache.map_case(path)
+        assert mapped == case
+        assert mapped.to_case() == grg_mpdata.io.parse_mp_case_file(path)
+        assert mapped.to_matpower() == case.to_matpower()
+
+
+class TestMapped:
+    def setup_method(self, _):
+        self.source = os.path.dirname(os.path.realpath(__file__))+'/data/correct/pglib-opf/pglib_opf_case14_ieee.m'
+
+    def test_001(self, tmp_path):
+        path = _copy(self.source, tmp_path)
+        grg_mpdata.io.parse_mp_case_file(path, cache=True)
+        case = grg_mpdata.cache.map_case(path)
+        assert isinstance(case.bus.data, numpy.memmap)
+        assert not case.bus.data.flags.writeable
+        with pytest.raises(ValueError):
+            case.bus['pd'][0] = 1.0
+
+    def test_002(self, tmp_path):
+        path = _copy(self.source, tmp_path)
+        case = grg_mpdata.cache.map_case(path)
+        assert isinstance(case.branch.data, numpy.memmap)
+        branch = case.branch[3]
+        assert isinstance(branch, grg_mpdata.struct.Branch)
+        assert branch == grg_mpdata.io.parse_mp_case_file(path).branch[3]
+
+    def test_003(self, tmp_path):
+        path = _copy(self.source, tmp_path)
+        case = grg_mpdata.cache.map_case(path)
+        with open(path, 'a') as mp_file:
+            mp_file.write('\n% appended comment\n')
+        remapped = grg_mpdata.cache.map_case(path)
+        assert remapped == case
+        assert case.bus['pd'].sum() == remapped.bus['pd'].sum()
+
+    def test_004(self, tmp_path):
+        path = _copy(self.source, tmp_path)
+        grg_mpdata.io.parse_mp_case_file(path, cache=True)
+        image_path = grg_mpdata.cache.cache_path(path)
+        with open(image_path, 'rb') as image_file:
+            data = image_file.read()
+        with open(image_path, 'wb') as image_file:
+            image_file.write(data[:len(data)//2])
+        case = grg_mpdata.cache.map_case(path)
+        assert case == grg_mpdata.io.parse_mp_case_file(path, backend='numpy')
+
+
+class TestHeader:
+    def setup_method(self, _):
+        self.source = os.path.dirname(os.path.realpath(__file__))+'/data/correct/case6_001.m'
+
+    def test_001(self, tmp_path):
+        path = _copy(self.source, tmp_path)
+        grg_mpdata.io.parse_mp_case_file(path, cache=True)
+        with open(grg_mpdata.cache.cache_path(path), 'rb') as image_file:
+            assert image_file.read(8) == grg_mpdata.cache._MAGIC
+        with open(grg_mpdata.cache.cache_path(path), 'rb') as image_file:
+            header = grg_mpdata.cache._read_header(image_file)
+        assert header['size'] == os.path.getsize(path)
+        assert [x[0] for x in header['tables']][:2] == ['bus', 'gen']
+
+    def test_002(self, tmp_path):
+        path = _copy(self.source, tmp_path)
+        with open(grg_mpdata.cache.cache_path(path), 'wb') as image_file:
+            pickle.dump({'format': grg_mpdata.cache.CACHE_FORMAT_VERSION},
+                        image_file)
+        with open(grg_mpdata.cache.cache_path(path), 'rb') as image_file:
+            assert grg_mpdata.cache._read_header(image_file) is None
+        assert grg_mpdata.io.parse_mp_case_file(path, cache=True) == \
+            grg_mpdata.io.parse_mp_case_file(path)
+
+    def test_003(self):
+        assert grg_mpdata.cache._warning_category('MPDataWarning') is \
+            grg_mpdata.exception.MPDataWarning
+        assert grg_mpdata.cache._warning_category('DeprecationWarning') is \
+            DeprecationWarning
+        assert grg_mpdata.cache._warning_category('__import__') is UserWarning
@@ -77,3 +77,10 @@ class TestCLI:
         equiv = grg_mpdata.cmd.main(args)
         assert(equiv)
 
+
+    def test_eq_003(self, monkeypatch):
+        def render(case):
+            raise AssertionError('cmd eq rendered a case')
+        monkeypatch.setattr(grg_mpdata.struct.Case, 'to_matpower', render)
+        args = self.parser.parse_args(['eq', self.case_2_file, self.case_3_file])
+        assert(grg_mpdata.cmd.main(args))
@@ -0,0 +1,109 @@
+import os, pytest, warnings
+
+import numpy
+
+import grg_mpdata
+
+from test_common import correct_files
+from test_common import warning_files
+from test_common import incorrect_files
+
+
+@pytest.mark.parametrize('input_data', correct_files + warning_files)
+def test_001(input_data):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        case = grg_mpdata.io.parse_mp_case_file(input_data)
+    columnar_case = case.as_arrays()
+    case_2 = columnar_case.to_case()
+    assert case == case_2
+    assert case.to_matpower() == case_2.to_matpower()
+    assert columnar_case == case_2.as_arrays()
+    assert columnar_case.to_matpower() == case.to_matpower()
+
+
+class TestColumns:
+    def setup_method(self, _):
+        self.case = grg_mpdata.io.parse_mp_case_file(os.path.dirname(os.path.realpath(__file__))+'/data/correct/case6_001.m')
+        self.columnar_case = self.case.as_arrays()
+
+    def test_001(self):
+        bus = self.columnar_case.bus
+        assert len(bus) == len(self.case.bus)
+        assert bus['bus_i'].dtype == numpy.int64
+        assert bus['pd'].dtype == numpy.float64
+        assert bus.pd.tolist() == [x.pd for x in self.case.bus]
+
+    def test_002(self):
+        branch = self.columnar_case.branch
+        assert branch[0] == self.case.branch[0]
+        assert branch[-1] == self.case.branch[-1]
+        assert list(branch[1:3]) == self.case.branch[1:3]
+        with pytest.raises(IndexError):
+            branch[len(branch)]
+
+    def test_003(self):
+        gencost = self.columnar_case.gencost
+        assert gencost['cost'].shape[0] == len(self.case.gencost)
+        assert gencost.cost_len.tolist() == [len(x.cost) for x in self.case.gencost]
+
+    def test_004(self):
+        with pytest.raises(AttributeError):
+            self.columnar_case.bus.not_a_column
+
+    def test_005(self):
+        other = self.case.as_arrays()
+        other.bus['pd'][0] += 1.0
+        assert self.columnar_case != other
+
+
+@pytest.mark.parametrize('input_data', correct_files)
+def test_002(input_data):
+    case = grg_mpdata.io.parse_mp_case_file(input_data)
+    columnar_case = grg_mpdata.io.parse_mp_case_file(input_data, backend='numpy')
+    assert isinstance(columnar_case, grg_mpdata.columnar.ColumnarCase)
+    assert case == columnar_case.to_case()
+
+
+@pytest.mark.parametrize('input_data', warning_files)
+def test_003(input_data):
+    with pytest.warns(grg_mpdata.exception.MPDataWarning):
+        grg_mpdata.io.parse_mp_case_file(input_data, backend='numpy')
+
+
+@pytest.mark.parametrize('input_data', incorrect_files)
+def test_004(input_data):
+    with pytest.raises(grg_mpdata.exception.MPDataException):
+        grg_mpdata.io.parse_mp_case_file(input_data, backend='numpy')
+
+
+def test_005():
+    mp_data = 'function mpc = case1\nmpc.version = \'2\';\nmpc.baseMVA = 100.0;\n' \
+        'mpc.bus = [1 3 0 0 0 0 1 1 0 240 1 1.1 0.9];\n' \
+        'mpc.gen = [1 0 0 10 -10 1 100 1 10 0];\n' \
+        'mpc.branch = [1 1 0.1 0.2];\n'
+    case = grg_mpdata.io.parse_mp_case_str(mp_data, backend='numpy')
+    assert case.gen['pc1'].tolist() == [0.0]
+    assert case.branch['br_status'].tolist() == [1]
+    assert case.branch['angmax'].tolist() == [360.0]
+    assert case.to_case() == grg_mpdata.io.parse_mp_case_str(mp_data)
+
+
+def test_006():
+    mp_data = 'mpc.bus = [1 3 0 0 0 0 1 1 0 240 1 1.1 0.9 0 0 0 0 0];\n'
+    with pytest.raises(grg_mpdata.exception.MPDataParsingError):
+        grg_mpdata.io.parse_mp_case_str(mp_data, backend='numpy')
+
+
+def test_007():
+    with pytest.raises(ValueError):
+        grg_mpdata.io.parse_mp_case_str('', backend='other')
+
+
+def test_008():
+    data = 'mpc.bus = [\n1.7 3 0 0 0 0 1 1 0 230 1 1.1 0.9;\n];\n'
+    with pytest.raises(grg_mpdata.exception.MPDataParsingError):
+        grg_mpdata.io.parse_mp_case_str(data, backend='numpy')
+    data = 'mpc.bus = [\n1 3 0 0 0 0 1 1 0 230 NaN 1.1 0.9;\n];\n'
+    with pytest.raises(grg_mpdata.exception.MPDataParsingError):
+        grg_mpdata.io.parse_mp_case_str(data, backend='numpy')
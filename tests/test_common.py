@@ -28,3 +28,21 @@ for wd, directory, files in os.walk(os.path.dirname(os.path.realpath(__file__))+
             incorrect_files.append(wd+'/'+file)
 del wd, directory, files
 
+
+
+def data_file(name):
+    '''the path of a file in data/correct'''
+    return os.path.dirname(os.path.realpath(__file__))+'/data/correct/'+name
+
+
+def recorded_warnings(function):
+    '''calls function and records the warnings it raises
+
+    Returns:
+        tuple: the result of the call and a list of the (message, category)
+        of each warning
+    '''
+    with warnings.catch_warnings(record=True) as recorded:
+        warnings.simplefilter('always')
+        result = function()
+    return result, [(str(x.message), x.category) for x in recorded]
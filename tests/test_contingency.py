@@ -0,0 +1,131 @@
+import copy, pickle, pytest
+
+import grg_mpdata
+
+from grg_mpdata.contingency import n_minus_one
+from grg_mpdata.contingency import outage_case
+from grg_mpdata.struct import OverlayComponentList
+
+from test_common import data_file
+
+
+class TestOutageCase:
+    def setup_method(self, _):
+        self.case = grg_mpdata.io.parse_mp_case_file(
+            data_file('pglib-opf/pglib_opf_case30_ieee.m'))
+
+    def test_branch(self):
+        overlay = outage_case(self.case, 'branch', 3)
+        assert(overlay.name == 'pglib_opf_case30_ieee_branch_3')
+        assert(overlay.branch[3].br_status == 0)
+        assert(self.case.branch[3].br_status == 1)
+        assert(overlay.branch[2] is self.case.branch[2])
+        assert(overlay.bus[0] is self.case.bus[0])
+        assert(overlay.gen == self.case.gen)
+
+    def test_update_component(self):
+        bus_lookup = self.case.bus_lookup()
+        fingerprint = self.case.fingerprint()
+        revision = self.case.revision
+        overlay = outage_case(self.case, 'branch', 3)
+        overlay.update_component('bus', 0, bus_i=1000)
+        overlay.update_component('branch', 2, br_status=0)
+        overlay.update_component('branch', 3, rate_a=1.0)
+        assert(overlay.bus[0].bus_i == 1000)
+        assert(overlay.branch[2].br_status == 0)
+        assert(overlay.branch[3].rate_a == 1.0)
+        assert(self.case.bus[0].bus_i == 1)
+        assert(self.case.branch[2].br_status == 1)
+        assert(self.case.branch[3].rate_a != 1.0)
+        assert(self.case.revision == revision)
+        assert(self.case.bus_lookup() is bus_lookup)
+        assert(self.case.fingerprint() == fingerprint)
+        assert(1000 in overlay.bus_lookup())
+
+    def test_matpower(self):
+        overlay = outage_case(self.case, 'gen', -1, name='outage')
+        expected = copy.deepcopy(self.case)
+        expected.gen[-1].gen_status = 0
+        expected.name = 'outage'
+        assert(overlay == expected)
+        assert(overlay.to_matpower() == expected.to_matpower())
+        overlay.validate()
+
+    def test_copies(self):
+        overlay = outage_case(self.case, 'branch', 0)
+        assert(copy.deepcopy(overlay) == overlay)
+        assert(pickle.loads(pickle.dumps(overlay)) == overlay)
+        assert(overlay.as_arrays().branch['br_status'][0] == 0)
+
+    def test_unknown_table(self):
+        with pytest.raises(ValueError):
+            outage_case(self.case, 'bus', 0)
+
+
+class TestNMinusOne:
+    def test_in_service(self):
+        case = grg_mpdata.io.parse_mp_case_file(
+            data_file('powermodels/case7_tplgy.m'))
+        outages = [(x, y) for x, y, z in
+                   n_minus_one(case, ('branch', 'gen', 'dcline'))]
+        assert(outages == [('branch', 4), ('branch', 5), ('branch', 6),
+            ('branch', 7), ('gen', 0), ('gen', 1), ('gen', 2),
+            ('dcline', 1), ('dcline', 2)])
+
+    def test_lazy(self):
+        case = grg_mpdata.io.parse_mp_case_file(data_file('case3_000.m'))
+        contingencies = n_minus_one(case)
+        table_name, position, overlay = next(contingencies)
+        assert((table_name, position) == ('branch', 0))
+        assert(overlay.branch[0].br_status == 0)
+        assert(sum([1 for x in contingencies]) ==
+               len(case.branch) + len(case.gen) - 1)
+
+    def test_missing_table(self):
+        case = grg_mpdata.io.parse_mp_case_file(data_file('case3_000.m'))
+        assert(len(list(n_minus_one(case, ('dcline',)))) == 0)
+
+    def test_negative_status(self):
+        case = grg_mpdata.io.parse_mp_case_file(data_file('case3_000.m'))
+        case.gen[0].gen_status = -1
+        outages = [(x, y) for x, y, z in n_minus_one(case, ('gen',))]
+        assert(outages == [('gen', x) for x in range(1, len(case.gen))])
+
+
+class TestOverlayComponentList:
+    def setup_method(self, _):
+        self.base = ['a', 'b', 'c', 'd']
+        self.overlay = OverlayComponentList(self.base, {1: 'x', -1: 'y'})
+
+    def test_read(self):
+        assert(len(self.overlay) == 4)
+        assert(list(self.overlay) == ['a', 'x', 'c', 'y'])
+        assert(self.overlay[-3] == 'x')
+        assert(self.overlay[1:3] == ['x', 'c'])
+        assert(self.overlay == ['a', 'x', 'c', 'y'])
+        assert(not self.overlay.materialized)
+
+    def test_follows_base(self):
+        self.base[0] = 'z'
+        assert(self.overlay[0] == 'z')
+
+    def test_modify(self):
+        self.overlay.append('e')
+        assert(self.overlay.materialized)
+        assert(self.overlay == ['a', 'x', 'c', 'y', 'e'])
+        assert(self.base == ['a', 'b', 'c', 'd'])
+        self.base[0] = 'z'
+        assert(self.overlay[0] == 'a')
+
+    def test_copy_on_write(self):
+        base = [[0], [1], [2]]
+        overlay = OverlayComponentList(base, {})
+        overlay.copy_on_write(-1).append(3)
+        assert(overlay == [[0], [1], [2, 3]])
+        assert(base == [[0], [1], [2]])
+        assert(overlay.copy_on_write(2) is overlay[2])
+        with pytest.raises(IndexError):
+            overlay.copy_on_write(3)
+        overlay.append([4])
+        overlay[0].append(5)
+        assert(base == [[0], [1], [2]])
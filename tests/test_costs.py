@@ -0,0 +1,282 @@
+import pytest, warnings
+
+import numpy
+
+import grg_mpdata
+
+from grg_mpdata.costs import CostModels
+from grg_mpdata.costs import convert_costs
+from grg_mpdata.costs import generator_costs
+from grg_mpdata.costs import to_polynomial
+from grg_mpdata.costs import to_pwl
+from grg_mpdata.costs import total_cost
+from grg_mpdata.exception import MPDataValidationError
+from grg_mpdata.struct import DCLineCost
+from grg_mpdata.struct import GeneratorCost
+
+from test_common import correct_files
+from test_common import data_file
+
+
+def _cost(cost, x):
+    '''evaluates one cost model in python'''
+    if cost.model == 2:
+        return sum([c*x**(cost.ncost-1-i) for i, c in enumerate(cost.cost)])
+    xs, ys = cost.cost[0::2], cost.cost[1::2]
+    k = 0
+    while k < len(xs) - 2 and x > xs[k+1]:
+        k += 1
+    return ys[k] + (ys[k+1]-ys[k])/(xs[k+1]-xs[k])*(x-xs[k])
+
+
+@pytest.mark.parametrize('input_data', correct_files)
+def test_matpower(input_data):
+    case = grg_mpdata.io.parse_mp_case_file(input_data)
+    if case.gencost is None:
+        return
+    active, reactive = generator_costs(case)
+    pg = numpy.array([x.pmax for x in case.gen])
+    expected = [_cost(x, y) for x, y in zip(case.gencost, pg)]
+    assert(numpy.allclose(active.evaluate(pg), expected))
+
+
+class TestPolynomial:
+    def setup_method(self, _):
+        self.case = grg_mpdata.io.parse_mp_case_file(
+            data_file('pglib-opf/pglib_opf_case30_ieee.m'))
+        self.costs = CostModels(self.case.gencost)
+        self.pg = numpy.random.RandomState(0).uniform(0.0, 100.0,
+            (50, len(self.case.gen)))
+
+    def test_evaluate(self):
+        values = self.costs.evaluate(self.pg)
+        assert(values.shape == self.pg.shape)
+        assert(values[7, 2] == pytest.approx(
+            _cost(self.case.gencost[2], self.pg[7, 2])))
+
+    def test_marginal(self):
+        step = 1e-6
+        numeric = (self.costs.evaluate(self.pg + step) -
+                   self.costs.evaluate(self.pg - step))/(2*step)
+        assert(numpy.allclose(self.costs.marginal(self.pg), numeric))
+
+    def test_columnar(self):
+        case = self.case.as_arrays()
+        assert(numpy.array_equal(CostModels(case.gencost).evaluate(self.pg),
+                                 self.costs.evaluate(self.pg)))
+
+    def test_total(self):
+        total = total_cost(self.case, self.pg)
+        assert(total.shape == (50,))
+        assert(total[3] == pytest.approx(sum([_cost(x, y) for x, y in
+               zip(self.case.gencost, self.pg[3])])))
+
+    def test_checks(self):
+        costs = CostModels([GeneratorCost(0, 2, 0, 0, 3, [1.0, -2.0, 0.0]),
+                            GeneratorCost(1, 2, 0, 0, 3, [-1.0, 5.0, 0.0]),
+                            GeneratorCost(2, 2, 0, 0, 4, [1.0, 0, 0, 0]),
+                            GeneratorCost(3, 2, 0, 0, 2, [2.0, 1.0])])
+        assert(list(costs.convex()) == [True, False, False, True])
+        assert(list(costs.monotone(1.0, 2.0)) == [True, True, True, True])
+        assert(list(costs.monotone(0.0, 2.0)) == [False, True, True, True])
+        assert(list(costs.monotone(0.0, 4.0)) == [False, False, True, True])
+        assert(list(costs.monotone([0.0, 0.0, 0.0, 0.0],
+                                   [4.0, 2.0, 4.0, 4.0])) ==
+               [False, True, True, True])
+        with pytest.raises(ValueError):
+            costs.monotone()
+        with pytest.raises(ValueError):
+            costs.monotone(0.0)
+
+
+class TestPiecewiseLinear:
+    def setup_method(self, _):
+        self.case = grg_mpdata.io.parse_mp_case_file(
+            data_file('powermodels/case5_pwlc.m'))
+        self.costs = CostModels(self.case.gencost)
+
+    def test_evaluate(self):
+        pg = [0.05, 50.0, 200.0, 30.0, 8.5]
+        assert(numpy.allclose(self.costs.evaluate(pg),
+            [0.0, 841.0, 4772.0 + 30*1431.0/61, 1122.0 + 8*295.0/11, 1333.0]))
+
+    def test_extrapolate(self):
+        pg = [0.0, 0.0, 160.0, 60.0, 8.0]
+        assert(numpy.allclose(self.costs.evaluate(pg),
+            [0.0, 841.0, 4772.0 - 10*1431.0/61, 2075.0 + 5*333.0/11, 1187.0]))
+        assert(numpy.allclose(self.costs.marginal(pg),
+            [0.0, 0.0, 1431.0/61, 333.0/11, 290.0]))
+
+    def test_checks(self):
+        assert(self.costs.convex().all())
+        assert(self.costs.monotone().all())
+        assert(self.costs.increasing_breakpoints().all())
+
+        costs = CostModels([GeneratorCost(0, 1, 0, 0, 3, [0, 0, 2, 3, 4, 5]),
+                            GeneratorCost(1, 1, 0, 0, 3, [0, 5, 1, 4, 2, 4]),
+                            GeneratorCost(2, 1, 0, 0, 3, [0, 0, 2, 1, 1, 3])])
+        assert(list(costs.convex()) == [False, True, False])
+        assert(list(costs.monotone()) == [True, False, False])
+        assert(list(costs.increasing_breakpoints()) == [True, True, False])
+
+    def test_mixed(self):
+        costs = CostModels([GeneratorCost(0, 1, 0, 0, 2, [0, 0, 10, 20]),
+                            GeneratorCost(1, 2, 0, 0, 3, [1.0, 0.0, 1.0]),
+                            GeneratorCost(2, 3, 0, 0, 1, [1.0])])
+        values = costs.evaluate([[5.0, 2.0, 1.0], [10.0, 3.0, 1.0]])
+        assert(numpy.array_equal(values[:, :2], [[10.0, 5.0], [20.0, 10.0]]))
+        assert(numpy.isnan(values[:, 2]).all())
+        assert(list(costs.convex()) == [True, True, False])
+
+    def test_dispatch_size(self):
+        with pytest.raises(ValueError):
+            self.costs.evaluate([1.0, 2.0])
+
+
+class TestReactive:
+    def setup_method(self, _):
+        self.case = grg_mpdata.io.parse_mp_case_file(data_file('case6_001.m'))
+
+    def test_layout(self):
+        active, reactive = generator_costs(self.case)
+        assert(len(active) == len(reactive) == 3)
+        pg = numpy.array([[10.0, 20.0, 30.0], [0.0, 0.0, 0.0]])
+        qg = numpy.array([[1.0, 2.0, 3.0], [0.0, 0.0, 0.0]])
+        assert(numpy.allclose(total_cost(self.case, pg),
+                              active.evaluate(pg).sum(axis=1)))
+        assert(numpy.allclose(total_cost(self.case, pg, qg),
+            active.evaluate(pg).sum(axis=1) + reactive.evaluate(qg).sum(axis=1)))
+
+    def test_mismatch(self):
+        self.case.gencost.pop()
+        with pytest.raises(MPDataValidationError):
+            generator_costs(self.case)
+
+
+@pytest.mark.parametrize('input_data', correct_files)
+@pytest.mark.parametrize('model', [1, 2])
+def test_convert_valid(input_data, model):
+    case = grg_mpdata.io.parse_mp_case_file(input_data)
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        for cost in case.gencost or []:
+            cost.validate()
+        for cost in case.dclinecost or []:
+            cost.validate()
+    if len(caught) > 0 or (case.gencost is not None and
+                           len(case.gencost) not in (len(case.gen),
+                                                     2*len(case.gen))):
+        return
+
+    converted = convert_costs(case, model)
+    assert(converted.gen is case.gen)
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        for cost in converted.gencost or []:
+            assert(cost.model == model)
+            assert(model == 1 or cost.ncost == 3)
+            cost.validate()
+        for cost in converted.dclinecost or []:
+            assert(cost.model == model)
+            assert(model == 1 or cost.ncost == 3)
+            cost.validate()
+    assert(len(caught) == 0)
+
+
+class TestConversion:
+    def setup_method(self, _):
+        self.pwl = [GeneratorCost(0, 1, 10, 0, 4,
+                                  [0, 0, 10, 100, 20, 400, 30, 900]),
+                    GeneratorCost(1, 1, 0, 0, 2, [5, 10, 15, 30]),
+                    GeneratorCost(2, 1, 0, 0, 1, [5, 10])]
+        self.polynomial = [GeneratorCost(0, 2, 0, 5, 3, [0.5, 2.0, 1.0]),
+                           GeneratorCost(1, 2, 0, 0, 2, [3.0, 1.0]),
+                           GeneratorCost(2, 2, 0, 0, 4, [1.0, 0, 0, 0])]
+
+    def test_fit(self):
+        costs = to_polynomial(self.pwl)
+        assert([x.ncost for x in costs] == [3, 3, 3])
+        assert(costs[0].startup == 10)
+        assert(numpy.allclose(costs[0].cost, [1.0, 0.0, 0.0], atol=1e-9))
+        assert(numpy.allclose(costs[1].cost, [0.0, 2.0, 0.0], atol=1e-9))
+        assert(numpy.allclose(costs[2].cost, [0.0, 0.0, 10.0], atol=1e-9))
+        assert(self.pwl[0].model == 1)
+
+    def test_least_squares(self):
+        cost = GeneratorCost(0, 1, 0, 0, 4, [0, 0, 1, 1, 2, 0, 3, 1])
+        fit = to_polynomial([cost], 1)[0]
+        assert(numpy.allclose(fit.cost, numpy.polyfit([0, 1, 2, 3],
+                                                      [0, 1, 0, 1], 1)))
+
+    def test_pad(self):
+        costs = to_polynomial(self.polynomial[:2])
+        assert(costs[0] == self.polynomial[0])
+        assert(costs[0] is not self.polynomial[0])
+        assert(costs[1].cost == [0.0, 3.0, 1.0])
+
+    def test_refit(self):
+        costs = to_polynomial(self.polynomial, 2, 0.0, [10.0, 20.0, 2.0])
+        assert([x.ncost for x in costs] == [3, 3, 3])
+        assert(costs[0] == self.polynomial[0])
+        x = numpy.linspace(0.0, 2.0, 8)
+        assert(numpy.allclose(costs[2].cost, numpy.polyfit(x, x**3, 2)))
+        with pytest.raises(ValueError):
+            to_polynomial(self.polynomial)
+
+    def test_sample(self):
+        costs = to_pwl(self.polynomial, 0.0, [10.0, 20.0, 2.0], segments=2)
+        assert(costs[0].ncost == 3)
+        assert(costs[0].cost == [0.0, 1.0, 5.0, 23.5, 10.0, 71.0])
+        assert(costs[1].cost == [0.0, 1.0, 10.0, 31.0, 20.0, 61.0])
+        assert(costs[2].cost == [0.0, 0.0, 1.0, 1.0, 2.0, 8.0])
+        assert(to_pwl(self.pwl, 0.0, 1.0) == self.pwl)
+
+    def test_round_trip(self):
+        costs = to_polynomial(to_pwl(self.polynomial[:2], -5.0, 5.0))
+        assert(numpy.allclose(costs[0].cost, self.polynomial[0].cost))
+        assert(numpy.allclose(costs[1].cost, [0.0, 3.0, 1.0], atol=1e-9))
+
+    def test_empty_range(self):
+        cost = to_pwl(self.polynomial[:1], 5.0, 5.0, segments=1)[0]
+        assert(cost.cost[0::2] == [5.0, 6.0])
+        cost.validate()
+
+    def test_class(self):
+        costs = [DCLineCost(0, 2, 0, 0, 2, [1.0, 0.0])]
+        assert(isinstance(to_pwl(costs, 0, 1)[0], DCLineCost))
+        table = grg_mpdata.columnar.ColumnTable.from_components(
+            grg_mpdata.columnar._dclinecost_spec, costs)
+        assert(isinstance(to_polynomial(table)[0], DCLineCost))
+
+    def test_bad_arguments(self):
+        with pytest.raises(ValueError):
+            to_polynomial(self.pwl, -1)
+        with pytest.raises(ValueError):
+            to_pwl(self.polynomial, 0, 1, segments=0)
+        case = grg_mpdata.io.parse_mp_case_file(data_file('case3_000.m'))
+        with pytest.raises(ValueError):
+            convert_costs(case, 3)
+
+
+class TestConvertCase:
+    def test_ranges(self):
+        case = grg_mpdata.io.parse_mp_case_file(data_file('case6_001.m'))
+        converted = convert_costs(case, 1, segments=5, name='pwl')
+        assert(converted.name == 'pwl')
+        for gen, active, reactive in zip(case.gen, converted.gencost[:3],
+                                         converted.gencost[3:]):
+            assert(active.cost[0] == gen.pmin and active.cost[-2] == gen.pmax)
+            assert(reactive.cost[0] == gen.qmin)
+            assert(reactive.cost[-2] == gen.qmax)
+        assert(case.gencost[0].model == 2)
+
+    def test_dcline(self):
+        case = grg_mpdata.io.parse_mp_case_file(
+            data_file('powermodels/case5_dc.m'))
+        converted = convert_costs(case.as_arrays(), 1)
+        assert(len(converted.dclinecost) == len(case.dclinecost) > 0)
+        for line, cost in zip(case.dcline, converted.dclinecost):
+            assert(cost.model == 1)
+            if line.pmax > line.pmin:
+                assert(cost.cost[0] == line.pmin)
+                assert(cost.cost[-2] == line.pmax)
@@ -0,0 +1,145 @@
+import pytest
+
+import numpy
+
+import grg_mpdata
+
+pytest.importorskip('scipy')
+
+from grg_mpdata.dcflow import DCNetwork
+from grg_mpdata.dcflow import bus_injections
+
+from test_common import data_file
+
+
+def _reference_angles(case, injections):
+    '''rundcpf with a dense solve, one branch at a time'''
+    positions = case.bus_positions()
+    b = numpy.zeros((len(case.bus), len(case.bus)))
+    shifted = numpy.zeros(len(case.bus))
+    for branch in case.branch:
+        if branch.br_status == 0:
+            continue
+        f = positions[branch.f_bus]
+        t = positions[branch.t_bus]
+        susceptance = 1.0/branch.br_x/(branch.tap if branch.tap != 0 else 1.0)
+        b[f, f] += susceptance
+        b[t, t] += susceptance
+        b[f, t] -= susceptance
+        b[t, f] -= susceptance
+        shifted[f] -= susceptance*numpy.radians(branch.shift)
+        shifted[t] += susceptance*numpy.radians(branch.shift)
+
+    reference = [x.bus_type for x in case.bus].index(3)
+    others = [i for i in range(0, len(case.bus)) if i != reference]
+    net = injections - shifted - \
+        numpy.array([x.gs for x in case.bus])/case.baseMVA
+    angles = numpy.zeros(len(case.bus))
+    angles[reference] = numpy.radians(case.bus[reference].va)
+    angles[others] = numpy.linalg.solve(b[numpy.ix_(others, others)],
+        net[others] - b[others, reference]*angles[reference])
+    return angles
+
+
+@pytest.mark.parametrize('name', ['case3_000.m',
+    'pglib-opf/pglib_opf_case30_ieee.m', 'pglib-opf/pglib_opf_case89_pegase.m',
+    'powermodels/case5.m'])
+def test_reference(name):
+    case = grg_mpdata.io.parse_mp_case_file(data_file(name))
+    injections = bus_injections(case)
+    network = DCNetwork(case)
+    angles, flows = network.power_flow(injections)
+    assert(numpy.allclose(angles, _reference_angles(case, injections)))
+
+    positions = case.bus_positions()
+    for branch, flow in zip(case.branch, flows):
+        f = positions[branch.f_bus]
+        t = positions[branch.t_bus]
+        tap = branch.tap if branch.tap != 0 else 1.0
+        expected = (angles[f] - angles[t] - numpy.radians(branch.shift)) / \
+            branch.br_x/tap*branch.br_status
+        assert(flow == pytest.approx(expected))
+
+
+class TestDCNetwork:
+    def setup_method(self, _):
+        self.case = grg_mpdata.io.parse_mp_case_file(
+            data_file('pglib-opf/pglib_opf_case30_ieee.m'))
+        self.network = DCNetwork(self.case)
+        self.injections = bus_injections(self.case)
+
+    def test_injections(self):
+        pg = sum([x.pg for x in self.case.gen if x.gen_status > 0])
+        pd = sum([x.pd for x in self.case.bus])
+        assert(self.injections.sum() == pytest.approx((pg - pd)/100.0))
+
+    def test_batch(self):
+        scenarios = numpy.random.RandomState(0).normal(
+            size=(len(self.case.bus), 20))
+        angles, flows = self.network.power_flow(scenarios)
+        assert(angles.shape == scenarios.shape)
+        assert(flows.shape == (len(self.case.branch), 20))
+        for k in [0, 7, 19]:
+            angles_k, flows_k = self.network.power_flow(scenarios[:, k])
+            assert(numpy.allclose(angles[:, k], angles_k))
+            assert(numpy.allclose(flows[:, k], flows_k))
+
+    def test_factor_reused(self):
+        factor = self.network.factor
+        self.network.angles(self.injections)
+        self.network.ptdf()
+        assert(self.network.factor is factor)
+
+    def test_ptdf(self):
+        ptdf = self.network.ptdf()
+        assert(ptdf.shape == (len(self.case.branch), len(self.case.bus)))
+        assert(numpy.all(ptdf[:, self.network.reference] == 0.0))
+
+        base = self.network.power_flow(self.injections)[1]
+        for bus in [1, 10, 29]:
+            transfer = numpy.zeros(len(self.case.bus))
+            transfer[bus] = 1.0
+            transfer[self.network.reference] -= 1.0
+            flows = self.network.power_flow(self.injections + transfer)[1]
+            assert(numpy.allclose(flows - base, ptdf[:, bus]))
+
+    def test_lodf(self):
+        lodf = self.network.lodf()
+        base = self.network.power_flow(self.injections)[1]
+        for k in [0, 5, 20]:
+            assert(numpy.isfinite(lodf[:, k]).all())
+            self.case.branch[k].br_status = 0
+            flows = DCNetwork(self.case).power_flow(self.injections)[1]
+            self.case.branch[k].br_status = 1
+            expected = base + lodf[:, k]*base[k]
+            assert(numpy.allclose(numpy.delete(flows, k),
+                                  numpy.delete(expected, k)))
+            assert(flows[k] == 0.0)
+
+    def test_negative_status(self):
+        self.case.branch[3].br_status = 0
+        expected = DCNetwork(self.case)
+        self.case.branch[3].br_status = -1
+        network = DCNetwork(self.case)
+        assert((network.bbus != expected.bbus).nnz == 0)
+        assert(numpy.array_equal(network.ptdf(), expected.ptdf()))
+        assert(network.power_flow(self.injections)[1][3] == 0.0)
+
+    def test_cached(self):
+        network = self.case.dc_network()
+        assert(self.case.dc_network() is network)
+        self.case.update_component('branch', 0, br_x=1.0)
+        assert(self.case.dc_network() is not network)
+
+    def test_no_reference(self):
+        for bus in self.case.bus:
+            bus.bus_type = 1
+        with pytest.raises(grg_mpdata.exception.MPDataValidationError):
+            DCNetwork(self.case)
+
+    def test_islands(self):
+        case = grg_mpdata.io.parse_mp_case_file(
+            data_file('powermodels/case7_tplgy.m'))
+        network = DCNetwork(case)
+        with pytest.raises(grg_mpdata.exception.MPDataValidationError):
+            network.angles(bus_injections(case))
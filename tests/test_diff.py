@@ -0,0 +1,105 @@
+import copy, pytest
+
+import grg_mpdata
+
+from grg_mpdata.diff import diff_cases
+from grg_mpdata.diff import diff_tables
+
+from test_common import data_file
+
+
+class TestDiffCases:
+    def setup_method(self, _):
+        self.case = grg_mpdata.io.parse_mp_case_file(data_file('case3_000.m'))
+        self.other = copy.deepcopy(self.case)
+
+    def test_identical(self):
+        case_diff = diff_cases(self.case, self.other)
+        assert(case_diff.identical)
+        assert(case_diff.count == 0)
+        assert(str(case_diff) == 'the cases are identical')
+
+    def test_header(self):
+        self.other.baseMVA = 200.0
+        case_diff = diff_cases(self.case, self.other)
+        assert(case_diff.count == 1)
+        assert(case_diff.header[0].field == 'baseMVA')
+        assert(case_diff.header[0].delta == 100.0)
+
+    def test_modified_field(self):
+        self.other.bus[1].pd += 5.0
+        case_diff = diff_cases(self.case, self.other)
+        assert(list(case_diff.tables.keys()) == ['bus'])
+
+        bus_diff = case_diff.tables['bus']
+        assert(len(bus_diff.modified) == 1)
+        change = bus_diff.modified[0]
+        assert(change.key == (self.case.bus[1].bus_i,))
+        assert(change.position_1 == 1 and change.position_2 == 1)
+        assert([x.field for x in change.fields] == ['pd'])
+        assert(change.fields[0].delta == pytest.approx(5.0))
+
+    def test_tolerance(self):
+        self.other.bus[1].vm += 1e-9
+        assert(diff_cases(self.case, self.other).count == 1)
+        assert(diff_cases(self.case, self.other, atol=1e-6).identical)
+        assert(diff_cases(self.case, self.other, rtol=1e-6).identical)
+
+    def test_reordered(self):
+        self.other.bus.reverse()
+        self.other.branch.reverse()
+        assert(diff_cases(self.case, self.other).identical)
+
+    def test_removed_and_added(self):
+        removed = self.other.branch.pop(0)
+        parallel = copy.deepcopy(self.other.branch[0])
+        self.other.branch.append(parallel)
+        branch_diff = diff_cases(self.case, self.other).tables['branch']
+
+        assert(branch_diff.removed == [
+            ((removed.f_bus, removed.t_bus, 0), 0)])
+        assert(branch_diff.added == [
+            ((parallel.f_bus, parallel.t_bus, 1), len(self.other.branch)-1)])
+        assert(len(branch_diff.modified) == 0)
+
+    def test_cost_keys(self):
+        self.other.gencost.extend(copy.deepcopy(self.other.gencost))
+        gencost_diff = diff_tables('gencost', self.case, self.other)
+        gen = self.case.gen[0]
+        assert(gencost_diff.added[0] == ((gen.gen_bus, 0, 'qg'),
+                                         len(self.case.gen)))
+        assert(len(gencost_diff.removed) == 0)
+
+    def test_cost_coefficients(self):
+        self.other.gencost[0].cost[0] += 1.0
+        change = diff_cases(self.case, self.other).tables['gencost'].modified[0]
+        assert([x.field for x in change.fields] == ['cost'])
+        assert(change.fields[0].delta is None)
+
+    def test_missing_table(self):
+        self.case.busname = [grg_mpdata.struct.BusName(i, '\'b%d\'' % i)
+                             for i in range(0, len(self.case.bus))]
+        busname_diff = diff_cases(self.case, self.other).tables['busname']
+        assert(len(busname_diff.removed) == len(self.case.bus))
+        assert(busname_diff.removed[0] == ((self.case.bus[0].bus_i,), 0))
+
+    def test_unknown_table(self):
+        with pytest.raises(ValueError):
+            diff_tables('foo', self.case, self.other)
+
+
+class TestKeyedCLI:
+    def setup_method(self, _):
+        self.parser = grg_mpdata.cmd.build_cmd_parser()
+
+    def test_identical(self, capsys):
+        args = self.parser.parse_args(['diff', '--keyed',
+            data_file('case3_000.m'), data_file('case3_001.m')])
+        assert(grg_mpdata.cmd.main(args) == 0)
+        assert('identical' in capsys.readouterr().out)
+
+    def test_differ(self, capsys):
+        args = self.parser.parse_args(['diff', '--keyed', '--atol', '1e-6',
+            data_file('case3_000.m'), data_file('case4_000.m')])
+        assert(grg_mpdata.cmd.main(args) == 17)
+        assert('branch: 2 added, 1 removed' in capsys.readouterr().out)
@@ -0,0 +1,132 @@
+import copy, pytest
+
+import grg_mpdata
+
+from grg_mpdata.filters import area_in
+from grg_mpdata.filters import filter_case
+from grg_mpdata.filters import in_service
+from grg_mpdata.filters import kv_between
+from grg_mpdata.filters import remove_status_zero
+from grg_mpdata.filters import zone_in
+
+from test_common import data_file
+
+
+class TestRemoveStatusZero:
+    def setup_method(self, _):
+        self.case = grg_mpdata.io.parse_mp_case_file(
+            data_file('powermodels/case7_tplgy.m'))
+
+    def test_lines(self):
+        case = self.case.remove_status_zero()
+        assert(case.name == 'case7_tplgy_status-1')
+        assert(case.version == self.case.version)
+        assert(case.baseMVA == self.case.baseMVA)
+        assert(case.bus == self.case.bus)
+        assert(case.gen == self.case.gen)
+        assert([x.index for x in case.branch] == [4, 5, 6, 7])
+        assert([x.index for x in case.dcline] == [1, 2])
+        case.validate()
+
+    def test_copy_on_write(self):
+        case = remove_status_zero(self.case)
+        assert(case.bus[0] is self.case.bus[0])
+        assert(case.branch[0] is self.case.branch[4])
+        expected = copy.deepcopy(self.case)
+        lookup = self.case.bus_lookup()
+        fingerprint = self.case.fingerprint()
+        case.update_component('bus', 0, bus_i=1000)
+        case.update_component('branch', 0, br_status=0)
+        assert(case.bus[0].bus_i == 1000)
+        assert(case.branch[0].br_status == 0)
+        assert(self.case == expected)
+        assert(self.case.bus_lookup() is lookup)
+        assert(self.case.fingerprint() == fingerprint)
+        case.add_component('gen', copy.copy(case.gen[0]))
+        case.gen[0].pg = 1000.0
+        assert(self.case == expected)
+
+    def test_negative_status(self):
+        self.case.gen[0].gen_status = -1
+        self.case.branch[5].br_status = -1
+        case = remove_status_zero(self.case)
+        assert([x.index for x in case.gen] == [1, 2])
+        assert([x.index for x in case.branch] == [4, 6, 7])
+        assert(not in_service(self.case.gen[0]))
+
+    def test_generators(self):
+        case = grg_mpdata.io.parse_mp_case_file(
+            data_file('pglib-opf/pglib_opf_case200_pserc.m'))
+        filtered = case.remove_status_zero()
+        on = [x for x in case.gen if x.gen_status != 0]
+        assert(filtered.gen == on)
+        assert([x.gen_status for x in filtered.gen] == [1]*len(on))
+        assert(filtered.gencost == [case.gencost[x.index] for x in on])
+        filtered.validate()
+
+    def test_unchanged(self):
+        case = grg_mpdata.io.parse_mp_case_file(data_file('case3_000.m'))
+        filtered = case.remove_status_zero()
+        filtered.name = case.name
+        assert(filtered == case)
+        assert(filtered.to_matpower() == case.to_matpower())
+
+
+class TestFilterCase:
+    def test_reactive_costs(self):
+        case = grg_mpdata.io.parse_mp_case_file(data_file('case6_001.m'))
+        assert(len(case.gencost) == 2*len(case.gen))
+        case.gen[0].gen_status = 0
+
+        filtered = filter_case(case, gen=in_service)
+        count = len(case.gen)
+        assert(len(filtered.gencost) == 2*len(filtered.gen))
+        assert(filtered.gencost == case.gencost[1:count] +
+                                   case.gencost[count+1:])
+        filtered.validate()
+
+    def test_dcline_costs(self):
+        case = grg_mpdata.io.parse_mp_case_file(
+            data_file('powermodels/case5_dc.m'))
+        filtered = filter_case(case, dcline=lambda x: False)
+        assert(filtered.dcline == [])
+        assert(filtered.dclinecost == [])
+
+        filtered = filter_case(case)
+        assert(filtered == case)
+
+    def test_bus_cascade(self):
+        case = grg_mpdata.io.parse_mp_case_file(
+            data_file('powermodels/case7_tplgy.m'))
+        filtered = filter_case(case, bus=lambda x: x.bus_i != 5)
+        assert([x.bus_i for x in filtered.bus] == [1, 2, 3, 4, 6, 7])
+        assert([x.gen_bus for x in filtered.gen] == [1, 2])
+        assert(len(filtered.gencost) == 2)
+        assert(all([5 not in (x.f_bus, x.t_bus) for x in filtered.branch]))
+        assert([x.index for x in filtered.dcline] == [0, 2])
+
+    def test_bus_names(self):
+        case = grg_mpdata.io.parse_mp_case_file(data_file('case3_000.m'))
+        case.busname = [grg_mpdata.struct.BusName(i, '\'b%d\'' % i)
+                        for i in range(0, len(case.bus))]
+        filtered = filter_case(case, bus=lambda x: x.bus_i != case.bus[0].bus_i)
+        assert(filtered.busname == case.busname[1:])
+
+    def test_bus_predicates(self):
+        case = grg_mpdata.io.parse_mp_case_file(data_file('case3_000.m'))
+        case.bus[0].area = 2
+        case.bus[1].zone = 3
+        case.bus[2].base_kv = 500.0
+
+        assert(filter_case(case, bus=area_in(2)).bus == case.bus[:1])
+        assert(filter_case(case, bus=zone_in(3)).bus == case.bus[1:2])
+        assert(filter_case(case, bus=kv_between(min_kv=345.0)).bus ==
+               case.bus[2:])
+        assert(filter_case(case, bus=kv_between(max_kv=345.0)).bus ==
+               case.bus[:2])
+
+    def test_inconsistent_costs(self):
+        case = grg_mpdata.io.parse_mp_case_file(data_file('case3_000.m'))
+        case.gencost.append(copy.deepcopy(case.gencost[0]))
+        with pytest.raises(grg_mpdata.exception.MPDataValidationError):
+            filter_case(case, gen=in_service)
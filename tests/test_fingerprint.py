@@ -0,0 +1,104 @@
+import copy, pickle, pytest
+
+import numpy
+
+import grg_mpdata
+
+from test_common import correct_files
+from test_common import data_file
+
+
+@pytest.mark.parametrize('input_data', correct_files)
+def test_copy_fingerprint(input_data):
+    case = grg_mpdata.io.parse_mp_case_file(input_data)
+    assert(case.fingerprint() == copy.deepcopy(case).fingerprint())
+    assert(case.fingerprint() == pickle.loads(pickle.dumps(case)).fingerprint())
+
+
+class TestFingerprint:
+    def setup_method(self, _):
+        self.case = grg_mpdata.io.parse_mp_case_file(data_file('case3_000.m'))
+        self.other = copy.deepcopy(self.case)
+
+    def test_equal_content(self):
+        case = grg_mpdata.io.parse_mp_case_file(data_file('case3_001.m'))
+        assert(case == self.case)
+        assert(case.fingerprint() == self.case.fingerprint())
+        assert(len(case.fingerprint()) == 64)
+
+    def test_different_content(self):
+        case = grg_mpdata.io.parse_mp_case_file(data_file('case4_000.m'))
+        assert(case.fingerprint() != self.case.fingerprint())
+
+    def test_tracked_update(self):
+        fingerprint = self.other.fingerprint()
+        bus = self.other.table_fingerprint('bus')
+        branch = self.other.table_fingerprint('branch')
+
+        self.other.update_component('bus', 0, pd=1.0)
+        assert(self.other.fingerprint() != fingerprint)
+        assert(self.other.table_fingerprint('bus') != bus)
+        assert(self.other.table_fingerprint('branch') == branch)
+
+        self.other.update_component('bus', 0, pd=self.case.bus[0].pd)
+        assert(self.other.fingerprint() == fingerprint)
+
+    def test_header(self):
+        fingerprint = self.other.fingerprint()
+        self.other.name = 'other'
+        assert(self.other.fingerprint() != fingerprint)
+
+    def test_assigned_table(self):
+        fingerprint = self.other.fingerprint()
+        self.other.busname = None
+        assert(self.other.table_fingerprint('busname') == \
+            grg_mpdata.struct._table_fingerprint(None))
+        assert(self.other.fingerprint() == fingerprint)
+        self.other.dcline = []
+        assert(self.other.fingerprint() != fingerprint)
+
+    def test_cached(self):
+        # direct field assignments are not tracked, the cached fingerprint
+        # is stale until mark_modified
+        fingerprint = self.other.fingerprint()
+        self.other.bus[0].pd = 1.0
+        assert(self.other.fingerprint() == fingerprint)
+        assert(self.other.fingerprint(cached=False) != fingerprint)
+        assert(self.other != self.case)
+        assert(not grg_mpdata.cmd.eq(self.other, self.case, render=False))
+        self.other.mark_modified('bus', 0)
+        assert(self.other.fingerprint() != fingerprint)
+        assert(self.other.fingerprint() ==
+               self.other.fingerprint(cached=False))
+
+    def test_numpy_values(self):
+        self.other.bus[0].bus_type = numpy.int64(self.other.bus[0].bus_type)
+        self.other.bus[1].vm = numpy.float64(self.other.bus[1].vm)
+        assert(self.other.fingerprint() == self.case.fingerprint())
+
+    def test_unknown_table(self):
+        with pytest.raises(ValueError):
+            self.case.table_fingerprint('foo')
+
+    def test_equal_values(self):
+        self.case.bus[0].va = 0.0
+        self.other.bus[0].va = -0.0
+        self.case.bus[1].vm = 1.0
+        self.other.bus[1].vm = 1
+        assert(self.other == self.case)
+        assert(self.other.fingerprint() == self.case.fingerprint())
+        assert(grg_mpdata.cmd.eq(self.other, self.case, render=False))
+
+
+class TestDuplicates:
+    def test_duplicates(self, capsys):
+        groups = grg_mpdata.cmd.duplicates([data_file('case3_000.m'),
+            data_file('case4_000.m'), data_file('case3_001.m')], workers=1)
+        assert(groups == [[data_file('case3_000.m'), data_file('case3_001.m')]])
+        assert('case3_001.m' in capsys.readouterr().out)
+
+    def test_cli(self):
+        parser = grg_mpdata.cmd.build_cmd_parser()
+        args = parser.parse_args(['dups', '--workers', '1',
+            data_file('case2_000.m'), data_file('case4_000.m')])
+        assert(grg_mpdata.cmd.main(args) == [])
@@ -0,0 +1,160 @@
+import os, copy, pickle, pytest
+
+import grg_mpdata
+
+from test_common import correct_files
+from test_common import recorded_warnings
+
+
+@pytest.mark.parametrize('input_data', correct_files)
+def test_001(input_data):
+    case = grg_mpdata.io.parse_mp_case_file(input_data)
+    assert case.dirty == {}
+    assert recorded_warnings(lambda: case.validate(incremental=True))[1] == []
+    variant = copy.deepcopy(case)
+    variant.mark_modified('bus')
+    variant.mark_modified('branch', 0, -1)
+    assert variant.dirty == {'bus': None, 'branch': set([0, len(case.branch)-1])}
+    assert recorded_warnings(lambda: variant.validate(incremental=True))[1] == []
+    assert variant.dirty == {}
+    assert variant == case
+
+
+class TestChangeTracking:
+    def setup_method(self, _):
+        self.case = grg_mpdata.io.parse_mp_case_file(os.path.dirname(os.path.realpath(__file__))+'/data/correct/pglib-opf/pglib_opf_case14_ieee.m')
+
+    def test_001(self):
+        case = self.case
+        case.update_component('branch', 3, br_status=2)
+        case.update_component('bus', 1, zone=-1)
+        assert case.revision == 2
+        assert case.dirty == {'branch': set([3]), 'bus': set([1])}
+        assert case.branch[3].br_status == 2
+        _, recorded = recorded_warnings(lambda: case.validate(incremental=True))
+        assert len(recorded) == 2
+        assert recorded[0][0].startswith('bus %d has a negative zone' % case.bus[1].bus_i)
+        assert recorded[1][0].startswith('branch 3 from bus')
+        assert case.dirty == {}
+        assert recorded_warnings(lambda: case.validate(incremental=True))[1] == []
+
+    def test_002(self):
+        case = self.case
+        case.branch[2].br_status = 5
+        assert recorded_warnings(lambda: case.validate(incremental=True))[1] == []
+        assert len(recorded_warnings(case.validate)[1]) == 1
+        case.mark_modified('branch', 2)
+        assert len(recorded_warnings(lambda: case.validate(incremental=True))[1]) == 1
+
+    def test_003(self):
+        case = self.case
+        case.remove_component('gen', 0)
+        with pytest.raises(grg_mpdata.exception.MPDataValidationError):
+            case.validate(incremental=True)
+        assert 'gen' in case.dirty
+        case.remove_component('gencost', 0)
+        case.validate(incremental=True)
+        assert case.dirty == {}
+
+    def test_004(self):
+        case = self.case
+        case.update_component('branch', 4, br_status=7)
+        case.update_component('branch', 6, br_status=7)
+        case.remove_component('branch', 5)
+        assert case.dirty == {'branch': set([4, 5])}
+        _, recorded = recorded_warnings(lambda: case.validate(incremental=True))
+        assert len(recorded) == 2
+
+    def test_005(self):
+        case = self.case
+        bus = copy.deepcopy(case.bus[0])
+        bus.bus_type = 9
+        position = case.add_component('bus', bus)
+        assert position == len(case.bus)-1
+        _, recorded = recorded_warnings(lambda: case.validate(incremental=True))
+        assert len(recorded) == 1
+        assert 'undefined type value of 9' in recorded[0][0]
+
+    def test_006(self):
+        case = self.case
+        case.version = '\'1\''
+        case.branch = [copy.deepcopy(x) for x in case.branch]
+        case.branch[0].br_status = 3
+        assert case.dirty == {'case': None, 'branch': None}
+        _, recorded = recorded_warnings(lambda: case.validate(incremental=True))
+        assert len(recorded) == 2
+
+    def test_007(self):
+        case = grg_mpdata.struct.Case(self.case.name, self.case.version,
+            self.case.baseMVA, self.case.bus, self.case.gen, self.case.branch,
+            self.case.gencost)
+        assert case.dirty is None
+        case.mark_modified('bus', 0)
+        assert case.dirty is None
+        case.validate(incremental=True)
+        assert case.dirty == {}
+
+    def test_008(self):
+        case = self.case
+        with pytest.raises(ValueError):
+            case.mark_modified('buses', 0)
+        with pytest.raises(ValueError):
+            case.add_component('dcline', None)
+
+    def test_009(self):
+        case = self.case
+        case.update_component('gencost', 0, startup=1.0)
+        case.validate(incremental=True)
+        variant = pickle.loads(pickle.dumps(case))
+        assert variant == case
+        assert variant.dirty == {}
+        assert variant.revision == case.revision
+
+    def test_010(self):
+        case = self.case
+        case.validate(incremental=True)
+        count = len(case.branch)
+        with pytest.raises(IndexError):
+            case.mark_modified('branch', count)
+        with pytest.raises(IndexError):
+            case.mark_modified('branch', -count-1)
+        with pytest.raises(IndexError):
+            case.remove_component('branch', count)
+        assert case.dirty == {}
+        assert len(case.branch) == count
+        case.mark_modified('branch', -1)
+        assert case.dirty == {'branch': set([count-1])}
+
+    def test_011(self):
+        case = grg_mpdata.io.parse_mp_case_file(os.path.dirname(os.path.realpath(__file__))+'/data/correct/case6_001.m')
+        count = len(case.gen)
+        assert len(case.gencost) == 2*count
+        # an untracked inconsistency, that only a full validation finds
+        case.gencost[0].startup += 1.0
+        case.update_component('gen', 0, gen_status=0)
+        case.update_component('gencost', 1, ncost=case.gencost[1].ncost)
+        case.validate(incremental=True)
+        with pytest.raises(grg_mpdata.exception.MPDataValidationError):
+            case.validate()
+
+        case.gencost[0].startup -= 1.0
+        case.validate()
+        case.update_component('gencost', count+1, shutdown=1.0)
+        with pytest.raises(grg_mpdata.exception.MPDataValidationError):
+            case.validate(incremental=True)
+        case.update_component('gencost', 1, shutdown=1.0)
+        case.validate(incremental=True)
+
+    def test_012(self):
+        case = grg_mpdata.io.parse_mp_case_file(os.path.dirname(os.path.realpath(__file__))+'/data/correct/case6_001.m')
+        count = len(case.gen)
+        for position in range(0, 2*count):
+            case.update_component('gencost', position, startup=0.0)
+        case.update_component('gencost', 0, startup=5.0)
+        case.update_component('gencost', count, startup=5.0)
+        case.validate()
+        # removing a reactive cost function shifts the pairs that follow it
+        case.remove_component('gencost', count)
+        case.add_component('gencost', copy.deepcopy(case.gencost[count]))
+        with pytest.raises(grg_mpdata.exception.MPDataValidationError):
+            case.validate(incremental=True)
@@ -0,0 +1,114 @@
+import os, copy, pickle, pytest
+
+import numpy
+
+import grg_mpdata
+
+from test_common import correct_files
+
+
+@pytest.mark.parametrize('input_data', correct_files)
+def test_001(input_data):
+    case = grg_mpdata.io.parse_mp_case_file(input_data)
+
+    for bus in case.bus:
+        assert case.bus_lookup()[bus.bus_i] is bus
+        assert case.bus[case.bus_positions()[bus.bus_i]] is bus
+
+    for bus_id, positions in case.gens_by_bus().items():
+        assert positions == [i for i, x in enumerate(case.gen) if x.gen_bus == bus_id]
+    assert sum([len(x) for x in case.gens_by_bus().values()]) == len(case.gen)
+
+    if case.dcline is not None:
+        for bus_id, positions in case.dclines_by_bus().items():
+            assert positions == [i for i, x in enumerate(case.dcline)
+                                 if bus_id in (x.f_bus, x.t_bus)]
+
+    if case.busname is not None:
+        assert case.busname_by_bus() == dict([(x.bus_i, y.name) for x, y in zip(case.bus, case.busname)])
+    else:
+        assert case.busname_by_bus() == {}
+
+    adjacency = case.branch_adjacency()
+    assert adjacency.indptr[-1] == 2*len(case.branch)
+    for i, bus in enumerate(case.bus):
+        begin, end = adjacency.indptr[i], adjacency.indptr[i+1]
+        incident = [(j, x) for j, x in enumerate(case.branch) if bus.bus_i in (x.f_bus, x.t_bus)]
+        assert sorted(set(adjacency.branches[begin:end].tolist())) == [j for j, x in incident]
+        for branch, other in zip(adjacency.branches[begin:end], adjacency.buses[begin:end]):
+            ends = (case.branch[branch].f_bus, case.branch[branch].t_bus)
+            assert case.bus[other].bus_i in ends
+
+
+class TestIndexCache:
+    def setup_method(self, _):
+        self.case = grg_mpdata.io.parse_mp_case_file(os.path.dirname(os.path.realpath(__file__))+'/data/correct/pglib-opf/pglib_opf_case14_ieee.m')
+
+    def test_001(self):
+        case = self.case
+        assert case.bus_lookup() is case.bus_lookup()
+        assert case.branch_adjacency() is case.branch_adjacency()
+        lookup = case.bus_lookup()
+        adjacency = case.branch_adjacency()
+        case.update_component('gen', 0, pg=1.0)
+        assert case.bus_lookup() is lookup
+        assert case.branch_adjacency() is adjacency
+        gens = case.gens_by_bus()
+        case.update_component('gen', 0, gen_bus=case.bus[-1].bus_i)
+        assert case.gens_by_bus() is not gens
+        assert 0 in case.gens_by_bus()[case.bus[-1].bus_i]
+
+    def test_002(self):
+        case = self.case
+        adjacency = case.branch_adjacency()
+        case.remove_component('branch', 0)
+        updated = case.branch_adjacency()
+        assert updated is not adjacency
+        assert updated.indptr[-1] == 2*len(case.branch)
+
+    def test_003(self):
+        case = self.case
+        bus = copy.deepcopy(case.bus[0])
+        bus.bus_i = 1000
+        case.add_component('bus', bus)
+        assert case.bus_lookup()[1000] is bus
+        assert len(case.branch_adjacency().indptr) == len(case.bus)+1
+        case.bus = case.bus[:-1]
+        assert 1000 not in case.bus_lookup()
+
+    def test_004(self):
+        case = self.case
+        case.update_component('branch', 2, t_bus=1000)
+        with pytest.raises(grg_mpdata.exception.MPDataValidationError):
+            case.branch_adjacency()
+
+    def test_005(self):
+        case = self.case
+        case.bus_lookup()
+        variant = copy.deepcopy(case)
+        assert variant._indexes == {}
+        assert variant.bus_lookup()[case.bus[0].bus_i] is variant.bus[0]
+        assert pickle.loads(pickle.dumps(case))._indexes == {}
+
+    def test_006(self):
+        case = self.case
+        assert case.dclines_by_bus() == {}
+        dcline = grg_mpdata.struct.DCLine(0, case.bus[1].bus_i, case.bus[1].bus_i, 1, 0, 0, 0, 0, 1, 1, 0, 10, 0, 0, 0, 0, 0, 0)
+        case.dcline = [dcline]
+        assert case.dclines_by_bus() == {case.bus[1].bus_i: [0]}
+
+    def test_007(self):
+        case = self.case
+        case.bus_lookup()
+        case.branch_adjacency()
+        gens = case.gens_by_bus()
+        bus = copy.deepcopy(case.bus[0])
+        bus.bus_i = 1000
+        case.bus.append(bus)
+        assert case.bus_lookup()[1000] is bus
+        assert len(case.branch_adjacency().indptr) == len(case.bus)+1
+        del case.gen[0]
+        assert case.gens_by_bus() is not gens
+        case.branch.pop()
+        assert case.branch_adjacency().indptr[-1] == 2*len(case.branch)
+        assert case.bus_lookup() is case.bus_lookup()
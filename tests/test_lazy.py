@@ -0,0 +1,103 @@
+import os, copy, pickle, pytest, warnings
+
+import grg_mpdata
+
+from test_common import correct_files
+from test_common import warning_files
+from test_common import incorrect_files
+from test_common import recorded_warnings
+
+
+_table_names = ['bus', 'gen', 'branch', 'gencost', 'dcline', 'dclinecost',
+                'busname']
+
+
+@pytest.mark.parametrize('input_data', correct_files)
+def test_001(input_data):
+    case = grg_mpdata.io.parse_mp_case_file(input_data)
+    lazy_case = grg_mpdata.io.parse_mp_case_file(input_data, lazy=True)
+    assert lazy_case == case
+    assert lazy_case.to_matpower() == case.to_matpower()
+
+
+@pytest.mark.parametrize('input_data', warning_files)
+def test_002(input_data):
+    def parse_lazy():
+        grg_mpdata.io.parse_mp_case_file(input_data, lazy=True).validate()
+    _, recorded = recorded_warnings(parse_lazy)
+    _, expected = recorded_warnings(
+        lambda: grg_mpdata.io.parse_mp_case_file(input_data))
+    assert sorted(recorded) == sorted(expected)
+
+
+@pytest.mark.parametrize('input_data', incorrect_files)
+def test_003(input_data):
+    with pytest.raises(Exception) as expected:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            grg_mpdata.io.parse_mp_case_file(input_data)
+
+    with pytest.raises(expected.type) as lazy:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            case = grg_mpdata.io.parse_mp_case_file(input_data, lazy=True)
+            case.validate()
+            for name in _table_names:
+                if getattr(case, name) is not None:
+                    getattr(case, name).materialize()
+    assert str(lazy.value) == str(expected.value)
+
+
+@pytest.mark.parametrize('input_data', correct_files)
+def test_004(input_data, tmp_path):
+    path = str(tmp_path / os.path.basename(input_data))
+    with open(input_data, 'r') as source, open(path, 'w') as target:
+        target.write(source.read())
+    case = grg_mpdata.io.parse_mp_case_file(path)
+    for i in range(0, 2):
+        lazy_case = grg_mpdata.io.parse_mp_case_file(path, cache=True, lazy=True)
+        assert isinstance(lazy_case.bus, grg_mpdata.struct.LazyComponentList)
+        assert lazy_case == case
+
+
+class TestLazyComponentList:
+    def setup_method(self, _):
+        self.case = grg_mpdata.io.parse_mp_case_file(os.path.dirname(os.path.realpath(__file__))+'/data/correct/case6_001.m')
+        self.lazy_case = grg_mpdata.io.parse_mp_case_file(os.path.dirname(os.path.realpath(__file__))+'/data/correct/case6_001.m', lazy=True)
+
+    def test_001(self):
+        bus = self.lazy_case.bus
+        assert len(bus) == len(self.case.bus)
+        assert bus[-1] == self.case.bus[-1]
+        assert bus[1:3] == self.case.bus[1:3]
+        assert bus[-1] is bus[len(bus)-1]
+        assert not bus.materialized
+        with pytest.raises(IndexError):
+            bus[len(bus)]
+
+    def test_002(self):
+        branch = self.lazy_case.branch
+        first = branch[0]
+        branch.append(copy.deepcopy(first))
+        assert branch.materialized
+        assert branch[0] is first
+        assert len(branch) == len(self.case.branch) + 1
+        del branch[-1]
+        assert branch == self.case.branch
+
+    def test_003(self):
+        assert self.case.bus == self.lazy_case.bus
+        assert self.lazy_case.bus != self.case.gen
+        assert self.lazy_case.baseMVA == self.case.baseMVA
+
+    def test_004(self):
+        lazy_copy = copy.deepcopy(self.lazy_case)
+        assert isinstance(lazy_copy.gen, list)
+        assert lazy_copy == self.case
+        assert pickle.loads(pickle.dumps(self.lazy_case)) == self.case
+
+    def test_005(self):
+        with warnings.catch_warnings(record=True) as recorded:
+            warnings.simplefilter('always')
+            grg_mpdata.io.parse_mp_case_str('function mpc = case\nmpc.version = \'2\';\nmpc.baseMVA = 100;\nmpc.bus = [\n-1 3 0 0 0 0 1 1 0 230 1 1.1 0.9;\n];\n', lazy=True)
+        assert len(recorded) == 0
@@ -0,0 +1,85 @@
+import os, pathlib, pytest, warnings
+
+import grg_mpdata
+
+from test_common import correct_files
+from test_common import warning_files
+from test_common import incorrect_files
+from test_common import recorded_warnings
+
+
+data_dir = os.path.dirname(os.path.realpath(__file__))+'/data'
+
+
+class TestParseMany:
+    def test_001(self):
+        results = grg_mpdata.io.parse_many(correct_files, workers=2)
+        assert [x.path for x in results] == correct_files
+        for result in results:
+            assert result.ok
+            assert result.case == grg_mpdata.io.parse_mp_case_file(result.path)
+            assert result.warnings == []
+
+    def test_002(self):
+        results = grg_mpdata.io.parse_many(warning_files, workers=2)
+        for input_data, result in zip(warning_files, results):
+            assert result.ok
+            _, expected = recorded_warnings(
+                lambda: grg_mpdata.io.parse_mp_case_file(input_data))
+            assert result.warnings == expected
+
+    def test_003(self):
+        results = grg_mpdata.io.parse_many(incorrect_files, workers=2)
+        for input_data, result in zip(incorrect_files, results):
+            assert not result.ok
+            assert result.case is None
+            with pytest.raises(result.error.__class__) as expected:
+                with warnings.catch_warnings():
+                    warnings.simplefilter('ignore')
+                    grg_mpdata.io.parse_mp_case_file(input_data)
+            assert str(result.error) == str(expected.value)
+
+    def test_004(self):
+        paths = correct_files + incorrect_files
+        results = grg_mpdata.io.parse_many(paths, workers=2, ordered=False)
+        assert not isinstance(results, list)
+        results = list(results)
+        assert sorted([x.path for x in results]) == sorted(paths)
+        assert sum([x.ok for x in results]) == len(correct_files)
+
+    def test_005(self):
+        results = grg_mpdata.io.parse_many(data_dir+'/exception')
+        assert len(results) > 0
+        assert [x.path for x in results] == sorted([x.path for x in results])
+        assert all([x.path.endswith('.m') for x in results])
+
+    def test_006(self):
+        pattern = data_dir+'/correct/pglib-opf/*.m'
+        results = grg_mpdata.io.parse_many(pattern, workers=1, backend='numpy')
+        assert len(results) > 0
+        for result in results:
+            assert isinstance(result.case, grg_mpdata.columnar.ColumnarCase)
+            assert result.case.to_case() == grg_mpdata.io.parse_mp_case_file(result.path)
+
+    def test_007(self):
+        results = grg_mpdata.io.parse_many(correct_files[:3], workers=1, ordered=False)
+        assert [x.path for x in results] == correct_files[:3]
+
+    def test_008(self):
+        assert grg_mpdata.io.parse_many([], workers=4) == []
+        with pytest.raises(ValueError):
+            grg_mpdata.io.parse_many(correct_files, backend='foo')
+
+    def test_009(self):
+        directory = pathlib.Path(data_dir, 'exception')
+        results = grg_mpdata.io.parse_many(directory, workers=1)
+        assert [x.path for x in results] == \
+            [x.path for x in grg_mpdata.io.parse_many(str(directory), workers=1)]
+        assert len(results) > 0
+
+        results = grg_mpdata.io.parse_many(pathlib.Path(correct_files[0]), workers=1)
+        assert [x.path for x in results] == [correct_files[0]]
+        assert results[0].ok
+
+        results = grg_mpdata.io.parse_many([pathlib.Path(correct_files[0])], workers=1)
+        assert [x.path for x in results] == [correct_files[0]]
@@ -0,0 +1,79 @@
+import os, io, pytest, warnings
+
+import grg_mpdata
+
+from test_common import correct_files
+from test_common import warning_files
+
+
+_table_names = ['bus', 'gen', 'branch', 'gencost', 'dcline', 'dclinecost',
+                'busname']
+
+
+def _parse(input_data):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        return grg_mpdata.io.parse_mp_case_file(input_data)
+
+
+@pytest.mark.parametrize('input_data', correct_files + warning_files)
+def test_001(input_data):
+    case = _parse(input_data)
+    summary = grg_mpdata.io.scan_mp_case_file(input_data)
+    assert summary.name == case.name
+    assert summary.version == case.version
+    assert summary.baseMVA == case.baseMVA
+    assert summary.tables == {}
+    assert summary.rows == dict([(name, len(getattr(case, name)))
+        for name in _table_names if getattr(case, name) is not None])
+
+
+@pytest.mark.parametrize('input_data', correct_files)
+def test_002(input_data):
+    case = _parse(input_data)
+    summary = grg_mpdata.io.scan_mp_case_file(input_data, _table_names)
+    for name in _table_names:
+        if getattr(case, name) is not None:
+            assert summary.tables[name] == getattr(case, name)
+        else:
+            assert name not in summary.tables
+
+
+class TestScan:
+    def setup_method(self, _):
+        self.source = os.path.dirname(os.path.realpath(__file__))+'/data/correct/case6_001.m'
+
+    def test_001(self):
+        summary = grg_mpdata.io.scan_mp_case_file(self.source, 'bus')
+        assert list(summary.tables.keys()) == ['bus']
+        assert summary.rows['bus'] == len(summary.tables['bus'])
+
+    def test_002(self):
+        with pytest.raises(ValueError):
+            grg_mpdata.io.scan_mp_case_file(self.source, ('buses',))
+
+    def test_003(self):
+        with open(self.source, 'rb') as mp_file:
+            summary = grg_mpdata.io.scan_mp_case_file(mp_file)
+            assert not mp_file.closed
+        assert summary.name == _parse(self.source).name
+
+    def test_004(self):
+        lines = ['function mpc = case', 'mpc.version = \'2\';',
+                 'mpc.baseMVA = 100;', 'mpc.bus = [', '1 2 3', ' 4 5 6;',
+                 '7 8 9; 10 11 12', '];', 'mpc.gen = [];', 'mpc.areas = [',
+                 '1 x', '];']
+        summary = grg_mpdata.io.scan_mp_case_lines(lines)
+        assert summary.rows == {'bus': 4, 'gen': 0}
+
+    def test_005(self):
+        with warnings.catch_warnings(record=True) as recorded:
+            warnings.simplefilter('always')
+            grg_mpdata.io.scan_mp_case_str('function mpc = case\nmpc.version = \'2\';\nmpc.baseMVA = 100;\nmpc.bus = [\n-1 3 0 0 0 0 1 1 0 230 1 1.1 0.9;\n];\n', ('bus',))
+        assert len(recorded) == 1
+        assert 'negative identification number' in str(recorded[0].message)
+
+    def test_006(self):
+        lines = iter(['1 2 3;', ';', '  ;  4 5', '6', '7 8 9];', 'x y z;'])
+        assert grg_mpdata.io._count_matlab_rows('[', lines, '[', ']') == 3
+        assert next(lines) == 'x y z;'
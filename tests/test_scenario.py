@@ -0,0 +1,112 @@
+import os, pytest
+
+import numpy
+
+import grg_mpdata
+
+from grg_mpdata.scenario import ScenarioSet
+
+from test_common import correct_files
+from test_common import data_file
+
+
+@pytest.mark.parametrize('input_data', correct_files)
+def test_matpower(input_data):
+    case = grg_mpdata.io.parse_mp_case_file(input_data)
+    profiles = numpy.random.RandomState(0).uniform(0.5, 1.5,
+                                                   (3, len(case.bus)))
+    scenarios = ScenarioSet(case, {('bus', 'pd'): profiles,
+                                   ('bus', 'qd'): [0.9, 1.0, 1.1],
+                                   ('gen', 'pg'): [1.0, 2.0, 3.0]})
+    for scenario in scenarios:
+        assert(scenarios.to_matpower(scenario) == scenario.to_matpower())
+
+
+class TestScenarioSet:
+    def setup_method(self, _):
+        self.case = grg_mpdata.io.parse_mp_case_file(
+            data_file('pglib-opf/pglib_opf_case30_ieee.m'))
+        self.profile = numpy.random.RandomState(0).uniform(0.8, 1.2,
+            (12, len(self.case.bus)))
+        self.scenarios = ScenarioSet(self.case, {('bus', 'pd'): self.profile,
+            ('gen', 'pmax'): numpy.linspace(1.0, 2.0, 12)})
+
+    def test_scaled(self):
+        assert(len(self.scenarios) == 12)
+        scenario = self.scenarios[4]
+        pd = numpy.array([x.pd for x in self.case.bus])
+        pmax = numpy.array([x.pmax for x in self.case.gen])
+        assert(numpy.allclose(scenario.bus['pd'], pd*self.profile[4]))
+        assert(numpy.allclose(scenario.gen['pmax'],
+                              pmax*numpy.linspace(1.0, 2.0, 12)[4]))
+        assert(numpy.array_equal(scenario.bus['qd'],
+                                 [x.qd for x in self.case.bus]))
+
+    def test_shared(self):
+        scenario = self.scenarios[0]
+        assert(scenario.branch is self.scenarios.case.branch)
+        assert(scenario.bus is not self.scenarios.case.bus)
+        assert(not numpy.array_equal(self.scenarios[1].bus['pd'],
+                                     scenario.bus['pd']))
+
+    def test_names(self):
+        assert([x.name for x in self.scenarios][:2] ==
+               ['pglib_opf_case30_ieee_00', 'pglib_opf_case30_ieee_01'])
+        assert(self.scenarios[-1].name == 'pglib_opf_case30_ieee_11')
+
+    def test_iteration(self, monkeypatch):
+        monkeypatch.setattr(grg_mpdata.scenario, '_BLOCK_SCENARIOS', 5)
+        for index, scenario in enumerate(self.scenarios):
+            assert(scenario == self.scenarios[index])
+
+    def test_index_error(self):
+        with pytest.raises(IndexError):
+            self.scenarios[12]
+
+    def test_case(self):
+        case = self.scenarios[3].to_case()
+        case.validate()
+        assert(case.bus[0].pd == pytest.approx(self.case.bus[0].pd *
+                                               self.profile[3, 0]))
+
+    @pytest.mark.parametrize('workers', [1, 2])
+    def test_write(self, tmpdir, workers):
+        paths = self.scenarios.write(str(tmpdir), workers=workers)
+        assert(len(paths) == 12)
+        assert(os.path.basename(paths[11]) == 'pglib_opf_case30_ieee_11.m')
+        case = grg_mpdata.io.parse_mp_case_file(paths[7], backend='numpy')
+        assert(case == self.scenarios[7])
+
+    def test_write_compressed(self, tmpdir):
+        paths = self.scenarios.write(str(tmpdir.join('scenarios')),
+                                     compress=True)
+        assert(paths[0].endswith('.m.gz'))
+        case = grg_mpdata.io.parse_mp_case_file(paths[0])
+        assert(case.name == 'pglib_opf_case30_ieee_00')
+
+    def test_stream(self):
+        scenarios = []
+        names = self.scenarios.stream(lambda x: scenarios.append(x) or x.name)
+        assert(names == [self.scenarios.name(x) for x in range(0, 12)])
+        assert(scenarios[5] == self.scenarios[5])
+
+    def test_stream_text(self, tmpdir):
+        texts = self.scenarios.stream(lambda name, text: (name, text),
+                                      text=True)
+        paths = self.scenarios.write(str(tmpdir))
+        assert([x[0] for x in texts] == self.scenarios.stream(lambda x: x.name))
+        for (name, text), path in zip(texts, paths):
+            with open(path, 'r') as mp_file:
+                assert(mp_file.read() == text)
+        assert(texts[2][1] == self.scenarios[2].to_matpower())
+
+    def test_bad_profiles(self):
+        with pytest.raises(ValueError):
+            ScenarioSet(self.case, {('bus', 'bus_type'): [1.0]})
+        with pytest.raises(ValueError):
+            ScenarioSet(self.case, {('dcline', 'pf'): [1.0]})
+        with pytest.raises(ValueError):
+            ScenarioSet(self.case, {('bus', 'pd'): numpy.ones((2, 3))})
+        with pytest.raises(ValueError):
+            ScenarioSet(self.case, {('bus', 'pd'): [1.0, 2.0],
+                                    ('bus', 'qd'): [1.0]})
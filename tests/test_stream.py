@@ -0,0 +1,56 @@
+import os, io, pathlib, pytest
+
+import grg_mpdata
+
+from test_common import correct_files
+
+
+@pytest.mark.parametrize('input_data', correct_files)
+def test_001(input_data):
+    case = grg_mpdata.io.parse_mp_case_file(input_data)
+    with open(input_data, 'rb') as mp_file:
+        case_2 = grg_mpdata.io.parse_mp_case_file(mp_file)
+        assert not mp_file.closed
+    assert case == case_2
+
+
+def test_002():
+    path = os.path.dirname(os.path.realpath(__file__))+'/data/correct/case3_000.m'
+    case = grg_mpdata.io.parse_mp_case_file(path)
+    with open(path, 'rb') as mp_file:
+        case_2 = grg_mpdata.io.parse_mp_case_str(mp_file.read())
+    assert case == case_2
+
+
+def test_003():
+    mp_data = 'mpc.bus = [\n1 2 3\n 4 5 6;\n];\nmpc.gen = [1 2; 3 4];\n'
+    tokens = list(grg_mpdata.io._tokenize_mp_case(io.StringIO(mp_data)))
+    assert tokens == [
+        ('matrix', 'mpc.bus', None),
+        ('row', 'mpc.bus', ['1', '2', '3']),
+        ('row', 'mpc.bus', ['4', '5', '6']),
+        ('matrix', 'mpc.gen', None),
+        ('row', 'mpc.gen', ['1', '2']),
+        ('row', 'mpc.gen', ['3', '4']),
+    ]
+
+
+def test_004():
+    mp_data = 'mpc.bus = [\n 1 2 3;\n 4 5;\n];\n'
+    with pytest.raises(grg_mpdata.exception.MPDataParsingError):
+        list(grg_mpdata.io._tokenize_mp_case(io.StringIO(mp_data)))
+
+
+def test_005(tmpdir):
+    path = os.path.dirname(os.path.realpath(__file__))+'/data/correct/case3_000.m'
+    case = grg_mpdata.io.parse_mp_case_file(pathlib.Path(path))
+    assert case == grg_mpdata.io.parse_mp_case_file(path)
+    assert grg_mpdata.io.scan_mp_case_file(pathlib.Path(path)).name == case.name
+
+    gz_path = pathlib.Path(str(tmpdir)) / 'case3.m.gz'
+    grg_mpdata.io.write_mp_case_file(gz_path, case)
+    assert grg_mpdata.io.parse_mp_case_file(gz_path) == case
+
+    cached = grg_mpdata.io.parse_mp_case_file(pathlib.Path(path), cache=True,
+                                              cache_dir=str(tmpdir))
+    assert cached == case
@@ -0,0 +1,103 @@
+import pytest
+
+import numpy
+
+import grg_mpdata
+
+from grg_mpdata.topology import _component_roots
+from grg_mpdata.topology import _union_find_roots
+from grg_mpdata.topology import find_islands
+from grg_mpdata.topology import reduce_to_referenced
+
+from test_common import correct_files
+from test_common import data_file
+
+
+@pytest.mark.parametrize('input_data', correct_files)
+def test_columnar_islands(input_data):
+    case = grg_mpdata.io.parse_mp_case_file(input_data)
+    islands = find_islands(case)
+    columnar_islands = find_islands(case.as_arrays())
+    assert(numpy.array_equal(islands.labels, columnar_islands.labels))
+    assert(numpy.array_equal(islands.reference, columnar_islands.reference))
+
+
+class TestIslands:
+    def setup_method(self, _):
+        self.case = grg_mpdata.io.parse_mp_case_file(
+            data_file('powermodels/case7_tplgy.m'))
+
+    def test_labels(self):
+        islands = find_islands(self.case)
+        assert(islands.count == 3)
+        assert(islands.labels.tolist() == [0, 1, 2, 2, 2, -1, 2])
+        assert(islands.sizes.tolist() == [1, 1, 4])
+        assert(islands.reference_counts.tolist() == [1, 0, 0])
+        assert(islands.referenced.tolist() == [True, False, False])
+        assert(islands.buses(2).tolist() == [3, 4, 5, 7])
+        assert('2: 4 buses, 0 reference buses' in str(islands))
+
+    def test_dcline(self):
+        self.case.dcline[0].br_status = 1
+        islands = find_islands(self.case)
+        assert(islands.labels.tolist() == [0, 0, 1, 1, 1, -1, 1])
+
+    def test_branch(self):
+        self.case.branch[0].br_status = 1
+        islands = find_islands(self.case)
+        assert(islands.count == 2)
+        assert(islands.referenced.tolist() == [True, False])
+
+    def test_negative_status(self):
+        self.case.branch[0].br_status = -1
+        self.case.dcline[0].br_status = -1
+        islands = find_islands(self.case)
+        assert(islands.labels.tolist() == [0, 1, 2, 2, 2, -1, 2])
+
+    def test_reduce(self):
+        reduced = reduce_to_referenced(self.case)
+        assert([x.bus_i for x in reduced.bus] == [1])
+        assert([x.gen_bus for x in reduced.gen] == [1])
+        assert(len(reduced.gencost) == 1)
+        assert(reduced.branch == [])
+        assert(reduced.dcline == [])
+        assert(reduced.bus[0] is self.case.bus[0])
+        reduced.update_component('bus', 0, vm=1.1)
+        assert(reduced.bus[0].vm == 1.1)
+        assert(self.case.bus[0].vm != 1.1)
+
+    def test_reduce_connected(self):
+        case = grg_mpdata.io.parse_mp_case_file(data_file('case3_000.m'))
+        assert(reduce_to_referenced(case) == case)
+
+    def test_missing_bus(self):
+        self.case.branch[0].t_bus = 100
+        with pytest.raises(grg_mpdata.exception.MPDataValidationError):
+            find_islands(self.case)
+
+
+@pytest.mark.parametrize('roots', [_component_roots, _union_find_roots])
+class TestComponentRoots:
+    def test_path(self, roots):
+        # a path visited in an order that needs several hooking rounds
+        nodes = numpy.random.RandomState(0).permutation(1000)
+        assert(numpy.all(roots(1000, nodes[:-1], nodes[1:]) == 0))
+
+    def test_components(self, roots):
+        f = numpy.array([5, 1, 3, 7], dtype=numpy.int64)
+        t = numpy.array([1, 3, 8, 6], dtype=numpy.int64)
+        assert(roots(9, f, t).tolist() == [0, 1, 2, 1, 4, 1, 6, 6, 1])
+
+    def test_no_edges(self, roots):
+        empty = numpy.empty(0, dtype=numpy.int64)
+        assert(roots(3, empty, empty).tolist() == [0, 1, 2])
+        assert(roots(0, empty, empty).tolist() == [])
+
+
+def test_roots_agree():
+    pytest.importorskip('scipy')
+    random = numpy.random.RandomState(0)
+    f = random.randint(0, 5000, 4000)
+    t = random.randint(0, 5000, 4000)
+    assert(numpy.array_equal(_component_roots(5000, f, t),
+                             _union_find_roots(5000, f, t)))
@@ -0,0 +1,97 @@
+import os, pytest, warnings
+
+import numpy
+
+import grg_mpdata
+
+from test_common import correct_files
+from test_common import warning_files
+from test_common import incorrect_files
+from test_common import recorded_warnings
+
+
+def _error(function):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        try:
+            function()
+        except Exception as exception:
+            return (exception.__class__, str(exception))
+
+
+@pytest.mark.parametrize('input_data', correct_files)
+def test_001(input_data):
+    case = grg_mpdata.io.parse_mp_case_file(input_data)
+    report, recorded = recorded_warnings(lambda: case.validate(summary=True))
+    assert report.ok
+    assert report.counts == {}
+    assert recorded == []
+
+
+@pytest.mark.parametrize('input_data', warning_files)
+def test_002(input_data):
+    case = grg_mpdata.io.parse_mp_case_file(input_data, lazy=True)
+    _, expected = recorded_warnings(case.validate)
+    report = grg_mpdata.validation.validate_case(case)
+    _, recorded = recorded_warnings(lambda: report.warn(summary=False))
+    assert recorded == expected
+
+
+@pytest.mark.parametrize('input_data', warning_files)
+def test_003(input_data):
+    case = grg_mpdata.io.parse_mp_case_file(input_data, lazy=True)
+    report, recorded = recorded_warnings(lambda: case.validate(summary=True))
+    assert len(recorded) == len(report.violations)
+    columnar_report = grg_mpdata.validation.validate_case(case.as_arrays())
+    assert columnar_report.counts == report.counts
+
+
+@pytest.mark.parametrize('input_data', incorrect_files)
+def test_004(input_data):
+    try:
+        case = grg_mpdata.io.parse_mp_case_file(input_data, lazy=True)
+    except grg_mpdata.exception.MPDataException:
+        return
+    expected = _error(case.validate)
+    assert expected is not None
+    case = grg_mpdata.io.parse_mp_case_file(input_data, lazy=True)
+    assert _error(lambda: grg_mpdata.validation.validate_case(case)) == expected
+
+
+class TestReport:
+    def setup_method(self, _):
+        self.case = grg_mpdata.io.parse_mp_case_file(os.path.dirname(os.path.realpath(__file__))+'/data/correct/pglib-opf/pglib_opf_case14_ieee.m', backend='numpy')
+
+    def test_001(self):
+        self.case.bus['area'][[2, 5, 7]] = -1
+        self.case.bus['bus_type'][5] = 0
+        self.case.branch['br_status'][1] = 2
+        report = grg_mpdata.validation.validate_case(self.case)
+        assert report.counts == {'bus_negative_area': 3,
+            'bus_undefined_type': 1, 'branch_undefined_status': 1}
+        assert report.indices('bus_negative_area').tolist() == [2, 5, 7]
+        assert report.indices('bus_negative_zone').tolist() == []
+        assert 'bus_negative_area: 3 bus rows' in str(report)
+
+    def test_002(self):
+        self.case.bus['zone'][:] = -1
+        report, recorded = recorded_warnings(lambda: self.case.validate(summary=True))
+        assert len(recorded) == 1
+        assert recorded[0][0].startswith('bus_negative_zone: %d bus rows' % len(self.case.bus))
+        assert recorded[0][0].endswith(', ...)')
+        _, recorded = recorded_warnings(self.case.validate)
+        assert len(recorded) == len(self.case.bus)
+
+    def test_003(self):
+        self.case.version = '\'1\''
+        self.case.gencost['cost'][0, :] = numpy.nan
+        report = grg_mpdata.validation.validate_case(self.case)
+        assert report.counts == {'version': 0}
+        assert str(report).startswith('version: this data structure')
+
+    def test_004(self):
+        self.case.gencost['model'][1] = 3
+        self.case.gencost['ncost'][2] = 5
+        report = grg_mpdata.validation.validate_case(self.case)
+        assert report.counts == {'gencost_undefined_model': 1,
+            'gencost_polynomial_ncost': 1}
@@ -0,0 +1,67 @@
+import os, io, pytest
+
+import numpy
+
+import grg_mpdata
+
+from test_common import correct_files
+
+
+@pytest.mark.parametrize('input_data', correct_files)
+def test_001(input_data):
+    case = grg_mpdata.io.parse_mp_case_file(input_data)
+    output = io.StringIO()
+    case.write_matpower(output)
+    assert output.getvalue() == case.to_matpower()
+
+
+def test_002():
+    case = grg_mpdata.io.parse_mp_case_file(os.path.dirname(os.path.realpath(__file__))+'/data/correct/case6_001.m')
+    output = io.StringIO()
+    case.write_matpower(output, chunk_size=1)
+    assert output.getvalue() == case.to_matpower()
+
+
+def test_003(tmp_path):
+    case = grg_mpdata.io.parse_mp_case_file(os.path.dirname(os.path.realpath(__file__))+'/data/correct/case6_001.m')
+    path = str(tmp_path / 'case6_001.m.gz')
+    grg_mpdata.io.write_mp_case_file(path, case)
+    with open(path, 'rb') as gz_file:
+        assert gz_file.read(2) == b'\x1f\x8b'
+    assert grg_mpdata.io.parse_mp_case_file(path) == case
+
+
+def test_004(tmp_path):
+    case = grg_mpdata.io.parse_mp_case_file(os.path.dirname(os.path.realpath(__file__))+'/data/correct/case4_000.m')
+    path = str(tmp_path / 'case4_000.m')
+    grg_mpdata.io.write_mp_case_file(path, case)
+    with open(path, 'r') as mp_file:
+        assert mp_file.read() == case.to_matpower()
+
+
+def test_005():
+    bus_1 = grg_mpdata.struct.Bus(1, 3, 0.0, -0.0, 0, 0, 1, 1.1, 0, 240, 1, 1.1, 0.9)
+    bus_2 = grg_mpdata.struct.Bus(2, 1, 1e-05, 1e16, 0, 0, 1, 1.1, 0, 240, 1, 1.1, 0.9, lam_p=1.5)
+    branch = grg_mpdata.struct.Branch(0, 1, 2, 0.1, 0.2, mu_sf=1.0)
+    gencost = grg_mpdata.struct.GeneratorCost(0, 2, 0, 0, 3, [0.1, 2, 0])
+    for components in [[bus_1, bus_2], [branch], [gencost]]:
+        rows = list(grg_mpdata.struct._matpower_rows(components))
+        assert rows == ['\t'+x.to_matpower()+';' for x in components]
+
+    case = grg_mpdata.struct.Case('case', '\'2\'', 100.0, [bus_1, bus_2], [], [branch], [gencost, gencost])
+    assert case.as_arrays().to_matpower() == case.to_matpower()
+
+
+def test_006():
+    case = grg_mpdata.io.parse_mp_case_file(os.path.dirname(os.path.realpath(__file__))+'/data/correct/case3_000.m')
+    expected = case.to_matpower()
+    case.update_component('bus', 0, pd=numpy.float64(case.bus[0].pd))
+    case.bus[1].bus_type = numpy.int64(case.bus[1].bus_type)
+    case.gencost[0].cost = [numpy.float64(x) for x in case.gencost[0].cost]
+    case.mark_modified('bus', 1)
+    case.mark_modified('gencost', 0)
+    assert 'np.' not in case.to_matpower()
+    assert case.to_matpower() == expected
+    output = io.StringIO()
+    case.write_matpower(output)
+    assert output.getvalue() == expected